@@ -0,0 +1,178 @@
+"""
+Global Assignment for BOQ Matching
+One-to-one matching of gambar items to RAB rows on a sparse score matrix,
+solved as a maximum-weight assignment per connected component
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+MATCH_MODES = ('best', 'one_to_one', 'aggregate')
+
+
+def check_match_mode(match_mode: str) -> str:
+    """
+    Validate a match mode name
+
+    - 'best': every gambar item takes its own best RAB row
+    - 'one_to_one': every RAB row is used by at most one gambar item
+    - 'aggregate': best rows, gambar items sharing one RAB row are summed
+
+    Raises:
+        ValueError: Unknown mode
+    """
+    if match_mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {match_mode!r} (available: {', '.join(MATCH_MODES)})")
+    return match_mode
+
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment of every row of a rows <= cols cost matrix
+
+    Shortest augmenting path with potentials, O(rows^2 * cols); the inner
+    scan over columns is vectorized.
+
+    Returns:
+        Column index per row
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)   # row (1-based) assigned to column j, 0 = free
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        col0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+
+            free = ~used[1:]
+            reduced = cost[row0 - 1] - u[row0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = col0
+
+            candidates = np.where(free, minv[1:], np.inf)
+            col1 = int(np.argmin(candidates)) + 1
+            delta = candidates[col1 - 1]
+
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+
+            col0 = col1
+            if owner[col0] == 0:
+                break
+
+        # Augment along the path
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    assignment = np.full(n, -1, dtype=np.int64)
+    for col in range(1, m + 1):
+        if owner[col]:
+            assignment[owner[col] - 1] = col - 1
+    return assignment
+
+
+def max_weight_assignment(scores: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Maximum-weight one-to-one assignment on a dense score matrix
+
+    Zero scores mean "no edge"; such pairs are never returned.
+
+    Args:
+        scores: (rows x cols) non-negative scores
+
+    Returns:
+        List of (row, col) pairs
+    """
+    if scores.size == 0:
+        return []
+
+    transposed = scores.shape[0] > scores.shape[1]
+    matrix = scores.T if transposed else scores
+    assignment = _hungarian(-matrix)
+
+    pairs = []
+    for row, col in enumerate(assignment):
+        if col >= 0 and matrix[row, col] > 0:
+            pairs.append((int(col), row) if transposed else (row, int(col)))
+    return sorted(pairs)
+
+
+def connected_components(edges: Sequence[Tuple[int, int]]) -> List[List[Tuple[int, int]]]:
+    """
+    Group bipartite edges (row, col) into connected components (union-find)
+
+    Returns:
+        List of edge lists, one per component, ordered by first edge
+    """
+    parent: Dict = {}
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for row, col in edges:
+        a, b = ('r', row), ('c', col)
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    components = defaultdict(list)
+    for row, col in edges:
+        components[find(('r', row))].append((row, col))
+    return list(components.values())
+
+
+def sparse_assignment(edges: Dict[Tuple[int, int], float]) -> Dict[int, int]:
+    """
+    Maximum-weight one-to-one matching on a sparse score matrix
+
+    Each connected component of the bipartite graph is solved on its own
+    small dense matrix, so cost grows with component size, not with N x M.
+
+    Args:
+        edges: {(row, col): score} for scores > 0
+
+    Returns:
+        {row: col} for matched rows
+    """
+    matched = {}
+    for component in connected_components(sorted(edges)):
+        if len(component) == 1:
+            row, col = component[0]
+            matched[row] = col
+            continue
+
+        rows = sorted({row for row, _ in component})
+        cols = sorted({col for _, col in component})
+        row_pos = {row: i for i, row in enumerate(rows)}
+        col_pos = {col: j for j, col in enumerate(cols)}
+
+        scores = np.zeros((len(rows), len(cols)))
+        for row, col in component:
+            scores[row_pos[row], col_pos[col]] = edges[(row, col)]
+
+        for i, j in max_weight_assignment(scores):
+            matched[rows[i]] = cols[j]
+
+    return matched
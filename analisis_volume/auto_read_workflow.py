@@ -1,10 +1,28 @@
 """
 Integrated DXF Scanner + DXF to Excel Converter
 Auto-scan DXF files → Auto-convert DWG/PDF → Select → Convert to Excel
+
+Batch mode (non-interaktif, untuk job terjadwal):
+
+    python auto_read_workflow.py --all [--jobs N] [--output-dir DIR] [--summary FILE]
+    python auto_read_workflow.py --category str --category mep
+
+Semua file DXF yang cocok diproses paralel (extract → hitung volume → Excel),
+ringkasan run ditulis sebagai JSON dan exit code menunjukkan hasilnya
+(lihat EXIT_*).
 """
 
+import argparse
+import io
+import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Import modules
 from dxf_scanner import DXFScanner
@@ -12,6 +30,18 @@ from dxf_to_excel import DXFToExcelConverter
 from file_converter import FileConverter
 
 
+# Exit code batch mode
+EXIT_OK = 0          # semua file berhasil
+EXIT_FAILED = 1      # semua file gagal / error fatal
+EXIT_USAGE = 2       # argumen salah (argparse)
+EXIT_PARTIAL = 3     # sebagian file gagal
+EXIT_NO_FILES = 4    # tidak ada file DXF yang cocok
+
+CATEGORIES = ['str', 'ars', 'mep']
+
+SUMMARY_FILE = 'auto_read_summary.json'
+
+
 def main():
     """Main workflow"""
     print("\n" + "="*70)
@@ -166,7 +196,220 @@ def main():
     return success
 
 
+def find_template(base_dir: Path) -> Optional[Path]:
+    """Template V2, lalu V1 di output/templates (None = tidak ada)"""
+    for name in ("Volume_dari_Gambar_TEMPLATE_V2.xlsx", "Volume_dari_Gambar_TEMPLATE.xlsx"):
+        template_file = base_dir / "output" / "templates" / name
+        if template_file.exists():
+            return template_file
+    return None
+
+
+def batch_output_file(output_dir: Path, category: str, dxf_file: str) -> Path:
+    """File Excel hasil satu DXF di batch mode"""
+    return output_dir / f"Volume_dari_Gambar_AUTO_{category}_{Path(dxf_file).stem}.xlsx"
+
+
+def convert_file(dxf_file: str, category: str, template_file: Optional[str], output_file: str,
+                 streaming: bool = False) -> Dict:
+    """Extract, hitung dan tulis Excel untuk satu DXF; output dan error dikumpulkan, tidak dicetak
+    
+    Returns:
+        {'file', 'category', 'output' (None jika gagal), 'status' ('ok'/'failed'), 'items', 'seconds',
+         'extract_seconds', 'export_seconds', 'error', 'log'}
+    """
+    start = time.perf_counter()
+    log = io.StringIO()
+    result = {
+        'file': dxf_file, 'category': category, 'output': output_file, 'status': 'failed', 'items': 0,
+        'seconds': 0.0, 'extract_seconds': 0.0, 'export_seconds': 0.0, 'error': None,
+    }
+    try:
+        with redirect_stdout(log):
+            converter = DXFToExcelConverter(dxf_file, template_file, output_file, streaming=streaming)
+            if not converter.extract_from_dxf():
+                result['error'] = 'Gagal extract DXF'
+            else:
+                result['items'] = len(converter.items)
+                result['extract_seconds'] = time.perf_counter() - start
+                if converter.populate_template():
+                    result['status'] = 'ok'
+                else:
+                    result['error'] = 'Gagal menulis Excel'
+                result['export_seconds'] = time.perf_counter() - start - result['extract_seconds']
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    if result['status'] != 'ok':
+        result['output'] = None
+    result['seconds'] = time.perf_counter() - start
+    result['log'] = log.getvalue()
+    return result
+
+
+def run_batch(files: List[Tuple[str, str]], output_dir: Path, template_file: Optional[str],
+              jobs: int = None, streaming: bool = False) -> List[Dict]:
+    """Konversi semua file di process pool, progres dicetak saat file selesai
+    
+    Args:
+        files: [(kategori, path DXF)]
+        jobs: Jumlah proses (None = sebanyak file/CPU, 1 = berurutan)
+    
+    Returns:
+        Hasil convert_file per file, dalam urutan files
+    """
+    jobs = min(len(files), jobs or os.cpu_count() or 1)
+    tasks = {
+        dxf_file: (dxf_file, category, template_file, str(batch_output_file(output_dir, category, dxf_file)),
+                   streaming)
+        for category, dxf_file in files
+    }
+    results = {}
+    
+    def report(result):
+        results[result['file']] = result
+        name = Path(result['file']).name
+        if result['status'] == 'ok':
+            print(f"  ✓ [{len(results)}/{len(tasks)}] {name}: {result['items']} item ({result['seconds']:.1f} detik)")
+        else:
+            print(f"  ✗ [{len(results)}/{len(tasks)}] {name}: {result['error']} ({result['seconds']:.1f} detik)")
+    
+    if jobs > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(convert_file, *args) for args in tasks.values()]
+                for future in as_completed(futures):
+                    report(future.result())
+        except (OSError, RuntimeError) as e:
+            print(f"⚠ Proses paralel gagal ({e}), file sisa diproses berurutan")
+    
+    for dxf_file, args in tasks.items():
+        if dxf_file not in results:
+            report(convert_file(*args))
+    return [results[dxf_file] for dxf_file in tasks]
+
+
+def batch_exit_code(results: List[Dict]) -> int:
+    """EXIT_* untuk hasil batch"""
+    if not results:
+        return EXIT_NO_FILES
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    if failed == 0:
+        return EXIT_OK
+    return EXIT_FAILED if failed == len(results) else EXIT_PARTIAL
+
+
+def write_run_summary(summary_file: Path, results: List[Dict], run_info: Dict) -> Dict:
+    """Tulis ringkasan run (JSON); log per file tidak ikut, hanya error"""
+    summary = dict(run_info)
+    summary.update({
+        'files': len(results),
+        'succeeded': sum(1 for result in results if result['status'] == 'ok'),
+        'failed': sum(1 for result in results if result['status'] != 'ok'),
+        'items': sum(result['items'] for result in results),
+        'exit_code': batch_exit_code(results),
+        'results': [{key: value for key, value in result.items() if key != 'log'} for result in results],
+    })
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = summary_file.with_name(summary_file.name + '.tmp')
+    tmp.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, summary_file)
+    return summary
+
+
+def parse_batch_args(argv: List[str]) -> argparse.Namespace:
+    """Argumen batch mode"""
+    parser = argparse.ArgumentParser(
+        prog='auto_read_workflow.py',
+        description='Batch DXF → Excel tanpa input interaktif')
+    parser.add_argument('--all', action='store_true', help='Semua kategori (str, ars, mep)')
+    parser.add_argument('--category', action='append', choices=CATEGORIES,
+                        help='Kategori yang diproses (boleh diulang)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Jumlah proses paralel (default: sebanyak file/CPU, 1 = berurutan)')
+    parser.add_argument('--output-dir', type=Path, default=None,
+                        help='Folder hasil Excel (default: output/volumes)')
+    parser.add_argument('--summary', type=Path, default=None,
+                        help=f'File ringkasan JSON (default: <output-dir>/{SUMMARY_FILE})')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Tulis Excel dengan workbook write-only (hemat memori)')
+    parser.add_argument('--base-dir', type=Path, default=None,
+                        help='Root project (default: folder di atas analisis_volume)')
+    args = parser.parse_args(argv)
+    if not args.all and not args.category:
+        parser.error('pilih --all atau --category')
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs harus >= 1')
+    return args
+
+
+def batch_main(argv: List[str]) -> int:
+    """Batch mode: proses semua DXF yang cocok, tulis ringkasan JSON
+    
+    Returns:
+        Exit code (EXIT_*)
+    """
+    args = parse_batch_args(argv)
+    started = datetime.now()
+    start = time.perf_counter()
+    
+    base_dir = args.base_dir or Path(__file__).parent.parent
+    output_dir = args.output_dir or base_dir / "output" / "volumes"
+    summary_file = args.summary or output_dir / SUMMARY_FILE
+    categories = CATEGORIES if args.all else [c for c in CATEGORIES if c in args.category]
+    
+    print("\n" + "="*70)
+    print("AUTO READ DXF - BATCH MODE")
+    print("="*70)
+    
+    scanner = DXFScanner(str(base_dir))
+    found = scanner.scan_dxf_files()
+    files = [(category, dxf_file) for category in categories for dxf_file in sorted(found[category])]
+    
+    # Tanpa file template: template hasil generator (dibangun sekali per proses)
+    template_file = find_template(base_dir)
+    template = str(template_file) if template_file else None
+    print(f"✓ {len(files)} file DXF ({', '.join(c.upper() for c in categories)})")
+    print(f"✓ Template: {template_file.name if template_file else 'template generator'}")
+    
+    results = []
+    if files:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        results = run_batch(files, output_dir, template, args.jobs, args.streaming)
+        for result in results:
+            if result['status'] != 'ok' and result['log']:
+                print(f"\n--- Log {Path(result['file']).name} ---")
+                print(result['log'], end='')
+    else:
+        print("\n❌ Tidak ada file DXF ditemukan!")
+    
+    summary = write_run_summary(summary_file, results, {
+        'started': started.isoformat(timespec='seconds'),
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'seconds': time.perf_counter() - start,
+        'categories': categories,
+        'jobs': args.jobs,
+        'output_dir': str(output_dir),
+        'template': template,
+    })
+    
+    print("\n" + "="*70)
+    print(f"✓ {summary['succeeded']} berhasil, ✗ {summary['failed']} gagal "
+          f"({summary['seconds']:.1f} detik)")
+    print(f"📄 Ringkasan: {summary_file}")
+    print("="*70)
+    return summary['exit_code']
+
+
 if __name__ == "__main__":
+    if any(arg.startswith('--') for arg in sys.argv[1:]):
+        try:
+            sys.exit(batch_main(sys.argv[1:]))
+        except Exception as e:
+            print(f"\n❌ ERROR: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(EXIT_FAILED)
+    
     try:
         success = main()
         sys.exit(0 if success else 1)
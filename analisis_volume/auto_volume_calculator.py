@@ -243,6 +243,8 @@ class AutoVolumeCalculator:
         """Extract all text labels with dimensions and codes"""
         labels = []
         
+        # Pass 1: clean texts, pass 2 parses all dimensions in one batch
+        cleaned = []
         for text in self.dxf_data.get('texts', []):
             raw_content = text.get('content', '')
             position = text.get('position', (0, 0))
@@ -258,9 +260,20 @@ class AutoVolumeCalculator:
             if not content or len(content.strip()) < 2:
                 continue
             
-            # Extract dimensions (✅ Priority #7: now using robust parser)
-            dimensions = self.extract_dimensions_from_text(content, layer=layer)
-            
+            cleaned.append((content, position, layer))
+        
+        if not cleaned:
+            return labels
+        
+        # Extract dimensions (✅ Priority #7: now using robust parser)
+        all_dimensions = self.dimension_parser.batch_to_tuples(
+            self.dimension_parser.parse_batch(
+                [content for content, _, _ in cleaned],
+                contexts=[layer for _, _, layer in cleaned],
+            )
+        )
+        
+        for (content, position, layer), dimensions in zip(cleaned, all_dimensions):
             # Extract kode
             kode = self.extract_kode_from_text(content)
             
@@ -0,0 +1,14 @@
+"""
+Shared pytest setup
+Tests never use the persistent caches in ~/.cache/analisis_volume: scores or
+tables cached by an earlier checkout could hide a regression
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_persistent_caches(monkeypatch):
+    """Bypass the default match cache and RAB cache (tests pass their own cache when needed)"""
+    monkeypatch.setenv('ANALISIS_VOLUME_CACHE', 'off')
+    monkeypatch.setenv('ANALISIS_VOLUME_RAB_CACHE', 'off')
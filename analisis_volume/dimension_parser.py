@@ -4,7 +4,11 @@ Handles multiple formats and smart unit detection
 """
 
 import re
-from typing import Optional, Tuple, List
+from functools import lru_cache
+from typing import Optional, Tuple, List, Sequence
+
+import numpy as np
+import pandas as pd
 
 
 class DimensionParser:
@@ -20,7 +24,12 @@ class DimensionParser:
     - H=400, h=4.0, HEIGHT=400
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096, use_combined: bool = True):
+        """
+        Args:
+            cache_size: Max entries of the (text, context) LRU parse cache, 0 disables it
+            use_combined: Pre-screen texts with one combined alternation regex
+        """
         # Regex patterns ordered by specificity (most specific first)
         self.patterns = [
             # Pattern 1: With explicit units (highest priority)
@@ -87,6 +96,36 @@ class DimensionParser:
                 'priority': 8
             }
         ]
+        
+        # Compile and sort once, parse() runs for every text entity
+        self._compiled = [
+            (re.compile(p['regex'], re.IGNORECASE), p['handler'])
+            for p in sorted(self.patterns, key=lambda x: x['priority'])
+        ]
+        
+        # One scan decides texts without any dimension (most labels)
+        self._combined = None
+        if use_combined:
+            self._combined = re.compile(
+                '|'.join(f"(?:{p['regex']})" for p in self.patterns), re.IGNORECASE
+            )
+        
+        # Array counterparts of the handlers for parse_batch()
+        self._vector_handlers = {
+            1: self._vec_with_unit,
+            2: self._vec_decimal,
+            3: self._vec_large_numbers,
+            4: self._vec_medium_numbers,
+            5: self._vec_slash_format,
+            6: self._vec_spaced,
+            7: self._vec_height,
+            8: self._vec_thickness,
+        }
+        
+        if cache_size > 0:
+            self._parse_cached = lru_cache(maxsize=cache_size)(self._parse_uncached)
+        else:
+            self._parse_cached = self._parse_uncached
     
     def _parse_with_unit(self, match: re.Match) -> Tuple[float, float, Optional[float]]:
         """Parse dimensions with explicit unit"""
@@ -201,14 +240,18 @@ class DimensionParser:
             Tuple of (width, length, height) in meters, or None if not found
             Any dimension can be None if not detected
         """
+        return self._parse_cached(text, context)
+    
+    def _parse_uncached(self, text: str, context: Optional[str] = None) -> Optional[Tuple[float, float, float]]:
+        """Parse without cache lookup (see parse)"""
         text = text.strip()
         
+        if self._combined is not None and not self._combined.search(text):
+            return None
+        
         # Try patterns in priority order
-        for pattern_info in sorted(self.patterns, key=lambda x: x['priority']):
-            regex = pattern_info['regex']
-            handler = pattern_info['handler']
-            
-            match = re.search(regex, text, re.IGNORECASE)
+        for regex, handler in self._compiled:
+            match = regex.search(text)
             if match:
                 result = handler(match)
                 
@@ -218,6 +261,12 @@ class DimensionParser:
         
         return None
     
+    def cache_info(self):
+        """LRU statistics of the parse cache (None if caching is disabled)"""
+        if hasattr(self._parse_cached, 'cache_info'):
+            return self._parse_cached.cache_info()
+        return None
+    
     def parse_all(self, text: str) -> List[Tuple[float, float, float]]:
         """
         Parse all dimensions from text (may contain multiple)
@@ -225,14 +274,13 @@ class DimensionParser:
         Returns:
             List of dimension tuples found
         """
+        if self._combined is not None and not self._combined.search(text):
+            return []
+        
         results = []
         
-        for pattern_info in sorted(self.patterns, key=lambda x: x['priority']):
-            regex = pattern_info['regex']
-            handler = pattern_info['handler']
-            
-            matches = re.finditer(regex, text, re.IGNORECASE)
-            for match in matches:
+        for regex, handler in self._compiled:
+            for match in regex.finditer(text):
                 result = handler(match)
                 if result and any(v is not None and v > 0 for v in result):
                     results.append(result)
@@ -245,6 +293,140 @@ class DimensionParser:
         
         return unique_results
     
+    # ------------------------------------------------------------------
+    # Batch parsing (vectorized per pattern priority)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _vec_with_unit(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val1 = groups[0].astype(float).to_numpy()
+        val2 = groups[1].astype(float).to_numpy()
+        unit = groups[2].str.lower().to_numpy()
+        divisor = np.select([unit == 'mm', unit == 'cm'], [1000.0, 100.0], 1.0)
+        return val1 / divisor, val2 / divisor, np.full(len(groups), np.nan)
+    
+    @staticmethod
+    def _vec_decimal(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val1 = groups[0].astype(float).to_numpy()
+        val2 = groups[1].astype(float).to_numpy()
+        return val1, val2, np.full(len(groups), np.nan)
+    
+    @staticmethod
+    def _vec_large_numbers(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val1 = groups[0].astype(float).to_numpy()
+        val2 = groups[1].astype(float).to_numpy()
+        return val1 / 1000, val2 / 1000, np.full(len(groups), np.nan)
+    
+    @staticmethod
+    def _vec_medium_numbers(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val1 = groups[0].astype(float).to_numpy()
+        val2 = groups[1].astype(float).to_numpy()
+        return val1 / 100, val2 / 100, np.full(len(groups), np.nan)
+    
+    _vec_slash_format = _vec_medium_numbers
+    
+    @staticmethod
+    def _vec_spaced(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val1 = groups[0].astype(float).to_numpy()
+        val2 = groups[1].astype(float).to_numpy()
+        divisor = np.select(
+            [(val1 >= 100) | (val2 >= 100), (val1 >= 10) | (val2 >= 10)],
+            [1000.0, 100.0],
+            1.0,
+        )
+        return val1 / divisor, val2 / divisor, np.full(len(groups), np.nan)
+    
+    @staticmethod
+    def _vec_height(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val = groups[0].astype(float).to_numpy()
+        divisor = np.select([val >= 1000, val > 10], [1000.0, 100.0], 1.0)
+        empty = np.full(len(groups), np.nan)
+        return empty, empty.copy(), val / divisor
+    
+    @staticmethod
+    def _vec_thickness(groups: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        val = groups[0].astype(float).to_numpy()
+        divisor = np.select([val >= 100, val >= 10], [1000.0, 100.0], 1.0)
+        empty = np.full(len(groups), np.nan)
+        return empty, empty.copy(), val / divisor
+    
+    def parse_batch(self, texts, contexts: Optional[Sequence[Optional[str]]] = None) -> pd.DataFrame:
+        """
+        Parse a whole column of texts at once
+        
+        Each pattern is applied with a vectorized str.extract over the texts
+        not matched by a higher-priority pattern, unit conversion is done on
+        arrays. Row results are identical to parse().
+        
+        Args:
+            texts: list, array or Series of texts (non-string entries never match)
+            contexts: Optional contexts aligned with texts (same role as in parse)
+        
+        Returns:
+            DataFrame with float columns 'width', 'length', 'height' (NaN where
+            not detected), indexed like texts when a Series is given
+        """
+        series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        if contexts is not None and len(contexts) != len(series):
+            raise ValueError("contexts must have the same length as texts")
+        
+        # Text columns repeat heavily: parse each distinct value once
+        codes, uniques = pd.factorize(series.to_numpy(dtype=object), use_na_sentinel=True)
+        values = np.asarray(uniques, dtype=object)
+        
+        n = len(values)
+        width = np.full(n, np.nan)
+        length = np.full(n, np.nan)
+        height = np.full(n, np.nan)
+        
+        is_text = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=n)
+        pending = np.flatnonzero(is_text)
+        
+        # Only texts hitting the combined regex can match any pattern
+        if self._combined is not None and len(pending):
+            search = self._combined.search
+            hit = np.fromiter((search(v) is not None for v in values[pending]), dtype=bool, count=len(pending))
+            pending = pending[hit]
+        
+        for pattern_info in sorted(self.patterns, key=lambda x: x['priority']):
+            if not len(pending):
+                break
+            
+            subset = pd.Series(values[pending], dtype=object)
+            groups = subset.str.extract(pattern_info['regex'], flags=re.IGNORECASE, expand=True)
+            matched = groups[0].notna().to_numpy()
+            if not matched.any():
+                continue
+            
+            rows = pending[matched]
+            w, l, h = self._vector_handlers[pattern_info['priority']](groups[matched])
+            
+            # Same validation as parse(): at least one positive value
+            valid = (w > 0) | (l > 0) | (h > 0)
+            width[rows[valid]] = w[valid]
+            length[rows[valid]] = l[valid]
+            height[rows[valid]] = h[valid]
+            
+            # Matched but invalid rows fall through to the next pattern
+            pending = np.concatenate([pending[~matched], rows[~valid]])
+            pending.sort()
+        
+        # Broadcast back to the input rows, -1 codes are missing values
+        found = codes >= 0
+        out = np.full((len(codes), 3), np.nan)
+        out[found] = np.column_stack([width, length, height])[codes[found]]
+        
+        return pd.DataFrame(out, columns=['width', 'length', 'height'], index=series.index)
+    
+    @staticmethod
+    def batch_to_tuples(frame: pd.DataFrame) -> List[Optional[Tuple[float, float, float]]]:
+        """Convert parse_batch() output to parse()-style tuples (None where not found)"""
+        results = []
+        for row in frame[['width', 'length', 'height']].itertuples(index=False):
+            dims = tuple(None if v != v else v for v in row)
+            results.append(None if dims == (None, None, None) else dims)
+        return results
+    
     def smart_unit_detection(self, value: float, context: Optional[str] = None) -> float:
         """
         Smart unit detection based on magnitude and context
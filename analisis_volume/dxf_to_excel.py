@@ -12,19 +12,58 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from dwg_reader import DXFReader
 from auto_volume_calculator import AutoVolumeCalculator
-from text_utils import detect_category
-from openpyxl import load_workbook
+from text_utils import CategoryDetector
+from template_generator import load_template, open_template
+from excel_stream import (
+    EXCEL_MAX_ROWS, INDEX_SHEET, copy_layout, copy_rows, sheet_parts, styled_cell, write_index,
+)
+from volume_export import export_items
+from openpyxl import Workbook
+from openpyxl.formatting.rule import FormulaRule
 from openpyxl.styles import PatternFill
+from copy import copy
 from datetime import datetime
 
 
 class DXFToExcelConverter:
     """Convert DXF data ke Excel template"""
     
-    def __init__(self, dxf_file: str, template_file: str, output_file: str):
+    # Baris pertama item di sheet template (baris 1-5 = judul, info proyek, header kolom)
+    START_ROW = 6
+    
+    # Header kolom yang ditulis di baris START_ROW - 1 sheet berisi item (urutan _row_values);
+    # template V1 (ARSITEKTUR/MEP 10 kolom) diganti supaya header sesuai isi kolom
+    HEADERS = ['No', 'Kode', 'Item Pekerjaan', 'Lantai', 'Lokasi/As Grid', 'Panjang (m)', 'Lebar (m)',
+               'Tinggi (m)', 'Jumlah', 'Satuan', 'Volume', 'Metode']
+    
+    # Baris maksimum per sheet; item lebih banyak dilanjutkan di sheet 'MEP (2)', ...
+    MAX_SHEET_ROWS = EXCEL_MAX_ROWS
+    
+    SHEETS_MAP = {
+        'struktur': 'STRUKTUR',
+        'arsitektur': 'ARSITEKTUR',
+        'mep': 'MEP'
+    }
+    
+    def __init__(self, dxf_file: str, template_file: str, output_file: str, streaming: bool = False,
+                 split_by_lantai: bool = False):
+        """
+        Args:
+            dxf_file: Path file DXF
+            template_file: Path template Volume_dari_Gambar, None = template hasil
+                VolumeTemplateGenerator (dibangun sekali per proses)
+            output_file: Path file Excel hasil
+            streaming: True = tulis output dengan workbook write-only (baris di-stream,
+                memori tetap kecil untuk ratusan ribu item); header template direproduksi,
+                baris contoh template diganti item
+            split_by_lantai: True = satu sheet per lantai per kategori (mis. 'MEP LT.1'),
+                ditulis dengan mode streaming beserta sheet DAFTAR SHEET
+        """
         self.dxf_file = dxf_file
         self.template_file = template_file
         self.output_file = output_file
+        self.streaming = streaming
+        self.split_by_lantai = split_by_lantai
         self.items = []
         
     def extract_from_dxf(self) -> bool:
@@ -64,141 +103,204 @@ class DXFToExcelConverter:
         
         return True
     
+    def template_name(self) -> str:
+        """Nama template untuk log"""
+        if self.template_file is None:
+            return "template generator"
+        return os.path.basename(self.template_file)
+    
+    def group_items(self) -> dict:
+        """Kelompokkan item per kategori sheet (struktur/arsitektur/mep)"""
+        grouped_items = {
+            'struktur': [],
+            'arsitektur': [],
+            'mep': []
+        }
+        
+        # ========== ENHANCED CATEGORY MAPPING (MEP ADDED) ==========
+        kategori_mapping = {
+            # Struktur
+            'kolom': 'struktur',
+            'balok': 'struktur',
+            'plat': 'struktur',
+            'sloof': 'struktur',
+            'pondasi': 'struktur',
+            'ring': 'struktur',
+            'tangga': 'struktur',
+            'pile': 'struktur',
+            'footing': 'struktur',
+            
+            # Arsitektur
+            'dinding': 'arsitektur',
+            'pintu': 'arsitektur',
+            'jendela': 'arsitektur',
+            'lantai': 'arsitektur',
+            'plafon': 'arsitektur',
+            'atap': 'arsitektur',
+            'window': 'arsitektur',
+            'door': 'arsitektur',
+            'ceiling': 'arsitektur',
+            'wall': 'arsitektur',
+            
+            # MEP - HVAC & AC
+            'ac': 'mep',
+            'hvac': 'mep',
+            'fcu': 'mep',
+            'ahu': 'mep',
+            'vrv': 'mep',
+            'ducting': 'mep',
+            'duct': 'mep',
+            'grille': 'mep',
+            'diffuser': 'mep',
+            'exhaust': 'mep',
+            'return air grille': 'mep',
+            'supply air diffuser': 'mep',
+            'supply air grille': 'mep',
+            'fresh air diffuser': 'mep',
+            'exhaust grille': 'mep',
+            
+            # MEP - Plumbing
+            'pipa': 'mep',
+            'pipe': 'mep',
+            'plumbing': 'mep',
+            'hydrant': 'mep',
+            'sprinkler': 'mep',
+            'gas': 'mep',
+            'medis': 'mep',
+            'air bersih': 'mep',
+            'air kotor': 'mep',
+            'sanitasi': 'mep',
+            'pompa': 'mep',
+            'tangki': 'mep',
+            
+            # MEP - Electrical
+            'kabel': 'mep',
+            'cable': 'mep',
+            'panel': 'mep',
+            'electrical': 'mep',
+            'listrik': 'mep',
+            'stop kontak': 'mep',
+            'outlet': 'mep',
+            'lampu': 'mep',
+            'lighting': 'mep',
+            'saklar': 'mep',
+            'switch': 'mep',
+            'power': 'mep',
+            'mdp': 'mep',
+            'sdp': 'mep',
+            
+            # MEP - Fire System
+            'fire': 'mep',
+            'alarm': 'mep',
+            'smoke detector': 'mep',
+        }
+        # =========================================================
+        
+        # ========== ADVANCED CATEGORY DETECTION ==========
+        # Use folder path + layer + text for better classification
+        # Folder category once per file, layer categories cached per layer
+        detector = CategoryDetector(self.dxf_file)
+        detected_cats, confidences = detector.detect_batch(
+            [item.get('layer', '') for item in self.items],
+            [item.get('item', '') for item in self.items],
+        )
+        
+        for item, detected_cat, confidence in zip(self.items, detected_cats, confidences):
+            item_text = item.get('item', '')
+            
+            if detected_cat and confidence >= 40:
+                # Use detected category if confident enough
+                group = detected_cat
+                print(f"  ✓ Advanced detection: '{item_text[:30]}...' → {group.upper()} (confidence: {confidence}%)")
+            else:
+                # Fallback to keyword mapping
+                kategori = item.get('kategori', 'unknown')
+                group = kategori_mapping.get(kategori.lower(), 'arsitektur')
+                print(f"  • Keyword mapping: '{item_text[:30]}...' → {group.upper()}")
+            
+            grouped_items[group].append(item)
+        # =================================================
+        
+        return grouped_items
+    
+    @staticmethod
+    def _row_values(idx: int, item: dict) -> list:
+        """Nilai 12 kolom sheet template untuk satu item"""
+        return [
+            idx,  # No
+            item.get('kode', ''),  # Kode
+            item.get('item', ''),  # Item
+            item.get('lantai', ''),  # Lantai
+            item.get('grid', ''),  # Lokasi/Grid
+            item.get('panjang', 0),  # Panjang
+            item.get('lebar', 0),  # Lebar
+            item.get('tinggi', 0) if item.get('tinggi') else '',  # Tinggi
+            item.get('jumlah', 1),  # Jumlah
+            item.get('satuan', 'm3'),  # Satuan
+            item.get('volume', 0),  # Volume
+            f"Auto: {item.get('method', 'DXF')}",  # Metode
+        ]
+    
+    def _header_cells(self, source_ws, ws=None) -> list:
+        """Sel header HEADERS dengan style header template (kolom tanpa style ikut kolom sebelumnya)
+        
+        ws None: header ditulis langsung di source_ws (mode template); selain itu
+        WriteOnlyCell untuk di-append ke ws (mode streaming).
+        """
+        row = self.START_ROW - 1
+        cells = []
+        style = None
+        for col, header in enumerate(self.HEADERS, 1):
+            source = source_ws.cell(row=row, column=col)
+            if source.has_style:
+                style = source
+            if ws is None:
+                source.value = header
+                if not source.has_style and style is not None:
+                    source._style = copy(style._style)
+                continue
+            cell = styled_cell(ws, style if style is not None else source)
+            if cell is None:
+                cell = header
+            else:
+                cell.value = header
+            cells.append(cell)
+        return cells
+    
+    def _clear_rows(self, ws):
+        """Hapus baris contoh template mulai START_ROW (beserta merge-nya), diganti item"""
+        for merged in list(ws.merged_cells.ranges):
+            if merged.max_row >= self.START_ROW:
+                ws.unmerge_cells(merged.coord)
+        if ws.max_row >= self.START_ROW:
+            ws.delete_rows(self.START_ROW, ws.max_row - self.START_ROW + 1)
+    
     def populate_template(self) -> bool:
         """Populate Excel template dengan data"""
         print("\n" + "="*70)
         print("STEP 3: POPULATE EXCEL TEMPLATE")
         print("="*70)
         
-        if not os.path.exists(self.template_file):
+        if self.template_file is not None and not os.path.exists(self.template_file):
             print(f"✗ Template file tidak ditemukan: {self.template_file}")
             return False
         
+        if self.streaming or self.split_by_lantai:
+            return self.write_streaming()
+        if len(self.items) > self.MAX_SHEET_ROWS - (self.START_ROW - 1):
+            print(f"  • {len(self.items)} item melebihi kapasitas satu sheet, mode streaming dengan sheet lanjutan")
+            return self.write_streaming()
+        
         try:
-            # Load template
-            wb = load_workbook(self.template_file)
-            print(f"✓ Template loaded: {os.path.basename(self.template_file)}")
-            
-            # Group items by category
-            grouped_items = {
-                'struktur': [],
-                'arsitektur': [],
-                'mep': []
-            }
-            
-            # ========== ENHANCED CATEGORY MAPPING (MEP ADDED) ==========
-            kategori_mapping = {
-                # Struktur
-                'kolom': 'struktur',
-                'balok': 'struktur',
-                'plat': 'struktur',
-                'sloof': 'struktur',
-                'pondasi': 'struktur',
-                'ring': 'struktur',
-                'tangga': 'struktur',
-                'pile': 'struktur',
-                'footing': 'struktur',
-                
-                # Arsitektur
-                'dinding': 'arsitektur',
-                'pintu': 'arsitektur',
-                'jendela': 'arsitektur',
-                'lantai': 'arsitektur',
-                'plafon': 'arsitektur',
-                'atap': 'arsitektur',
-                'window': 'arsitektur',
-                'door': 'arsitektur',
-                'ceiling': 'arsitektur',
-                'wall': 'arsitektur',
-                
-                # MEP - HVAC & AC
-                'ac': 'mep',
-                'hvac': 'mep',
-                'fcu': 'mep',
-                'ahu': 'mep',
-                'vrv': 'mep',
-                'ducting': 'mep',
-                'duct': 'mep',
-                'grille': 'mep',
-                'diffuser': 'mep',
-                'exhaust': 'mep',
-                'return air grille': 'mep',
-                'supply air diffuser': 'mep',
-                'supply air grille': 'mep',
-                'fresh air diffuser': 'mep',
-                'exhaust grille': 'mep',
-                
-                # MEP - Plumbing
-                'pipa': 'mep',
-                'pipe': 'mep',
-                'plumbing': 'mep',
-                'hydrant': 'mep',
-                'sprinkler': 'mep',
-                'gas': 'mep',
-                'medis': 'mep',
-                'air bersih': 'mep',
-                'air kotor': 'mep',
-                'sanitasi': 'mep',
-                'pompa': 'mep',
-                'tangki': 'mep',
-                
-                # MEP - Electrical
-                'kabel': 'mep',
-                'cable': 'mep',
-                'panel': 'mep',
-                'electrical': 'mep',
-                'listrik': 'mep',
-                'stop kontak': 'mep',
-                'outlet': 'mep',
-                'lampu': 'mep',
-                'lighting': 'mep',
-                'saklar': 'mep',
-                'switch': 'mep',
-                'power': 'mep',
-                'mdp': 'mep',
-                'sdp': 'mep',
-                
-                # MEP - Fire System
-                'fire': 'mep',
-                'alarm': 'mep',
-                'smoke detector': 'mep',
-            }
-            # =========================================================
-            
-            # ========== ADVANCED CATEGORY DETECTION ==========
-            # Use folder path + layer + text for better classification
-            file_path = self.dxf_file
-            
-            for item in self.items:
-                item_text = item.get('item', '')
-                layer_name = item.get('layer', '')
-                
-                # Try advanced detection first (uses folder + layer + text + abbreviation)
-                detected_cat, confidence = detect_category(file_path, layer_name, item_text)
-                
-                if detected_cat and confidence >= 40:
-                    # Use detected category if confident enough
-                    group = detected_cat
-                    print(f"  ✓ Advanced detection: '{item_text[:30]}...' → {group.upper()} (confidence: {confidence}%)")
-                else:
-                    # Fallback to keyword mapping
-                    kategori = item.get('kategori', 'unknown')
-                    group = kategori_mapping.get(kategori.lower(), 'arsitektur')
-                    print(f"  • Keyword mapping: '{item_text[:30]}...' → {group.upper()}")
-                
-                grouped_items[group].append(item)
-            # =================================================
+            # Salinan template dari cache di memori (diisi di tempat)
+            wb = open_template(self.template_file)
+            print(f"✓ Template loaded: {self.template_name()}")
             
-            # Populate each sheet
-            sheets_map = {
-                'struktur': 'STRUKTUR',
-                'arsitektur': 'ARSITEKTUR',
-                'mep': 'MEP'
-            }
+            grouped_items = self.group_items()
             
             fill_green = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
             
-            for group, sheet_name in sheets_map.items():
+            for group, sheet_name in self.SHEETS_MAP.items():
                 if sheet_name not in wb.sheetnames:
                     print(f"  ⚠ Sheet {sheet_name} tidak ditemukan, skip...")
                     continue
@@ -210,27 +312,18 @@ class DXFToExcelConverter:
                     print(f"  • {sheet_name}: No items to populate")
                     continue
                 
-                # Find starting row (after header)
-                start_row = 6  # Default starting row after header
+                # Baris contoh template diganti item, header sesuai kolom item
+                self._clear_rows(ws)
+                self._header_cells(ws)
                 
                 # Populate items (WITH ENHANCED COLUMNS)
-                row = start_row
+                row = self.START_ROW
                 for idx, item in enumerate(items, 1):
                     # Skip merged cells by checking if cell is merged
                     try:
                         # Try to write to cells
-                        ws.cell(row=row, column=1).value = idx  # No
-                        ws.cell(row=row, column=2).value = item.get('kode', '')  # Kode
-                        ws.cell(row=row, column=3).value = item.get('item', '')  # Item
-                        ws.cell(row=row, column=4).value = item.get('lantai', '')  # Lantai
-                        ws.cell(row=row, column=5).value = item.get('grid', '')  # Lokasi/Grid
-                        ws.cell(row=row, column=6).value = item.get('panjang', 0)  # Panjang
-                        ws.cell(row=row, column=7).value = item.get('lebar', 0)  # Lebar
-                        ws.cell(row=row, column=8).value = item.get('tinggi', 0) if item.get('tinggi') else ''  # Tinggi
-                        ws.cell(row=row, column=9).value = item.get('jumlah', 1)  # Jumlah
-                        ws.cell(row=row, column=10).value = item.get('satuan', 'm3')  # Satuan
-                        ws.cell(row=row, column=11).value = item.get('volume', 0)  # Volume
-                        ws.cell(row=row, column=12).value = f"Auto: {item.get('method', 'DXF')}"  # Metode
+                        for col, value in enumerate(self._row_values(idx, item), 1):
+                            ws.cell(row=row, column=col).value = value
                         
                         # Apply green fill to auto-populated rows
                         for col in range(1, 13):
@@ -250,6 +343,7 @@ class DXFToExcelConverter:
             # Save output
             wb.save(self.output_file)
             print(f"\n✓ Excel file saved: {self.output_file}")
+            self.export_columnar(grouped_items)
             
             return True
             
@@ -259,6 +353,124 @@ class DXFToExcelConverter:
             traceback.print_exc()
             return False
     
+    def sheet_plan(self, sheet_name: str, items: list, taken: list) -> list:
+        """Sheet output untuk item satu kategori
+        
+        Per lantai (split_by_lantai) lalu per MAX_SHEET_ROWS baris; nomor item
+        tetap nomor urut dalam kategori.
+        
+        Args:
+            sheet_name: Sheet kategori di template (mis. 'MEP')
+            items: Item kategori
+            taken: Nama sheet yang sudah dipakai (ditambah nama sheet baru)
+        
+        Returns:
+            [(nama sheet, lantai, [(no, item)])]
+        """
+        groups = {}
+        for no, item in enumerate(items, 1):
+            lantai = str(item.get('lantai') or '').strip() if self.split_by_lantai else ''
+            groups.setdefault(lantai, []).append((no, item))
+        
+        capacity = self.MAX_SHEET_ROWS - (self.START_ROW - 1)
+        plan = []
+        for lantai, rows in groups.items():
+            name = f"{sheet_name} {lantai}" if lantai else sheet_name
+            for title, start, stop in sheet_parts(name, len(rows), capacity, taken):
+                taken.append(title)
+                plan.append((title, lantai, rows[start:stop]))
+        return plan
+    
+    def write_streaming(self) -> bool:
+        """Tulis output dengan workbook write-only
+        
+        Baris 1-5 (judul, info proyek, header kolom) tiap sheet kategori
+        disalin dari template beserta style dan merge-nya, lalu item
+        di-append baris per baris tanpa style per sel; warna hijau baris
+        auto-populate memakai satu aturan conditional formatting per sheet.
+        Sheet lain (mis. PANDUAN) dan sheet kategori tanpa item disalin utuh.
+        
+        Kategori yang dipecah (per lantai atau melebihi MAX_SHEET_ROWS) ditulis
+        ke beberapa sheet dengan header masing-masing, didaftar di sheet
+        DAFTAR SHEET (sheet pertama).
+        """
+        try:
+            # Template yang di-cache per proses, hanya dibaca
+            template = load_template(self.template_file)
+            print(f"✓ Template loaded: {self.template_name()}")
+            
+            grouped_items = self.group_items()
+            sheet_groups = {sheet_name: group for group, sheet_name in self.SHEETS_MAP.items()}
+            for group, sheet_name in self.SHEETS_MAP.items():
+                if sheet_name not in template.sheetnames:
+                    print(f"  ⚠ Sheet {sheet_name} tidak ditemukan, skip...")
+            
+            # Sheet output per kategori (ditentukan sebelum baris pertama ditulis)
+            taken = [INDEX_SHEET] + [name for name in template.sheetnames if name not in sheet_groups]
+            plans = {}
+            for sheet_name in template.sheetnames:
+                items = grouped_items.get(sheet_groups.get(sheet_name), [])
+                if items:
+                    plans[sheet_name] = self.sheet_plan(sheet_name, items, taken)
+            partitioned = any(len(plan) > 1 or plan[0][0] != sheet_name for sheet_name, plan in plans.items())
+            
+            fill_green = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+            
+            wb = Workbook(write_only=True)
+            if partitioned:
+                write_index(wb.create_sheet(INDEX_SHEET), [
+                    {'sheet': title, 'kategori': sheet_name, 'lantai': lantai,
+                     'no_awal': rows[0][0], 'no_akhir': rows[-1][0], 'jumlah_baris': len(rows)}
+                    for sheet_name, plan in plans.items() for title, lantai, rows in plan
+                ])
+            
+            for sheet_name in template.sheetnames:
+                source = template[sheet_name]
+                if sheet_name not in plans:
+                    if sheet_name in sheet_groups:
+                        print(f"  • {sheet_name}: No items to populate")
+                    ws = wb.create_sheet(sheet_name)
+                    copy_layout(source, ws)
+                    copy_rows(source, ws)
+                    continue
+                
+                for title, _, rows in plans[sheet_name]:
+                    ws = wb.create_sheet(title)
+                    copy_layout(source, ws)
+                    copy_rows(source, ws, max_row=self.START_ROW - 2)
+                    ws.append(self._header_cells(source, ws))
+                    for no, item in rows:
+                        ws.append(self._row_values(no, item))
+                    
+                    last_row = self.START_ROW + len(rows) - 1
+                    ws.conditional_formatting.add(
+                        f"A{self.START_ROW}:L{last_row}",
+                        FormulaRule(formula=['TRUE'], fill=fill_green)
+                    )
+                    if title != sheet_name:
+                        print(f"  ✓ {title}: {len(rows)} items populated")
+                print(f"  ✓ {sheet_name}: {len(grouped_items[sheet_groups[sheet_name]])} items populated")
+            
+            wb.save(self.output_file)
+            print(f"\n✓ Excel file saved: {self.output_file}")
+            self.export_columnar(grouped_items)
+            
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error populating template: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    def export_columnar(self, grouped_items: dict):
+        """Export item (Parquet/CSV, lihat volume_export) di samping file Excel, dibaca comparator"""
+        try:
+            path = export_items(grouped_items, self.output_file)
+            print(f"✓ Data export: {os.path.basename(path)}")
+        except (OSError, ValueError) as e:
+            print(f"  ⚠ Data export gagal: {e}")
+    
     def run_conversion(self) -> bool:
         """Run full conversion workflow"""
         print("\n" + "╔" + "="*68 + "╗")
@@ -0,0 +1,154 @@
+"""
+Streaming Excel Output
+Helpers for openpyxl write-only workbooks: rows are written to disk as they
+are appended, so memory stays flat regardless of the number of rows
+
+Write-only sheets take column widths, freeze panes and merges before the
+first row is appended; cell styles are set per WriteOnlyCell. Styling that
+depends on the data (row fills by status, borders, number formats of a
+column) is expressed as a few conditional-formatting rules over the whole
+data range instead of per cell, so data rows are appended as plain values.
+
+A sheet holds at most EXCEL_MAX_ROWS rows; larger item sets are split over
+continuation sheets ('MEP', 'MEP (2)', ...) listed in an INDEX_SHEET.
+"""
+
+from copy import copy
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import DifferentialStyle, Rule
+from openpyxl.styles.numbers import BUILTIN_FORMATS_REVERSE, NumberFormat
+from openpyxl.worksheet.cell_range import CellRange
+
+
+# Rows per worksheet in xlsx (Excel limit, openpyxl fails beyond it)
+EXCEL_MAX_ROWS = 1048576
+
+# Index of the sheets of partitioned categories
+INDEX_SHEET = 'DAFTAR SHEET'
+INDEX_HEADERS = ['Sheet', 'Kategori', 'Lantai', 'No Awal', 'No Akhir', 'Jumlah Baris']
+
+_INVALID_TITLE = str.maketrans({c: '-' for c in '[]:*?/\\'})
+
+
+def styled_cell(ws, source):
+    """WriteOnlyCell with the value and style of a (template) cell, None for empty unstyled cells"""
+    if source.value is None and not source.has_style:
+        return None
+    cell = WriteOnlyCell(ws, value=source.value)
+    if source.has_style:
+        cell.font = copy(source.font)
+        cell.fill = copy(source.fill)
+        cell.border = copy(source.border)
+        cell.alignment = copy(source.alignment)
+        cell.protection = copy(source.protection)
+        cell.number_format = source.number_format
+    return cell
+
+
+def copy_layout(source_ws, ws):
+    """Column widths and freeze panes of a template sheet (before the first append)"""
+    for key, dimension in source_ws.column_dimensions.items():
+        if dimension.width:
+            ws.column_dimensions[key].width = dimension.width
+    if source_ws.freeze_panes:
+        ws.freeze_panes = source_ws.freeze_panes
+
+
+def copy_rows(source_ws, ws, max_row: Optional[int] = None):
+    """
+    Append the rows 1..max_row of a template sheet with their styles and merges
+
+    Args:
+        source_ws: Template worksheet (normal workbook)
+        ws: Write-only worksheet, rows are appended after its current rows
+        max_row: Last row to copy (None = all rows)
+    """
+    max_row = source_ws.max_row if max_row is None else min(max_row, source_ws.max_row)
+    for merged in source_ws.merged_cells.ranges:
+        if merged.max_row <= max_row:
+            ws.merged_cells.add(CellRange(merged.coord))
+    for row in source_ws.iter_rows(min_row=1, max_row=max_row):
+        ws.append([styled_cell(ws, cell) for cell in row])
+
+
+def frame_rows(df: pd.DataFrame) -> List[list]:
+    """Rows of a DataFrame as lists of Python values for ws.append (NaN/None → empty cell)"""
+    values = df.astype(object)
+    return values.where(pd.notna(values), None).values.tolist()
+
+
+def append_frame(ws, df: pd.DataFrame, header: bool = True):
+    """Bulk-append a DataFrame (column names as first row when header)"""
+    if header:
+        ws.append([str(column) for column in df.columns])
+    for row in frame_rows(df):
+        ws.append(row)
+
+
+def equals_formula(cell: str, values: List[str]) -> str:
+    """Rule formula true when cell (e.g. '$I4') equals one of the values"""
+    tests = ['{}="{}"'.format(cell, str(value).replace('"', '""')) for value in values]
+    return tests[0] if len(tests) == 1 else 'OR({})'.format(','.join(tests))
+
+
+def add_rule(ws, cell_range: str, formula: str = 'TRUE', fill=None, font=None, border=None,
+             number_format: Optional[str] = None):
+    """
+    Conditional-formatting rule over a range: formula relative to the range's
+    top-left cell, style applied where it is true ('TRUE' = whole range)
+    """
+    num_fmt = None
+    if number_format is not None:
+        num_fmt = NumberFormat(numFmtId=BUILTIN_FORMATS_REVERSE.get(number_format, 164),
+                               formatCode=number_format)
+    dxf = DifferentialStyle(font=font, fill=fill, border=border, numFmt=num_fmt)
+    ws.conditional_formatting.add(cell_range, Rule(type='expression', formula=[formula], dxf=dxf))
+
+
+def sheet_title(name: str, taken=()) -> str:
+    """Valid, unused sheet title (max 31 chars, no []:*?/\\); duplicates get ' (2)', ' (3)', ..."""
+    base = str(name).translate(_INVALID_TITLE).strip("' ")[:31] or 'Sheet'
+    title, number = base, 1
+    while title.upper() in {t.upper() for t in taken}:
+        number += 1
+        suffix = f' ({number})'
+        title = base[:31 - len(suffix)] + suffix
+    return title
+
+
+def sheet_parts(name: str, count: int, capacity: int, taken=()) -> List[Tuple[str, int, int]]:
+    """
+    Split count data rows over sheets of capacity rows each
+
+    Returns:
+        [(sheet title, start, stop)]: name, 'name (2)', 'name (3)', ...;
+        one sheet (the name itself) when the rows fit
+    """
+    if capacity < 1:
+        raise ValueError(f"Kapasitas sheet harus >= 1 baris, bukan {capacity}")
+    taken = list(taken)
+    parts = []
+    for start in range(0, max(count, 1), capacity):
+        title = sheet_title(name, taken)
+        taken.append(title)
+        parts.append((title, start, min(start + capacity, count)))
+    return parts
+
+
+def write_index(ws, entries: List[Dict]):
+    """
+    INDEX_SHEET rows: one row per data sheet (keys of INDEX_HEADERS, lower case with '_')
+
+    Readers use the Sheet and Kategori columns to put the parts of a category
+    back together (see gambar_reader).
+    """
+    ws.column_dimensions['A'].width = 34
+    ws.column_dimensions['B'].width = 14
+    ws.column_dimensions['C'].width = 14
+    ws.append(INDEX_HEADERS)
+    keys = [header.lower().replace(' ', '_') for header in INDEX_HEADERS]
+    for entry in entries:
+        ws.append([entry.get(key) for key in keys])
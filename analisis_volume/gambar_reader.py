@@ -0,0 +1,108 @@
+"""
+Gambar Workbook Reader
+Reads the category sheets of a Volume_dari_Gambar workbook in one pass and
+keeps the parsed frames in-process, so every component of a run asking for
+the same workbook and sheet gets the already parsed frame
+
+The cache key includes the file's modification time and size; a workbook
+saved again during the run is parsed again. A category written to several
+sheets (listed in the DAFTAR SHEET index, see excel_stream) is read as one
+frame.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+try:
+    from .excel_stream import INDEX_SHEET
+except ImportError:
+    from excel_stream import INDEX_SHEET
+
+
+# Sheets parsed when a workbook is opened
+GAMBAR_SHEETS = ['STRUKTUR', 'ARSITEKTUR', 'MEP']
+
+# Header row (0-based) of the template sheets: rows 1-4 are title and project info
+GAMBAR_HEADER = 4
+
+# (path, mtime, size, header) -> {sheet: DataFrame or the exception raised for it}
+_parsed: Dict[Tuple[str, int, int, int], Dict[str, object]] = {}
+
+
+def _key(path: str, header: int) -> Tuple[str, int, int, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size, header
+
+
+def sheet_index(workbook: pd.ExcelFile) -> Dict[str, List[str]]:
+    """Sheets per category sheet from the index sheet ({} when the workbook has none)"""
+    if INDEX_SHEET not in workbook.sheet_names:
+        return {}
+    index = workbook.parse(INDEX_SHEET, dtype=str)
+    parts = {}
+    for sheet, kategori in zip(index['Sheet'], index['Kategori']):
+        parts.setdefault(kategori, []).append(sheet)
+    return parts
+
+
+def _parse_parts(workbook: pd.ExcelFile, sheets: List[str], header: int) -> pd.DataFrame:
+    """Sheets of one category as one frame, in item order (No)"""
+    frames = [workbook.parse(sheet, header=header) for sheet in sheets]
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    if 'No' in df.columns:
+        df = df.sort_values('No', kind='stable', ignore_index=True)
+    return df
+
+
+def load_gambar_sheets(path: str, header: int = GAMBAR_HEADER) -> Dict[str, object]:
+    """
+    Parse all GAMBAR_SHEETS of a workbook with a single open (cached)
+
+    Returns:
+        {sheet: DataFrame, or the exception of a sheet that could not be read}
+
+    Raises:
+        OSError: workbook does not exist
+    """
+    key = _key(path, header)
+    if key not in _parsed:
+        # Older parses of the same file are stale
+        for old in [k for k in _parsed if k[0] == key[0] and k[3] == header]:
+            del _parsed[old]
+
+        sheets = {}
+        with pd.ExcelFile(path) as workbook:
+            parts = sheet_index(workbook)
+            for sheet in GAMBAR_SHEETS:
+                try:
+                    sheets[sheet] = _parse_parts(workbook, parts.get(sheet, [sheet]), header)
+                except Exception as e:
+                    sheets[sheet] = e
+        _parsed[key] = sheets
+    return _parsed[key]
+
+
+def read_gambar_sheet(path: str, sheet: str, header: int = GAMBAR_HEADER) -> pd.DataFrame:
+    """
+    One sheet of a gambar workbook, from the in-process cache when already parsed
+
+    Returns a copy, callers may modify it freely.
+
+    Raises:
+        The error of reading that sheet (e.g. ValueError for a missing sheet)
+    """
+    if sheet not in GAMBAR_SHEETS:
+        return pd.read_excel(path, sheet_name=sheet, header=header)
+    frame = load_gambar_sheets(path, header)[sheet]
+    if isinstance(frame, Exception):
+        raise frame
+    return frame.copy()
+
+
+def clear_gambar_cache():
+    """Forget all parsed workbooks"""
+    _parsed.clear()
@@ -0,0 +1,111 @@
+"""
+Item Features for BOQ Matching
+Normalized text, specification sets and critical-material flag computed
+once per distinct item string and shared by all matchers
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet
+
+
+# Critical materials that must match accurately (VolumeComparator)
+CRITICAL_PATTERNS = (
+    'beton k-',           # Beton with K grade (K-225, K-300, K-350, etc)
+    'beton ready mix',   # Ready mix concrete
+    'beton fc',           # Beton with fc (concrete strength)
+    'besi diameter',      # Rebar with diameter
+    'besi d',             # Besi D10, D13, D16, etc
+    'besi ulir',          # Rebar (ulir)
+    'besi polos',         # Plain bar
+    'tulangan',           # Reinforcement
+    'wiremesh',           # Wire mesh
+    'kawat',              # Wire
+    'semen',              # Cement
+    'pasir',              # Sand
+    'split',              # Gravel
+    'keramik',            # Ceramic
+    'granit',             # Granite
+    'marmer',             # Marble
+    'pipa pvc',           # PVC pipe (with diameter/schedule)
+    'kabel nyyhy',        # Cable with specs
+    'kabel nyy',          # Cable NYY
+    'ac split',           # AC with BTU/PK
+    'pompa',              # Pump with capacity
+)
+
+# Key specs compared for critical materials (K-225, D13, 3x2.5mm, 1/2")
+KEY_SPEC_PATTERN = re.compile(r'k-?\d+|d\s*\d+|fc\s*\d+|\d+x\d+\.?\d*\s*mm|\d+/\d+"')
+
+# Material specifications extracted by StrukturAnalyzer
+SPEC_PATTERNS = {
+    'beton_grade': r'k-?\s*(\d+)',  # K-225, K-300, etc
+    'beton_fc': r'fc\s*(\d+)',       # fc 25, fc 30
+    'diameter_besi': r'd\s*(\d+)|diameter\s*(\d+)|ø\s*(\d+)',  # D13, diameter 16
+    'dimensi': r'(\d+\.?\d*)\s*x\s*(\d+\.?\d*)',  # 40x60, 30x40
+    'tebal': r't\s*=?\s*(\d+)|tebal\s*(\d+)',  # t=12, tebal 15
+    'panjang': r'p\s*=?\s*(\d+)|panjang\s*(\d+)',  # p=6000
+}
+
+_COMPILED_SPECS = [(name, re.compile(pattern)) for name, pattern in SPEC_PATTERNS.items()]
+
+
+class ItemFeatures:
+    """Precomputed matching features of one item string"""
+
+    __slots__ = ('text', 'lower', 'clean', 'is_critical', 'key_specs', '_specifications')
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text: Item description (already converted with str())
+        """
+        self.text = text
+        self.lower = text.lower()
+        self.clean = self.lower.strip()
+        self.is_critical = any(pattern in self.lower for pattern in CRITICAL_PATTERNS)
+        self.key_specs: FrozenSet[str] = frozenset(KEY_SPEC_PATTERN.findall(self.clean))
+        self._specifications = None
+
+    @property
+    def specifications(self) -> Dict[str, str]:
+        """StrukturAnalyzer specifications (computed on first use, do not mutate)"""
+        if self._specifications is None:
+            specs = {}
+            for spec_name, pattern in _COMPILED_SPECS:
+                match = pattern.search(self.lower)
+                if match:
+                    # Get the first non-None group
+                    value = next((g for g in match.groups() if g is not None), None)
+                    if value:
+                        specs[spec_name] = value
+            self._specifications = specs
+        return self._specifications
+
+    def __repr__(self):
+        return f"ItemFeatures({self.text!r})"
+
+
+@lru_cache(maxsize=65536)
+def _features_cached(text: str) -> ItemFeatures:
+    return ItemFeatures(text)
+
+
+def get_features(item) -> ItemFeatures:
+    """
+    Shared features of an item, computed once per distinct string
+
+    Args:
+        item: Item text (any value, converted with str()) or ItemFeatures
+
+    Returns:
+        ItemFeatures instance from the shared cache
+    """
+    if isinstance(item, ItemFeatures):
+        return item
+    return _features_cached(str(item))
+
+
+def features_cache_info():
+    """Hit/miss statistics of the shared feature cache"""
+    return _features_cached.cache_info()
@@ -0,0 +1,320 @@
+"""
+Match Decision Cache for BOQ Matching
+Persistent SQLite store of pair scores and chosen matches, so repeat
+comparisons only score item strings that are new or changed
+
+Tables:
+- scores: (matcher, gambar text, rab text) -> thresholded similarity
+- matches: (matcher, RAB list fingerprint, gambar text) -> chosen match (JSON)
+- states: (matcher, category, gambar/RAB list fingerprints) -> match_state of
+  one comparison (JSON), so the incremental rematch also runs across processes
+
+Texts are the normalized item strings (lowercase, stripped). The matcher
+key carries MATCHER_VERSION and the similarity backend, so entries of
+older matching rules are never read; they age out through prune().
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Sequence
+
+
+# Bump when matching rules or thresholds change (old entries are then ignored)
+MATCHER_VERSION = 1
+
+# Cache location: path in this environment variable, 'off' to bypass the cache
+CACHE_ENV = 'ANALISIS_VOLUME_CACHE'
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'analisis_volume', 'match_cache.sqlite')
+
+_DISABLED_VALUES = ('', '0', 'off', 'false', 'no')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    matcher TEXT NOT NULL,
+    gambar TEXT NOT NULL,
+    rab TEXT NOT NULL,
+    score REAL NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (matcher, gambar, rab)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS matches (
+    matcher TEXT NOT NULL,
+    rab_set TEXT NOT NULL,
+    gambar TEXT NOT NULL,
+    result TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (matcher, rab_set, gambar)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS states (
+    matcher TEXT NOT NULL,
+    category TEXT NOT NULL,
+    gambar_set TEXT NOT NULL,
+    rab_set TEXT NOT NULL,
+    state TEXT NOT NULL,
+    saved REAL NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (matcher, category, gambar_set, rab_set)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# SQLite host parameter limit is 999 on older builds
+_CHUNK = 900
+
+# Match states kept per (matcher, category), newest first
+STATE_KEEP = 4
+
+
+def _today() -> int:
+    """Current day number (entries are aged in whole days)"""
+    return int(time.time() // 86400)
+
+
+def fingerprint(texts: Iterable[str]) -> str:
+    """Stable hash of an ordered list of texts (identifies one RAB item list)"""
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+class MatchCache:
+    """
+    SQLite-backed cache of pair scores, chosen matches and match states
+
+    Reads go straight to the database; writes and "last used" updates are
+    buffered and written in one transaction by flush(). The connection is
+    opened lazily and is not pickled, so an instance can be handed to
+    worker processes (each opens its own connection).
+
+    Eviction: entries not used for max_age_days are deleted, and the oldest
+    entries beyond max_entries per table; the file is vacuumed when a large
+    part was deleted. prune() runs automatically at most once a day.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_days: int = 90,
+                 max_entries: int = 2_000_000):
+        """
+        Args:
+            path: SQLite file (None = DEFAULT_CACHE_PATH, ':memory:' for a private cache)
+            max_age_days: Entries unused for longer than this are evicted
+            max_entries: Maximum rows kept per table (oldest evicted first)
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self._connection = None
+        self._pending_scores = {}
+        self._pending_matches = {}
+        self._pending_states = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pending_scores'] = {}
+        state['_pending_matches'] = {}
+        state['_pending_states'] = {}
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            if self.path != ':memory:':
+                connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+
+            row = connection.execute("SELECT value FROM meta WHERE key = 'pruned'").fetchone()
+            if row is None or int(row[0]) < _today():
+                self.prune()
+        return self._connection
+
+    def get_scores(self, matcher: str, gambar: str) -> Dict[str, float]:
+        """Cached scores of one gambar text: {rab text: score}"""
+        rows = self._connect().execute(
+            'SELECT rab, score, used FROM scores WHERE matcher = ? AND gambar = ?', (matcher, gambar)
+        ).fetchall()
+        today = _today()
+        scores = {}
+        for rab, score, used in rows:
+            scores[rab] = score
+            if used < today:
+                self._pending_scores.setdefault((matcher, gambar, rab), score)
+        return scores
+
+    def put_scores(self, matcher: str, gambar: str, scores: Dict[str, float]):
+        """Buffer new scores of one gambar text (written by flush)"""
+        for rab, score in scores.items():
+            self._pending_scores[(matcher, gambar, rab)] = float(score)
+
+    def get_matches(self, matcher: str, rab_set: str, texts: Sequence[str]) -> Dict[str, object]:
+        """Cached chosen matches of gambar texts against one RAB list: {text: result}"""
+        connection = self._connect()
+        today = _today()
+        found = {}
+        unique = list(dict.fromkeys(texts))
+        for start in range(0, len(unique), _CHUNK):
+            chunk = unique[start:start + _CHUNK]
+            rows = connection.execute(
+                'SELECT gambar, result, used FROM matches WHERE matcher = ? AND rab_set = ? '
+                f"AND gambar IN ({','.join('?' * len(chunk))})",
+                [matcher, rab_set, *chunk]
+            ).fetchall()
+            for gambar, result, used in rows:
+                found[gambar] = json.loads(result)
+                if used < today:
+                    self._pending_matches.setdefault((matcher, rab_set, gambar), result)
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def put_matches(self, matcher: str, rab_set: str, results: Dict[str, object]):
+        """Buffer chosen matches (JSON-serializable results, written by flush)"""
+        for gambar, result in results.items():
+            self._pending_matches[(matcher, rab_set, gambar)] = json.dumps(result)
+
+    def get_state(self, matcher: str, category: str, gambar_set: str, rab_set: str) -> Optional[Dict]:
+        """
+        Stored match_state of a category (JSON object, see put_state)
+
+        The state of the same gambar and RAB lists is preferred, then the same
+        RAB list, then the newest one: any earlier state is a valid starting
+        point for the incremental rematch, a closer one only leaves less to score.
+        """
+        row = self._connect().execute(
+            'SELECT gambar_set, rab_set, state FROM states WHERE matcher = ? AND category = ? '
+            'ORDER BY rab_set = ? DESC, gambar_set = ? DESC, saved DESC LIMIT 1',
+            (matcher, category, rab_set, gambar_set)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            state = json.loads(row[2])
+        except ValueError:
+            return None
+        if not isinstance(state, dict):
+            return None
+        self._pending_states.setdefault((matcher, category, row[0], row[1]), None)
+        return state
+
+    def put_state(self, matcher: str, category: str, gambar_set: str, rab_set: str, state: Dict):
+        """Buffer the match_state of a category (JSON-serializable dict, written by flush)"""
+        self._pending_states[(matcher, category, gambar_set, rab_set)] = json.dumps(state)
+
+    def flush(self):
+        """Write buffered entries and "last used" days in one transaction"""
+        if not self._pending_scores and not self._pending_matches and not self._pending_states:
+            return
+        today = _today()
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)',
+                [(*key, score, today) for key, score in self._pending_scores.items()]
+            )
+            connection.executemany(
+                'INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?)',
+                [(*key, result, today) for key, result in self._pending_matches.items()]
+            )
+            for key, state in self._pending_states.items():
+                if state is None:
+                    connection.execute(
+                        'UPDATE states SET used = ? WHERE matcher = ? AND category = ? '
+                        'AND gambar_set = ? AND rab_set = ?', (today, *key)
+                    )
+                    continue
+                connection.execute('INSERT OR REPLACE INTO states VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   (*key, state, time.time(), today))
+                connection.execute(
+                    'DELETE FROM states WHERE matcher = ? AND category = ? AND saved < '
+                    '(SELECT MIN(saved) FROM (SELECT saved FROM states WHERE matcher = ? AND category = ? '
+                    'ORDER BY saved DESC LIMIT ?))',
+                    (key[0], key[1], key[0], key[1], STATE_KEEP)
+                )
+        self._pending_scores = {}
+        self._pending_matches = {}
+        self._pending_states = {}
+
+    def prune(self) -> int:
+        """
+        Evict old entries and vacuum when a large part of the file was freed
+
+        Returns:
+            Number of deleted rows
+        """
+        connection = self._connect()
+        cutoff = _today() - self.max_age_days
+        deleted = 0
+        total = 0
+        with connection:
+            for table, key in (('scores', 'matcher, gambar, rab'), ('matches', 'matcher, rab_set, gambar'),
+                               ('states', 'matcher, category, gambar_set, rab_set')):
+                deleted += connection.execute(f'DELETE FROM {table} WHERE used < ?', (cutoff,)).rowcount
+                count = connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                if count > self.max_entries:
+                    # Least recently used first
+                    deleted += connection.execute(
+                        f'DELETE FROM {table} WHERE ({key}) IN '
+                        f'(SELECT {key} FROM {table} ORDER BY used LIMIT ?)',
+                        (count - self.max_entries,)
+                    ).rowcount
+                    count = self.max_entries
+                total += count
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('pruned', ?)", (str(_today()),))
+
+        if deleted and deleted > total // 4:
+            connection.execute('VACUUM')
+        return deleted
+
+    def clear(self):
+        """Delete every entry"""
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM scores')
+            connection.execute('DELETE FROM matches')
+            connection.execute('DELETE FROM states')
+        connection.execute('VACUUM')
+        self._pending_scores = {}
+        self._pending_matches = {}
+        self._pending_states = {}
+
+    def close(self):
+        """Flush and close the connection"""
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def resolve_cache(match_cache=None) -> Optional[MatchCache]:
+    """
+    Resolve the match_cache argument of the comparators
+
+    Args:
+        match_cache: None (default cache, or CACHE_ENV), False (bypass),
+            a file path, or a MatchCache instance
+
+    Returns:
+        MatchCache or None when caching is bypassed
+    """
+    if match_cache is False:
+        return None
+    if isinstance(match_cache, MatchCache):
+        return match_cache
+    if match_cache is None or match_cache is True:
+        path = os.environ.get(CACHE_ENV)
+        if path is not None and path.strip().lower() in _DISABLED_VALUES:
+            return None
+        return MatchCache(path or None)
+    return MatchCache(str(match_cache))
@@ -0,0 +1,200 @@
+"""
+Candidate Index for BOQ Item Matching
+Inverted index of tokens and character trigrams with TF-IDF weights,
+used to pick the few RAB rows worth scoring for each gambar item
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_item(text) -> str:
+    """Normalize item text the same way the matchers do (lowercase, stripped)"""
+    return str(text).lower().strip()
+
+
+def char_trigrams(text: str) -> List[str]:
+    """Character trigrams of a normalized text (no padding, so substrings share all grams)"""
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+class CharCountIndex:
+    """
+    Character count matrix (rows x alphabet) of item texts
+
+    Gives, for every row, an upper bound of the SequenceMatcher ratio (and of
+    the indel ratio) against a query: 2 * |common character multiset| /
+    (len(query) + len(row)), the same bound as difflib's quick_ratio.
+    """
+
+    def __init__(self, texts: Sequence):
+        """
+        Args:
+            texts: Item texts (row order is kept)
+        """
+        self.texts = [normalize_item(t) for t in texts]
+        self.size = len(self.texts)
+
+        alphabet = sorted(set(''.join(self.texts)))
+        self._char_columns = {ch: col for col, ch in enumerate(alphabet)}
+        self._char_counts = np.zeros((self.size, len(alphabet)), dtype=np.int32)
+        for row, text in enumerate(self.texts):
+            for ch, count in Counter(text).items():
+                self._char_counts[row, self._char_columns[ch]] = count
+        self._lengths = np.array([len(t) for t in self.texts], dtype=np.int64)
+
+    def ratio_upper_bounds(self, text) -> np.ndarray:
+        """
+        Upper bound of the SequenceMatcher ratio of the query against every row
+
+        Args:
+            text: Query item text
+
+        Returns:
+            Float array with one bound per row
+        """
+        query = normalize_item(text)
+        counts = Counter(query)
+
+        columns = [self._char_columns[ch] for ch in counts if ch in self._char_columns]
+        if columns:
+            wanted = np.array([counts[ch] for ch in counts if ch in self._char_columns], dtype=np.int32)
+            common = np.minimum(self._char_counts[:, columns], wanted).sum(axis=1)
+        else:
+            common = np.zeros(self.size, dtype=np.int64)
+
+        total = self._lengths + len(query)
+        bounds = np.ones(self.size)
+        nonempty = total > 0
+        bounds[nonempty] = 2.0 * common[nonempty] / total[nonempty]
+        return bounds
+
+
+class CandidateIndex:
+    """
+    TF-IDF weighted inverted index over item texts (tokens + char trigrams)
+
+    candidates() returns, in ascending row order:
+    - the top_k rows by cosine similarity of the TF-IDF vectors
+    - every row that can contain the query or be contained in it
+      (all distinct trigrams shared), so containment/exact matches are
+      never missed regardless of top_k
+
+    ratio_upper_bounds() gives, for every row, an upper bound of the
+    SequenceMatcher ratio against a query (character multiset overlap, like
+    difflib's quick_ratio). Matchers score the candidates first and then
+    only the remaining rows whose bound can still reach the best score, which
+    makes the result identical to a full scan. top_k=None disables the
+    cut-off (every row sharing a feature is returned).
+    """
+
+    def __init__(self, texts: Sequence, top_k: Optional[int] = 50):
+        """
+        Args:
+            texts: Item texts to index (row order is kept)
+            top_k: Number of best-ranked rows to return per query
+        """
+        self.texts = [normalize_item(t) for t in texts]
+        self.top_k = top_k
+        self.size = len(self.texts)
+
+        token_postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        gram_postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._gram_counts = np.zeros(self.size, dtype=np.int32)
+
+        for row, text in enumerate(self.texts):
+            for token, tf in Counter(_TOKEN_PATTERN.findall(text)).items():
+                token_postings[token][row] = tf
+            grams = Counter(char_trigrams(text))
+            self._gram_counts[row] = len(grams)
+            for gram, tf in grams.items():
+                gram_postings[gram][row] = tf
+
+        self._token_idf = self._idf(token_postings)
+        self._gram_idf = self._idf(gram_postings)
+
+        # Document vector norms over both feature kinds
+        norms = np.zeros(self.size)
+        for postings, idf in ((token_postings, self._token_idf), (gram_postings, self._gram_idf)):
+            for feature, docs in postings.items():
+                weight = idf[feature]
+                for row, tf in docs.items():
+                    norms[row] += (tf * weight) ** 2
+        norms = np.sqrt(norms)
+        norms[norms == 0] = 1.0
+
+        self._token_postings = self._freeze(token_postings, self._token_idf, norms)
+        self._gram_postings = self._freeze(gram_postings, self._gram_idf, norms)
+
+        # Character counts for ratio upper bounds
+        self._bounds = CharCountIndex(self.texts)
+
+    def _idf(self, postings: Dict[str, Dict[int, int]]) -> Dict[str, float]:
+        return {feature: math.log(1 + self.size / len(docs)) for feature, docs in postings.items()}
+
+    @staticmethod
+    def _freeze(postings: Dict[str, Dict[int, int]], idf: Dict[str, float], norms: np.ndarray) -> Dict:
+        """Convert postings to (rows, normalized weights) arrays"""
+        frozen = {}
+        for feature, docs in postings.items():
+            rows = np.fromiter(docs.keys(), dtype=np.int32, count=len(docs))
+            tfs = np.fromiter(docs.values(), dtype=float, count=len(docs))
+            frozen[feature] = (rows, tfs * idf[feature] / norms[rows])
+        return frozen
+
+    def candidates(self, text) -> List[int]:
+        """
+        Candidate rows for one query text, in ascending row order
+
+        Args:
+            text: Query item text (normalized like the indexed texts)
+
+        Returns:
+            List of row positions to score
+        """
+        if self.size == 0:
+            return []
+
+        query = normalize_item(text)
+        query_grams = Counter(char_trigrams(query))
+
+        # Containment: every distinct query gram present in the row, or the reverse
+        gram_rows = [self._gram_postings[g][0] for g in query_grams if g in self._gram_postings]
+        if gram_rows:
+            shared = np.bincount(np.concatenate(gram_rows), minlength=self.size)
+        else:
+            shared = np.zeros(self.size, dtype=np.int64)
+        selected = (shared == len(query_grams)) | (shared == self._gram_counts)
+
+        # TF-IDF cosine ranking
+        rows, weights = [], []
+        for postings, features in (
+            (self._token_postings, Counter(_TOKEN_PATTERN.findall(query))),
+            (self._gram_postings, query_grams),
+        ):
+            for feature, tf in features.items():
+                if feature in postings:
+                    feature_rows, feature_weights = postings[feature]
+                    rows.append(feature_rows)
+                    weights.append(feature_weights * tf)
+
+        if rows:
+            scores = np.bincount(np.concatenate(rows), weights=np.concatenate(weights), minlength=self.size)
+            if self.top_k is None or self.top_k >= self.size:
+                selected |= scores > 0
+            elif self.top_k > 0:
+                top = np.argpartition(-scores, self.top_k - 1)[:self.top_k]
+                selected[top[scores[top] > 0]] = True
+
+        return np.flatnonzero(selected).tolist()
+
+    def ratio_upper_bounds(self, text) -> np.ndarray:
+        """Upper bound of the SequenceMatcher ratio against every row (see CharCountIndex)"""
+        return self._bounds.ratio_upper_bounds(text)
@@ -0,0 +1,187 @@
+"""
+Modul untuk menyusun tabel BOQ dari text layer PDF
+Posisi fragmen teks satu halaman (pdf_text) dipetakan ke kolom
+no / item / volume / satuan / harga_satuan / jumlah berdasarkan header tabel
+
+Header boleh terdiri dari beberapa baris (mis. "HARGA SATUAN" di atas
+"(Rp.)"); fragmen header yang bertumpuk horizontal digabung menjadi satu
+kolom. Halaman tanpa header tabel (rekapitulasi, cover) dilewati.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .pdf_text import TextFragment, page_rows
+except ImportError:
+    from pdf_text import TextFragment, page_rows
+
+
+# Urutan kolom baris tabel yang dihasilkan page_table()
+TABLE_FIELDS = ['no', 'item', 'volume', 'satuan', 'harga_satuan', 'jumlah']
+
+NUMERIC_FIELDS = ('volume', 'harga_satuan', 'jumlah')
+
+# Kata yang boleh muncul di baris header tabel
+HEADER_WORDS = {
+    'no', 'nomor', 'uraian', 'pekerjaan', 'item', 'jenis', 'volume', 'vol', 'satuan', 'sat',
+    'unit', 'harga', 'jumlah', 'total', 'rp', 'description', 'qty', 'price', 'kode', 'keterangan',
+}
+
+# Pemetaan label header ke kolom, dicek berurutan ("HARGA SATUAN" = harga_satuan, bukan satuan)
+HEADER_RULES = [
+    ('harga_satuan', r'harga\s*/?\s*satuan|h\.\s*satuan|unit\s+price'),
+    ('jumlah', r'jumlah|total'),
+    ('volume', r'volume|\bvol\b|\bqty\b'),
+    ('satuan', r'satuan|\bunit\b|\bsat\b'),
+    ('item', r'uraian|pekerjaan|\bitem\b|jenis|description'),
+    ('no', r'\bno\b|nomor'),
+]
+
+# Penomoran di awal uraian: 1.2. / II / a. / b) / -
+_NUMBERING = re.compile(r'(\d+(\.\d+)*\.?|[IVXLC]+\.?|[A-Za-z][.)]|[-•*])')
+_NUMBER = re.compile(r'\(?-?\d[\d.,]*\)?')
+_CURRENCY = re.compile(r'rp\.?', re.IGNORECASE)
+
+
+def parse_number(text: str) -> Optional[float]:
+    """
+    Angka dari teks PDF, format Inggris (5,660,635.20) maupun Indonesia (5.660.635,20)
+
+    Returns:
+        float, atau None jika teks bukan angka
+    """
+    text = _CURRENCY.sub('', str(text)).replace(' ', '').strip()
+    if not _NUMBER.fullmatch(text):
+        return None
+    negative = text.startswith('(') or '-' in text
+    digits = text.strip('()-')
+
+    if ',' in digits and '.' in digits:
+        # Pemisah terakhir = desimal
+        decimal = ',' if digits.rfind(',') > digits.rfind('.') else '.'
+        thousands = '.' if decimal == ',' else ','
+        digits = digits.replace(thousands, '').replace(decimal, '.')
+    elif ',' in digits or '.' in digits:
+        sep = ',' if ',' in digits else '.'
+        whole, _, fraction = digits.rpartition(sep)
+        if digits.count(sep) > 1 or (len(fraction) == 3 and whole.strip('0')):
+            # 1,000 / 1.000.000 = ribuan
+            digits = digits.replace(sep, '')
+        else:
+            digits = digits.replace(sep, '.')
+
+    try:
+        value = float(digits)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def _is_header_row(row: List[TextFragment]) -> bool:
+    words = re.findall(r'[a-z]+', ' '.join(f.text for f in row).lower())
+    return bool(words) and all(word in HEADER_WORDS for word in words)
+
+
+def _header_field(label: str) -> Optional[str]:
+    for field, pattern in HEADER_RULES:
+        if re.search(pattern, label):
+            return field
+    return None
+
+
+def find_header(rows: List[List[TextFragment]]) -> Optional[Tuple[int, Dict[str, Tuple[float, float]]]]:
+    """
+    Cari header tabel
+
+    Baris header memuat 'uraian' (atau 'pekerjaan'/'item') dan bersama baris
+    header di atas/bawahnya memuat 'volume' atau 'satuan'.
+
+    Returns:
+        (indeks baris data pertama, {kolom: (x awal, x akhir)}) atau None
+    """
+    for index, row in enumerate(rows):
+        if not _is_header_row(row):
+            continue
+        text = ' '.join(f.text for f in row).lower()
+        if not re.search(r'uraian|pekerjaan|\bitem\b|description', text):
+            continue
+
+        size = max(f.size for f in row)
+        first = last = index
+        while first > 0 and _is_header_row(rows[first - 1]) and rows[first - 1][0].y - rows[first][0].y < 2.5 * size:
+            first -= 1
+        while last + 1 < len(rows) and _is_header_row(rows[last + 1]) and rows[last][0].y - rows[last + 1][0].y < 2.5 * size:
+            last += 1
+
+        # Fragmen header yang bertumpuk horizontal = satu kolom
+        groups: List[List[TextFragment]] = []
+        for fragment in sorted((f for r in rows[first:last + 1] for f in r), key=lambda f: f.x):
+            if groups and fragment.x < max(f.x_end for f in groups[-1]):
+                groups[-1].append(fragment)
+            else:
+                groups.append([fragment])
+
+        columns = {}
+        for group in groups:
+            label = ' '.join(f.text for f in sorted(group, key=lambda f: -f.y)).lower()
+            field = _header_field(label)
+            if field is not None and field not in columns:
+                columns[field] = (min(f.x for f in group), max(f.x_end for f in group))
+
+        if 'item' in columns and ('volume' in columns or 'satuan' in columns):
+            return last + 1, columns
+    return None
+
+
+def page_table(fragments: List[TextFragment]) -> Tuple[Dict[str, int], List[List]]:
+    """
+    Susun baris tabel satu halaman
+
+    - Fragmen yang mulai di kiri batas kolom uraian: penomoran di depan
+      menjadi 'no', sisanya digabung menjadi 'item'
+    - Angka di kanan: kolom numerik dengan tepi kanan header terdekat
+      (angka rata kanan)
+    - Teks lain di kanan: 'satuan'
+
+    Returns:
+        (col_mapping {kolom: posisi di TABLE_FIELDS}, baris berisi nilai per kolom);
+        ({}, []) jika halaman tidak punya header tabel
+    """
+    rows = page_rows(fragments)
+    header = find_header(rows)
+    if header is None:
+        return {}, []
+    start, columns = header
+    col_mapping = {field: pos for pos, field in enumerate(TABLE_FIELDS) if field in columns}
+
+    item_end = columns['item'][1]
+    right_of_item = [x0 for x0, _ in columns.values() if x0 > item_end]
+    boundary = (item_end + min(right_of_item)) / 2 if right_of_item else float('inf')
+    numeric = [field for field in NUMERIC_FIELDS if field in columns]
+
+    table = []
+    for row in rows[start:]:
+        values: List = [None] * len(TABLE_FIELDS)
+        numbering, words, units = [], [], []
+        for fragment in row:
+            text = fragment.text.strip()
+            if fragment.x < boundary:
+                if not words and _NUMBERING.fullmatch(text):
+                    numbering.append(text)
+                else:
+                    words.append(text)
+                continue
+            number = parse_number(text)
+            if number is not None and numeric:
+                field = min(numeric, key=lambda f: abs(columns[f][1] - fragment.x_end))
+                values[TABLE_FIELDS.index(field)] = number
+            elif not _CURRENCY.fullmatch(text) and 'satuan' in columns:
+                units.append(text)
+
+        values[0] = ' '.join(numbering) or None
+        values[1] = ' '.join(words) or None
+        values[3] = ' '.join(units) or None
+        if any(value is not None for value in values):
+            table.append(values)
+    return col_mapping, table
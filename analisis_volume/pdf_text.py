@@ -0,0 +1,676 @@
+"""
+PDF Text Layer Reader
+Minimal PDF parser (standard library only) that returns the positioned
+text fragments of each page, enough to rebuild tables of PDF exports of
+Excel BOQ workbooks
+
+Supported: classic and compressed (object stream) cross references,
+FlateDecode content streams, simple fonts (WinAnsi/Standard/Differences)
+and fonts with a ToUnicode CMap. Scanned pages (images only) have no text
+layer and yield no fragments.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+
+class PdfName(str):
+    """PDF name object (/Name without the slash)"""
+
+
+class PdfRef:
+    """Indirect reference 'n g R'"""
+
+    __slots__ = ('num', 'gen')
+
+    def __init__(self, num: int, gen: int):
+        self.num = num
+        self.gen = gen
+
+    def __repr__(self):
+        return f"PdfRef({self.num}, {self.gen})"
+
+
+class PdfStream:
+    """Stream object: dictionary + raw (still encoded) bytes"""
+
+    __slots__ = ('dict', 'raw')
+
+    def __init__(self, dictionary: Dict, raw: bytes):
+        self.dict = dictionary
+        self.raw = raw
+
+
+class PdfOperator(str):
+    """Content stream operator (Tj, Tm, BT, ...)"""
+
+
+_WHITESPACE = b' \t\r\n\x0c\x00'
+_DELIMITERS = b'()<>[]{}/%'
+_NUMBER = re.compile(rb'[+-]?(\d+\.?\d*|\.\d+)')
+_OBJ_HEADER = re.compile(rb'(\d+)\s+(\d+)\s+obj\b')
+_REF_TAIL = re.compile(rb'\s+(\d+)\s+R\b')
+
+_ESCAPES = {
+    ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('f'): b'\f',
+    ord('('): b'(', ord(')'): b')', ord('\\'): b'\\',
+}
+
+
+class _Lexer:
+    """Tokenizer for PDF objects and content streams"""
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def skip_space(self):
+        data = self.data
+        while self.pos < len(data):
+            ch = data[self.pos]
+            if ch in _WHITESPACE:
+                self.pos += 1
+            elif ch == ord('%'):
+                end = data.find(b'\n', self.pos)
+                self.pos = len(data) if end < 0 else end + 1
+            else:
+                break
+
+    def next_object(self, operators: bool = False):
+        """Parse the next object; bare keywords become PdfOperator when operators=True"""
+        self.skip_space()
+        data = self.data
+        if self.pos >= len(data):
+            raise EOFError
+        ch = data[self.pos:self.pos + 1]
+
+        if ch == b'/':
+            end = self._token_end(self.pos + 1)
+            name = data[self.pos + 1:end]
+            self.pos = end
+            return PdfName(re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]), name)
+                           .decode('latin-1'))
+        if ch == b'(':
+            return self._literal_string()
+        if ch == b'<':
+            if data[self.pos + 1:self.pos + 2] == b'<':
+                return self._dictionary(operators)
+            end = data.index(b'>', self.pos)
+            digits = re.sub(rb'\s', b'', data[self.pos + 1:end])
+            self.pos = end + 1
+            if len(digits) % 2:
+                digits += b'0'
+            return bytes.fromhex(digits.decode('ascii'))
+        if ch == b'[':
+            self.pos += 1
+            items = []
+            while True:
+                self.skip_space()
+                if data[self.pos:self.pos + 1] == b']':
+                    self.pos += 1
+                    return items
+                items.append(self.next_object(operators))
+        if ch in (b']', b'>', b')', b'{', b'}'):
+            self.pos += 1
+            return PdfOperator(ch.decode('latin-1'))
+
+        match = _NUMBER.match(data, self.pos)
+        if match and self._token_end(self.pos) == match.end():
+            self.pos = match.end()
+            text = match.group(0)
+            if b'.' in text:
+                return float(text)
+            number = int(text)
+            if not operators:
+                # Indirect reference 'n g R'
+                ref = _REF_TAIL.match(data, self.pos)
+                if ref:
+                    self.pos = ref.end()
+                    return PdfRef(number, int(ref.group(1)))
+            return number
+
+        end = self._token_end(self.pos)
+        word = data[self.pos:end].decode('latin-1')
+        self.pos = max(end, self.pos + 1)
+        if word == 'true':
+            return True
+        if word == 'false':
+            return False
+        if word == 'null':
+            return None
+        return PdfOperator(word)
+
+    def _token_end(self, pos: int) -> int:
+        data = self.data
+        while pos < len(data) and data[pos] not in _WHITESPACE and data[pos] not in _DELIMITERS:
+            pos += 1
+        return pos
+
+    def _literal_string(self) -> bytes:
+        data = self.data
+        pos = self.pos + 1
+        depth = 1
+        out = bytearray()
+        while pos < len(data):
+            ch = data[pos]
+            if ch == ord('\\'):
+                nxt = data[pos + 1]
+                if nxt in _ESCAPES:
+                    out += _ESCAPES[nxt]
+                    pos += 2
+                elif ord('0') <= nxt <= ord('7'):
+                    octal = re.compile(rb'[0-7]{1,3}').match(data, pos + 1).group(0)
+                    out.append(int(octal, 8) & 0xFF)
+                    pos += 1 + len(octal)
+                elif nxt in b'\r\n':
+                    pos += 2
+                    if nxt == ord('\r') and data[pos:pos + 1] == b'\n':
+                        pos += 1
+                else:
+                    out.append(nxt)
+                    pos += 2
+                continue
+            if ch == ord('('):
+                depth += 1
+            elif ch == ord(')'):
+                depth -= 1
+                if depth == 0:
+                    self.pos = pos + 1
+                    return bytes(out)
+            out.append(ch)
+            pos += 1
+        self.pos = pos
+        return bytes(out)
+
+    def _dictionary(self, operators: bool) -> Dict:
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_space()
+            if self.data[self.pos:self.pos + 2] == b'>>':
+                self.pos += 2
+                return result
+            key = self.next_object(operators)
+            result[str(key)] = self.next_object(operators)
+
+
+# Glyph names of /Differences arrays that differ from their cp1252 byte
+_GLYPHS = {
+    'space': ' ', 'bullet': '•', 'endash': '–', 'emdash': '—', 'quoteleft': '‘', 'quoteright': '’',
+    'quotedblleft': '“', 'quotedblright': '”', 'degree': '°', 'multiply': '×', 'minus': '-',
+    'plusminus': '±', 'twosuperior': '²', 'threesuperior': '³', 'mu': 'µ', 'oslash': 'ø', 'Oslash': 'Ø',
+}
+
+
+class _Font:
+    """Decoding and glyph widths of one font resource"""
+
+    def __init__(self, pdf: 'PdfDocument', font: Dict):
+        self.two_byte = font.get('Subtype') == 'Type0'
+        self.cmap: Dict[int, str] = {}
+        self.differences: Dict[int, str] = {}
+        self.widths: Dict[int, float] = {}
+        self.default_width = 500.0
+
+        to_unicode = pdf.resolve(font.get('ToUnicode'))
+        if isinstance(to_unicode, PdfStream):
+            self._parse_cmap(pdf.stream_data(to_unicode))
+
+        encoding = pdf.resolve(font.get('Encoding'))
+        if isinstance(encoding, dict):
+            code = 0
+            for item in pdf.resolve(encoding.get('Differences')) or []:
+                if isinstance(item, int):
+                    code = item
+                else:
+                    name = str(item)
+                    self.differences[code] = _GLYPHS.get(name, name if len(name) == 1 else '')
+                    code += 1
+
+        if self.two_byte:
+            descendant = pdf.resolve((pdf.resolve(font.get('DescendantFonts')) or [None])[0]) or {}
+            self.default_width = float(descendant.get('DW', 1000))
+            widths = pdf.resolve(descendant.get('W')) or []
+            i = 0
+            while i + 1 < len(widths):
+                first, second = widths[i], pdf.resolve(widths[i + 1])
+                if isinstance(second, list):
+                    for offset, width in enumerate(second):
+                        self.widths[first + offset] = float(width)
+                    i += 2
+                else:
+                    for code in range(first, second + 1):
+                        self.widths[code] = float(pdf.resolve(widths[i + 2]))
+                    i += 3
+        else:
+            first_char = font.get('FirstChar', 0)
+            for offset, width in enumerate(pdf.resolve(font.get('Widths')) or []):
+                self.widths[first_char + offset] = float(pdf.resolve(width))
+
+    def _parse_cmap(self, data: bytes):
+        text = data.decode('latin-1')
+        for block in re.findall(r'beginbfchar(.*?)endbfchar', text, re.S):
+            for src, dst in re.findall(r'<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>', block):
+                self.cmap[int(src, 16)] = _utf16(dst)
+        for block in re.findall(r'beginbfrange(.*?)endbfrange', text, re.S):
+            for start, end, dst in re.findall(r'<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f]*>|\[[^\]]*\])', block):
+                start, end = int(start, 16), int(end, 16)
+                if dst.startswith('['):
+                    for offset, item in enumerate(re.findall(r'<([0-9A-Fa-f]*)>', dst)):
+                        self.cmap[start + offset] = _utf16(item)
+                else:
+                    base = int(dst[1:-1] or '0', 16)
+                    for code in range(start, min(end, start + 0xFFFF) + 1):
+                        self.cmap[code] = chr(base + code - start) if base + code - start < 0x110000 else ''
+
+    def codes(self, data: bytes) -> List[int]:
+        if self.two_byte:
+            return [(data[i] << 8) | data[i + 1] for i in range(0, len(data) - 1, 2)]
+        return list(data)
+
+    def decode(self, data: bytes) -> str:
+        chars = []
+        for code in self.codes(data):
+            if code in self.cmap:
+                chars.append(self.cmap[code])
+            elif code in self.differences:
+                chars.append(self.differences[code])
+            elif not self.two_byte:
+                chars.append(bytes([code]).decode('cp1252', errors='replace'))
+        return ''.join(chars)
+
+    def width(self, data: bytes) -> float:
+        """Advance of a string in text space units (x1000)"""
+        return sum(self.widths.get(code, self.default_width) for code in self.codes(data))
+
+
+def _utf16(hex_digits: str) -> str:
+    raw = bytes.fromhex(hex_digits)
+    try:
+        return raw.decode('utf-16-be')
+    except UnicodeDecodeError:
+        return ''
+
+
+def _multiply(a: Tuple, b: Tuple) -> Tuple:
+    """Product of two PDF matrices (a, b, c, d, e, f)"""
+    return (
+        a[0] * b[0] + a[1] * b[2], a[0] * b[1] + a[1] * b[3],
+        a[2] * b[0] + a[3] * b[2], a[2] * b[1] + a[3] * b[3],
+        a[4] * b[0] + a[5] * b[2] + b[4], a[4] * b[1] + a[5] * b[3] + b[5],
+    )
+
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# Font keys that do not change the decoded text (embedded glyph programs, back links)
+_DIGEST_SKIP = ('FontFile', 'FontFile2', 'FontFile3', 'Parent')
+
+# TJ adjustments below this (thousandths of an em) are rendered as a word gap
+_TJ_SPACE = -200
+
+
+class TextFragment:
+    """One shown string with its start position (page space, origin bottom-left)"""
+
+    __slots__ = ('x', 'y', 'x_end', 'size', 'text')
+
+    def __init__(self, x: float, y: float, x_end: float, size: float, text: str):
+        self.x = x
+        self.y = y
+        self.x_end = x_end
+        self.size = size
+        self.text = text
+
+    def __repr__(self):
+        return f"TextFragment({self.x:.1f}, {self.y:.1f}, {self.text!r})"
+
+
+class PdfDocument:
+    """
+    Objects, pages and text fragments of one PDF file
+
+    Objects are located by scanning the file body (stream data is skipped
+    using its /Length), which also recovers files with a damaged xref.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Args:
+            data: Complete PDF file content
+        """
+        self.data = data
+        self.objects: Dict[int, object] = {}
+        self._offsets: Dict[int, int] = {}
+        self._compressed: Dict[int, Tuple[bytes, int]] = {}
+        self._index_objects()
+        self.pages = self._collect_pages()
+
+    @classmethod
+    def open(cls, path: str) -> 'PdfDocument':
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    # ----- objects -------------------------------------------------------
+
+    def _index_objects(self):
+        data = self.data
+        pos = 0
+        while True:
+            match = _OBJ_HEADER.search(data, pos)
+            if not match:
+                break
+            self._offsets[int(match.group(1))] = match.end()
+            pos = self._skip_object(match.end())
+
+        # Objects stored inside object streams (parsed on first use)
+        for num in list(self._offsets):
+            if self.data.find(b'/ObjStm', self._offsets[num], self._offsets[num] + 200) < 0:
+                continue
+            obj = self.resolve(PdfRef(num, 0))
+            if isinstance(obj, PdfStream) and obj.dict.get('Type') == 'ObjStm':
+                self._index_object_stream(obj)
+
+    def _skip_object(self, pos: int) -> int:
+        """Position after the object starting at pos (stream data skipped)"""
+        stream_at = self.data.find(b'stream', pos)
+        end_at = self.data.find(b'endobj', pos)
+        if end_at < 0:
+            return len(self.data)
+        if 0 <= stream_at < end_at:
+            end_stream = self.data.find(b'endstream', stream_at)
+            if end_stream >= 0:
+                end_at = self.data.find(b'endobj', end_stream)
+                return len(self.data) if end_at < 0 else end_at + 6
+        return end_at + 6
+
+    def _index_object_stream(self, stream: PdfStream):
+        data = self.stream_data(stream)
+        count = stream.dict.get('N', 0)
+        first = stream.dict.get('First', 0)
+        header = _Lexer(data)
+        entries = []
+        for _ in range(count):
+            entries.append((header.next_object(operators=True), header.next_object(operators=True)))
+        for num, offset in entries:
+            if num not in self._offsets:
+                self._compressed[num] = (data, first + offset)
+
+    def resolve(self, obj):
+        """Follow indirect references"""
+        while isinstance(obj, PdfRef):
+            num = obj.num
+            if num not in self.objects:
+                if num in self._offsets:
+                    self.objects[num] = self._parse_at(self._offsets[num])
+                elif num in self._compressed:
+                    data, offset = self._compressed[num]
+                    try:
+                        self.objects[num] = _Lexer(data, offset).next_object()
+                    except (EOFError, ValueError, IndexError):
+                        self.objects[num] = None
+                else:
+                    self.objects[num] = None
+            obj = self.objects[num]
+        return obj
+
+    def _parse_at(self, pos: int):
+        lexer = _Lexer(self.data, pos)
+        try:
+            value = lexer.next_object()
+        except (EOFError, ValueError, IndexError):
+            return None
+        if isinstance(value, dict):
+            lexer.skip_space()
+            if self.data.startswith(b'stream', lexer.pos):
+                start = lexer.pos + 6
+                if self.data[start:start + 2] == b'\r\n':
+                    start += 2
+                elif self.data[start:start + 1] in (b'\n', b'\r'):
+                    start += 1
+                length = value.get('Length')
+                length = self.resolve(length) if isinstance(length, PdfRef) else length
+                if not isinstance(length, int) or self.data[start + length:start + length + 20].find(b'endstream') < 0:
+                    length = self.data.find(b'endstream', start) - start
+                return PdfStream(value, self.data[start:start + length])
+        return value
+
+    def stream_data(self, stream: PdfStream) -> bytes:
+        """Decoded stream bytes (FlateDecode, PNG predictors ignored for content/object streams)"""
+        filters = self.resolve(stream.dict.get('Filter'))
+        if filters is None:
+            filters = []
+        elif not isinstance(filters, list):
+            filters = [filters]
+        data = stream.raw
+        for name in filters:
+            if name in ('FlateDecode', 'Fl'):
+                data = zlib.decompressobj().decompress(data)
+            else:
+                raise ValueError(f"Unsupported stream filter: {name}")
+        return data
+
+    # ----- pages ---------------------------------------------------------
+
+    def _catalog(self) -> Optional[Dict]:
+        """Document catalog: /Root of the (last) trailer or xref stream, else any Catalog object"""
+        for match in reversed(list(re.finditer(rb'/Root\s+(\d+)\s+(\d+)\s+R', self.data))):
+            catalog = self.resolve(PdfRef(int(match.group(1)), int(match.group(2))))
+            if isinstance(catalog, dict) and 'Pages' in catalog:
+                return catalog
+        for num in sorted(set(self._offsets) | set(self._compressed)):
+            obj = self.resolve(PdfRef(num, 0))
+            if isinstance(obj, dict) and obj.get('Type') == 'Catalog':
+                return obj
+        return None
+
+    def _collect_pages(self) -> List[Dict]:
+        catalog = self._catalog()
+        if catalog is None:
+            return []
+
+        pages = []
+
+        def walk(node, inherited):
+            node = self.resolve(node)
+            if not isinstance(node, dict):
+                return
+            attrs = dict(inherited)
+            for key in ('Resources', 'MediaBox'):
+                if key in node:
+                    attrs[key] = node[key]
+            if node.get('Type') == 'Pages' or 'Kids' in node:
+                for kid in self.resolve(node.get('Kids')) or []:
+                    walk(kid, attrs)
+            else:
+                page = dict(node)
+                page.update({k: v for k, v in attrs.items() if k not in node})
+                pages.append(page)
+
+        walk(catalog.get('Pages'), {})
+        return pages
+
+    def page_content(self, page_number: int) -> bytes:
+        """Concatenated, decoded content streams of a page (0-based)"""
+        contents = self.resolve(self.pages[page_number].get('Contents'))
+        if contents is None:
+            return b''
+        if not isinstance(contents, list):
+            contents = [contents]
+        return b'\n'.join(self.stream_data(self.resolve(c)) for c in contents)
+
+    def page_digest(self, page_number: int) -> str:
+        """
+        SHA-1 of everything the text of a page depends on: the decoded
+        content streams and the font resources (encodings, ToUnicode, widths)
+        """
+        digest = hashlib.sha1(self.page_content(page_number))
+        resources = self.resolve(self.pages[page_number].get('Resources')) or {}
+        self._feed_digest(resources.get('Font'), digest, set())
+        return digest.hexdigest()
+
+    def _feed_digest(self, obj, digest, seen: set):
+        if isinstance(obj, PdfRef):
+            if obj.num in seen:
+                digest.update(b'R%d;' % obj.num)
+                return
+            seen.add(obj.num)
+            obj = self.resolve(obj)
+        if isinstance(obj, PdfStream):
+            self._feed_digest(obj.dict, digest, seen)
+            digest.update(b'S%d:' % len(obj.raw) + obj.raw)
+        elif isinstance(obj, dict):
+            digest.update(b'<<')
+            for key in sorted(obj):
+                if key not in _DIGEST_SKIP:
+                    digest.update(key.encode('latin-1') + b'=')
+                    self._feed_digest(obj[key], digest, seen)
+            digest.update(b'>>')
+        elif isinstance(obj, list):
+            digest.update(b'[')
+            for item in obj:
+                self._feed_digest(item, digest, seen)
+            digest.update(b']')
+        else:
+            digest.update(repr(obj).encode('latin-1', 'replace') + b';')
+
+    def page_fragments(self, page_number: int) -> List[TextFragment]:
+        """Text fragments of a page (0-based), in content stream order"""
+        page = self.pages[page_number]
+        resources = self.resolve(page.get('Resources')) or {}
+        font_resources = self.resolve(resources.get('Font')) or {}
+        fonts: Dict[str, _Font] = {}
+
+        def font_for(name):
+            if name not in fonts:
+                font = self.resolve(font_resources.get(name))
+                fonts[name] = _Font(self, font) if isinstance(font, dict) else None
+            return fonts[name]
+
+        return _interpret(self.page_content(page_number), font_for)
+
+
+def _interpret(content: bytes, font_for) -> List[TextFragment]:
+    """Run the text operators of a content stream"""
+    fragments = []
+    operands = []
+    ctm = _IDENTITY
+    stack = []
+    tm = tlm = _IDENTITY
+    font = None
+    size = 0.0
+    leading = 0.0
+    char_spacing = word_spacing = 0.0
+    scale = 1.0
+
+    def show(strings):
+        nonlocal tm
+        if font is None:
+            return
+        matrix = _multiply(tm, ctm)
+        x, y = matrix[4], matrix[5]
+        parts = []
+        advance = 0.0
+        for item in strings:
+            if isinstance(item, (bytes, bytearray)):
+                parts.append(font.decode(item))
+                codes = font.codes(item)
+                spaces = sum(1 for code in codes if code == 32) if not font.two_byte else 0
+                advance += (font.width(item) / 1000.0 * size + char_spacing * len(codes)
+                            + word_spacing * spaces) * scale
+            elif isinstance(item, (int, float)):
+                if item <= _TJ_SPACE:
+                    parts.append(' ')
+                advance -= item / 1000.0 * size * scale
+        tm = _multiply((1.0, 0.0, 0.0, 1.0, advance, 0.0), tm)
+        x_end = _multiply(tm, ctm)[4]
+        text = ''.join(parts)
+        if text.strip():
+            fragments.append(TextFragment(x, y, x_end, size * abs(matrix[3] or matrix[0]) or size, text))
+
+    lexer = _Lexer(content)
+    while True:
+        try:
+            token = lexer.next_object(operators=True)
+        except EOFError:
+            break
+        except (ValueError, IndexError):
+            lexer.pos += 1
+            continue
+
+        if not isinstance(token, PdfOperator):
+            operands.append(token)
+            continue
+
+        op = str(token)
+        try:
+            if op == 'q':
+                stack.append(ctm)
+            elif op == 'Q':
+                ctm = stack.pop() if stack else _IDENTITY
+            elif op == 'cm' and len(operands) >= 6:
+                ctm = _multiply(tuple(float(v) for v in operands[-6:]), ctm)
+            elif op == 'BT':
+                tm = tlm = _IDENTITY
+            elif op == 'Tf' and len(operands) >= 2:
+                font = font_for(str(operands[-2]))
+                size = float(operands[-1])
+            elif op == 'Tc' and operands:
+                char_spacing = float(operands[-1])
+            elif op == 'Tw' and operands:
+                word_spacing = float(operands[-1])
+            elif op == 'Tz' and operands:
+                scale = float(operands[-1]) / 100.0
+            elif op == 'TL' and operands:
+                leading = float(operands[-1])
+            elif op == 'Tm' and len(operands) >= 6:
+                tm = tlm = tuple(float(v) for v in operands[-6:])
+            elif op in ('Td', 'TD') and len(operands) >= 2:
+                tx, ty = float(operands[-2]), float(operands[-1])
+                if op == 'TD':
+                    leading = -ty
+                tm = tlm = _multiply((1.0, 0.0, 0.0, 1.0, tx, ty), tlm)
+            elif op == 'T*':
+                tm = tlm = _multiply((1.0, 0.0, 0.0, 1.0, 0.0, -leading), tlm)
+            elif op == 'Tj' and operands:
+                show([operands[-1]])
+            elif op == 'TJ' and operands and isinstance(operands[-1], list):
+                show(operands[-1])
+            elif op in ("'", '"') and operands:
+                if op == '"' and len(operands) >= 3:
+                    word_spacing, char_spacing = float(operands[-3]), float(operands[-2])
+                tm = tlm = _multiply((1.0, 0.0, 0.0, 1.0, 0.0, -leading), tlm)
+                show([operands[-1]])
+            elif op == 'BI':
+                # Inline image: skip binary data up to EI
+                end = content.find(b'EI', lexer.pos)
+                lexer.pos = len(content) if end < 0 else end + 2
+        except (TypeError, ValueError):
+            pass
+        operands = []
+
+    return fragments
+
+
+def page_rows(fragments: List[TextFragment], tolerance: Optional[float] = None) -> List[List[TextFragment]]:
+    """
+    Group fragments into text rows (top to bottom, each row left to right)
+
+    Fragments belong to one row when their baselines differ by less than
+    tolerance (default: 40% of the median font size).
+    """
+    if not fragments:
+        return []
+    if tolerance is None:
+        sizes = sorted(f.size for f in fragments)
+        tolerance = max(sizes[len(sizes) // 2] * 0.4, 0.5)
+
+    rows: List[List[TextFragment]] = []
+    for fragment in sorted(fragments, key=lambda f: (-f.y, f.x)):
+        if rows and abs(rows[-1][0].y - fragment.y) < tolerance:
+            rows[-1].append(fragment)
+        else:
+            rows.append([fragment])
+    return [sorted(row, key=lambda f: f.x) for row in rows]
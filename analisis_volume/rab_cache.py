@@ -0,0 +1,159 @@
+"""
+Parsed RAB Cache
+Normalized RAB tables stored in a cache directory, keyed by workbook
+content hash, table kind and reader version, so unchanged BOQ workbooks
+are loaded without reparsing
+
+Tables are written as Parquet when a Parquet engine (pyarrow/fastparquet)
+is installed and the columns allow it, otherwise as pandas pickle.
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+from typing import Callable, Optional
+
+import pandas as pd
+
+
+# Cache directory: path in this environment variable, 'off' to bypass the cache
+CACHE_ENV = 'ANALISIS_VOLUME_RAB_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'analisis_volume', 'rab')
+
+_DISABLED_VALUES = ('', '0', 'off', 'false', 'no')
+
+_FORMATS = ('.parquet', '.pkl')
+
+
+def file_digest(path: str) -> str:
+    """SHA-1 of the file content"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parquet_available() -> bool:
+    """True if pandas can write Parquet (pyarrow or fastparquet installed)"""
+    return any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
+
+
+class RabCache:
+    """
+    Directory of parsed RAB tables
+
+    One file per (workbook content, kind, version). A changed workbook gets
+    a new hash and a changed reader a new version, so stale entries are
+    never read; remove old files with clear().
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Cache directory (None = DEFAULT_CACHE_DIR)
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+
+    def _base(self, digest: str, kind: str, version: int) -> str:
+        kind = re.sub(r'[^\w.-]+', '_', kind)
+        return os.path.join(self.directory, f"{digest}_{kind}_v{version}")
+
+    def load(self, path: str, kind: str, version: int) -> Optional[pd.DataFrame]:
+        """
+        Cached table of a workbook
+
+        Args:
+            path: Workbook path
+            kind: Table name (reader / sheet)
+            version: Reader version
+
+        Returns:
+            DataFrame, or None when not cached (or unreadable)
+        """
+        return self.load_digest(file_digest(path), kind, version)
+
+    def load_digest(self, digest: str, kind: str, version: int) -> Optional[pd.DataFrame]:
+        """Cached table keyed by a content hash computed by the caller (e.g. one PDF page)"""
+        base = self._base(digest, kind, version)
+        for ext in _FORMATS:
+            if os.path.exists(base + ext):
+                try:
+                    if ext == '.parquet':
+                        return pd.read_parquet(base + ext)
+                    return pd.read_pickle(base + ext)
+                except Exception:
+                    continue
+        return None
+
+    def store(self, path: str, kind: str, version: int, df: pd.DataFrame) -> str:
+        """
+        Store a parsed table (atomic replace, safe for parallel readers)
+
+        Returns:
+            Path of the written cache file
+        """
+        return self.store_digest(file_digest(path), kind, version, df)
+
+    def store_digest(self, digest: str, kind: str, version: int, df: pd.DataFrame) -> str:
+        """Store a table keyed by a content hash computed by the caller"""
+        os.makedirs(self.directory, exist_ok=True)
+        base = self._base(digest, kind, version)
+        tmp = f"{base}.{os.getpid()}.tmp"
+
+        if parquet_available():
+            try:
+                df.to_parquet(tmp)
+                os.replace(tmp, base + '.parquet')
+                return base + '.parquet'
+            except Exception:
+                # Mixed-type object columns, non-string labels, ...
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+        df.to_pickle(tmp, compression=None)
+        os.replace(tmp, base + '.pkl')
+        return base + '.pkl'
+
+    def cached(self, path: str, kind: str, version: int, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Load a table from the cache, or build and store it"""
+        df = self.load(path, kind, version)
+        if df is None:
+            df = build()
+            self.store(path, kind, version, df)
+        return df
+
+    def clear(self) -> int:
+        """Delete every cached table, returns number of removed files"""
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(_FORMATS):
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        return removed
+
+
+def resolve_rab_cache(rab_cache=None) -> Optional[RabCache]:
+    """
+    Resolve the rab_cache argument of the readers
+
+    Args:
+        rab_cache: None (default directory, or CACHE_ENV), False (bypass),
+            a directory path, or a RabCache instance
+
+    Returns:
+        RabCache or None when caching is bypassed
+    """
+    if rab_cache is False:
+        return None
+    if isinstance(rab_cache, RabCache):
+        return rab_cache
+    if rab_cache is None or rab_cache is True:
+        directory = os.environ.get(CACHE_ENV)
+        if directory is not None and directory.strip().lower() in _DISABLED_VALUES:
+            return None
+        return RabCache(directory or None)
+    return RabCache(str(rab_cache))
@@ -1,19 +1,103 @@
 """
 Modul untuk membaca file RAB Excel
 Ekstrak data volume, harga, dan item pekerjaan dari RAB yang sudah ada
+
+RAB PDF (ekspor BOQ dengan text layer) dibaca per halaman lewat
+pdf_text/pdf_table ke skema item yang sama.
 """
 
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from openpyxl import load_workbook
-from typing import Dict, List, Tuple
+from openpyxl.cell.cell import ERROR_CODES
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import os
 import re
 
+try:
+    from .rab_cache import resolve_rab_cache
+    from .pdf_text import PdfDocument
+    from .pdf_table import page_table
+except ImportError:
+    from rab_cache import resolve_rab_cache
+    from pdf_text import PdfDocument
+    from pdf_table import page_table
+
+
+# Versi parser; naikkan jika hasil ekstraksi berubah (cache RAB lama tidak dipakai)
+READER_VERSION = 2
+
+# Versi parser halaman PDF (cache per halaman)
+PDF_READER_VERSION = 1
+
+# Di bawah jumlah halaman (belum di-cache) ini PDF dibaca tanpa process pool
+PDF_PARALLEL_MIN_PAGES = 4
+
+# Kata kunci baris header RAB
+HEADER_KEYWORDS = ['no', 'uraian', 'pekerjaan', 'volume', 'satuan']
+
+# Kolom tabel item RAB
+ITEM_COLUMNS = ['sheet', 'no', 'item', 'volume', 'satuan', 'harga_satuan', 'jumlah', 'kategori']
+
+
+def _cell_value(value):
+    """Nilai sel seperti pandas membacanya: kosong/error = None, float bulat = int"""
+    if value is None or value == '' or (isinstance(value, str) and value in ERROR_CODES):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _cell_text(value) -> str:
+    """Teks sel (kosong = 'nan', sama dengan str() nilai kosong DataFrame)"""
+    return 'nan' if value is None else str(value)
+
+
+def page_label(page_number: int) -> str:
+    """Nama 'sheet' item dari halaman PDF (0-based)"""
+    return f"Halaman {page_number + 1}"
+
+
+# Dokumen PDF per proses worker (dibuka sekali per proses, bukan per halaman)
+_pdf_state = {}
+
+
+def _init_pdf_worker(filepath: str):
+    if _pdf_state.get('path') != filepath:
+        _pdf_state['path'] = filepath
+        _pdf_state['doc'] = PdfDocument.open(filepath)
+
+
+def _read_pdf_page(page_number: int) -> Tuple[int, List[Dict]]:
+    """Item RAB satu halaman PDF (dijalankan di worker atau inline)"""
+    reader = RABReader(_pdf_state['path'], rab_cache=False)
+    col_mapping, rows = page_table(_pdf_state['doc'].page_fragments(page_number))
+    items = []
+    for row in rows:
+        try:
+            item_data = reader.parse_row(row, col_mapping, page_label(page_number))
+        except Exception:
+            continue
+        if item_data is not None:
+            items.append(item_data)
+    return page_number, items
+
 
 class RABReader:
     """Class untuk membaca dan mengekstrak data dari file RAB Excel"""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, rab_cache=None, jobs: Optional[int] = None):
+        """
+        Args:
+            filepath: Path file RAB Excel (atau PDF)
+            rab_cache: Cache tabel RAB hasil parsing: None = cache default
+                (lihat rab_cache.CACHE_ENV), False = bypass, path folder, atau RabCache
+            jobs: Jumlah proses untuk halaman PDF (None = jumlah CPU, 1 = tanpa pool)
+        """
         self.filepath = filepath
+        self.rab_cache = resolve_rab_cache(rab_cache)
+        self.jobs = jobs
         self.data = {
             'struktur': [],
             'arsitektur': [],
@@ -61,91 +145,131 @@ class RABReader:
         except:
             return 0.0
     
-    def read_excel_generic(self) -> pd.DataFrame:
-        """Membaca Excel dengan pendekatan generic"""
-        print(f"\n→ Membaca file: {self.filepath}")
+    def map_columns(self, header: Sequence) -> Dict[str, int]:
+        """Petakan sel header ke posisi kolom (no, item, volume, satuan, harga_satuan, jumlah)"""
+        col_mapping = {}
+        for pos, cell in enumerate(header):
+            if cell is None:
+                continue
+            col_lower = str(cell).lower()
+            if any(k in col_lower for k in ['no', 'nomor']):
+                col_mapping['no'] = pos
+            elif any(k in col_lower for k in ['uraian', 'pekerjaan', 'item', 'jenis']):
+                col_mapping['item'] = pos
+            elif 'volume' in col_lower:
+                col_mapping['volume'] = pos
+            elif any(k in col_lower for k in ['satuan', 'unit']):
+                col_mapping['satuan'] = pos
+            elif any(k in col_lower for k in ['harga satuan', 'harga/satuan', 'h.satuan']):
+                col_mapping['harga_satuan'] = pos
+            elif any(k in col_lower for k in ['jumlah', 'total', 'harga total']):
+                col_mapping['jumlah'] = pos
+        return col_mapping
+    
+    def parse_row(self, row: Sequence, col_mapping: Dict[str, int], sheet_name: str) -> Optional[Dict]:
+        """Item RAB dari satu baris data, None jika baris dilewati (kosong, total, volume 0)"""
+        def cell(key):
+            pos = col_mapping.get(key)
+            if pos is None or pos >= len(row):
+                return None
+            return _cell_value(row[pos])
         
-        try:
-            # Try to read all sheets
-            excel_file = pd.ExcelFile(self.filepath)
-            print(f"  Sheets found: {excel_file.sheet_names}")
+        item = cell('item')
+        if item is None:
+            return None
+        item_name = str(item)
+        
+        # Skip rows that look like header/total
+        if any(k in item_name.lower() for k in ['total', 'jumlah', 'sub total', 'grand total']):
+            return None
+        
+        volume = self.clean_numeric_value(cell('volume'))
+        
+        # Skip if volume is 0 or nan
+        if volume == 0:
+            return None
+        
+        return {
+            'sheet': sheet_name,
+            'no': _cell_text(cell('no')) if 'no' in col_mapping else '',
+            'item': item_name,
+            'volume': volume,
+            'satuan': _cell_text(cell('satuan')) if 'satuan' in col_mapping else '',
+            'harga_satuan': self.clean_numeric_value(cell('harga_satuan')),
+            'jumlah': self.clean_numeric_value(cell('jumlah')),
+            'kategori': self.identify_category(item_name)
+        }
+    
+    def iter_sheet_items(self, ws, sheet_name: str) -> Iterator[Dict]:
+        """Stream item dari satu sheet: header dicari sambil membaca, tanpa DataFrame"""
+        col_mapping = None
+        
+        for row_number, row in enumerate(ws.iter_rows(values_only=True), start=1):
+            if col_mapping is None:
+                # Find header row (biasanya ada kata 'No', 'Item', 'Volume', dll)
+                values = [_cell_value(cell) for cell in row]
+                row_str = ' '.join(str(value).lower() for value in values if value is not None)
+                if any(keyword in row_str for keyword in HEADER_KEYWORDS):
+                    print(f"  Header ditemukan di baris: {row_number}")
+                    col_mapping = self.map_columns(values)
+                    print(f"  Kolom teridentifikasi: {list(col_mapping.keys())}")
+                    if 'item' not in col_mapping:
+                        return
+                continue
             
-            all_data = []
+            try:
+                item_data = self.parse_row(row, col_mapping, sheet_name)
+            except Exception:
+                continue
+            if item_data is not None:
+                yield item_data
+    
+    def iter_items(self) -> Iterator[Dict]:
+        """Stream item dari semua sheet; workbook dibuka sekali (openpyxl read-only)"""
+        wb = load_workbook(self.filepath, read_only=True, data_only=True)
+        try:
+            print(f"  Sheets found: {wb.sheetnames}")
             
-            for sheet_name in excel_file.sheet_names:
+            for sheet_name in wb.sheetnames:
                 print(f"\n→ Memproses sheet: {sheet_name}")
                 
                 try:
-                    df = pd.read_excel(self.filepath, sheet_name=sheet_name, header=None)
-                    
-                    # Find header row (biasanya ada kata 'No', 'Item', 'Volume', dll)
-                    header_row = None
-                    for idx, row in df.iterrows():
-                        row_str = ' '.join([str(cell).lower() for cell in row if pd.notna(cell)])
-                        if any(keyword in row_str for keyword in ['no', 'uraian', 'pekerjaan', 'volume', 'satuan']):
-                            header_row = idx
-                            print(f"  Header ditemukan di baris: {idx + 1}")
-                            break
-                    
-                    if header_row is not None:
-                        # Read again with proper header
-                        df = pd.read_excel(self.filepath, sheet_name=sheet_name, header=header_row)
-                        
-                        # Find relevant columns
-                        col_mapping = {}
-                        for col in df.columns:
-                            col_lower = str(col).lower()
-                            if any(k in col_lower for k in ['no', 'nomor']):
-                                col_mapping['no'] = col
-                            elif any(k in col_lower for k in ['uraian', 'pekerjaan', 'item', 'jenis']):
-                                col_mapping['item'] = col
-                            elif 'volume' in col_lower:
-                                col_mapping['volume'] = col
-                            elif any(k in col_lower for k in ['satuan', 'unit']):
-                                col_mapping['satuan'] = col
-                            elif any(k in col_lower for k in ['harga satuan', 'harga/satuan', 'h.satuan']):
-                                col_mapping['harga_satuan'] = col
-                            elif any(k in col_lower for k in ['jumlah', 'total', 'harga total']):
-                                col_mapping['jumlah'] = col
-                        
-                        print(f"  Kolom teridentifikasi: {list(col_mapping.keys())}")
-                        
-                        # Extract data
-                        for idx, row in df.iterrows():
-                            try:
-                                if 'item' in col_mapping:
-                                    item_name = str(row[col_mapping['item']])
-                                    
-                                    # Skip if item is empty or looks like header/total
-                                    if pd.isna(row[col_mapping['item']]) or \
-                                       any(k in item_name.lower() for k in ['total', 'jumlah', 'sub total', 'grand total']):
-                                        continue
-                                    
-                                    volume = self.clean_numeric_value(row[col_mapping.get('volume', 0)])
-                                    
-                                    # Skip if volume is 0 or nan
-                                    if volume == 0:
-                                        continue
-                                    
-                                    item_data = {
-                                        'sheet': sheet_name,
-                                        'no': str(row[col_mapping.get('no', '')]) if 'no' in col_mapping else '',
-                                        'item': item_name,
-                                        'volume': volume,
-                                        'satuan': str(row[col_mapping.get('satuan', '')]) if 'satuan' in col_mapping else '',
-                                        'harga_satuan': self.clean_numeric_value(row[col_mapping.get('harga_satuan', 0)]),
-                                        'jumlah': self.clean_numeric_value(row[col_mapping.get('jumlah', 0)]),
-                                        'kategori': self.identify_category(item_name)
-                                    }
-                                    
-                                    all_data.append(item_data)
-                            
-                            except Exception as e:
-                                continue
-                    
+                    ws = wb[sheet_name]
+                    # Dimensions saved by some writers are wrong, read every row
+                    if hasattr(ws, 'reset_dimensions'):
+                        ws.reset_dimensions()
+                    yield from self.iter_sheet_items(ws, sheet_name)
                 except Exception as e:
                     print(f"  Warning: Error reading sheet {sheet_name}: {e}")
                     continue
+        finally:
+            wb.close()
+    
+    def read_excel_generic(self) -> pd.DataFrame:
+        """Membaca Excel dengan pendekatan generic
+        
+        Workbook dibuka sekali dalam mode read-only; baris tiap sheet di-stream,
+        header dideteksi sambil membaca dan kolom dipetakan dari sel header.
+        Hasilnya disimpan di rab_cache (kunci: hash isi file + READER_VERSION),
+        workbook yang tidak berubah langsung dibaca dari cache.
+        """
+        print(f"\n→ Membaca file: {self.filepath}")
+        
+        try:
+            if self.rab_cache is not None:
+                cached = self.rab_cache.load(self.filepath, 'rab_items', READER_VERSION)
+                if cached is not None:
+                    print(f"\n✓ Total {len(cached)} item dari cache RAB")
+                    return cached
+            
+            all_data = list(self.iter_items())
+            
+            if self.rab_cache is not None:
+                try:
+                    self.rab_cache.store(self.filepath, 'rab_items', READER_VERSION,
+                                         pd.DataFrame(all_data, columns=ITEM_COLUMNS))
+                except OSError as e:
+                    print(f"  Warning: Cache RAB tidak bisa ditulis: {e}")
             
             if all_data:
                 result_df = pd.DataFrame(all_data)
@@ -159,13 +283,102 @@ class RABReader:
             print(f"\n✗ Error membaca file: {e}")
             return pd.DataFrame()
     
+    def iter_pdf_pages(self) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Stream item per halaman PDF: (nomor halaman 0-based, item), urutan selesai
+        
+        Halaman yang isinya (content stream + font) sama dengan run sebelumnya
+        dibaca dari rab_cache; sisanya diproses paralel di process pool dan
+        di-cache begitu selesai.
+        """
+        doc = PdfDocument.open(self.filepath)
+        print(f"  Halaman: {len(doc.pages)}")
+        
+        pending = {}
+        for page_number in range(len(doc.pages)):
+            digest = doc.page_digest(page_number) if self.rab_cache is not None else None
+            cached = None
+            if digest is not None:
+                cached = self.rab_cache.load_digest(digest, 'pdf_page', PDF_READER_VERSION)
+            if cached is not None:
+                yield page_number, cached.to_dict('records')
+            else:
+                pending[page_number] = digest
+        
+        if not pending:
+            return
+        
+        # Worker hasil fork mewarisi dokumen yang sudah dibuka
+        _pdf_state['path'] = self.filepath
+        _pdf_state['doc'] = doc
+        
+        for page_number, items in self._read_pdf_pages(list(pending)):
+            if pending[page_number] is not None:
+                try:
+                    self.rab_cache.store_digest(pending[page_number], 'pdf_page', PDF_READER_VERSION,
+                                                pd.DataFrame(items, columns=ITEM_COLUMNS))
+                except OSError as e:
+                    print(f"  Warning: Cache RAB tidak bisa ditulis: {e}")
+            yield page_number, items
+    
+    def _read_pdf_pages(self, page_numbers: List[int]) -> Iterator[Tuple[int, List[Dict]]]:
+        """Proses halaman di process pool (urutan selesai); halaman sisa dibaca inline jika pool gagal"""
+        done = set()
+        jobs = self.jobs or os.cpu_count() or 1
+        if jobs > 1 and len(page_numbers) >= PDF_PARALLEL_MIN_PAGES:
+            executor = None
+            try:
+                executor = ProcessPoolExecutor(max_workers=min(jobs, len(page_numbers)),
+                                               initializer=_init_pdf_worker,
+                                               initargs=(self.filepath,))
+                futures = [executor.submit(_read_pdf_page, page_number) for page_number in page_numbers]
+                for future in as_completed(futures):
+                    page_number, items = future.result()
+                    done.add(page_number)
+                    yield page_number, items
+            except (OSError, RuntimeError) as e:
+                print(f"  Warning: Process pool gagal ({e}), halaman sisa dibaca berurutan")
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+        
+        for page_number in page_numbers:
+            if page_number not in done:
+                yield _read_pdf_page(page_number)
+    
+    def read_pdf(self) -> pd.DataFrame:
+        """Membaca RAB PDF: tabel BOQ dari text layer, per halaman (lihat iter_pdf_pages)"""
+        print(f"\n→ Membaca file: {self.filepath}")
+        
+        try:
+            pages = {}
+            for page_number, items in self.iter_pdf_pages():
+                pages[page_number] = items
+                print(f"  {page_label(page_number)}: {len(items)} item")
+            
+            all_data = [item for page_number in sorted(pages) for item in pages[page_number]]
+            if all_data:
+                result_df = pd.DataFrame(all_data, columns=ITEM_COLUMNS)
+                print(f"\n✓ Total {len(result_df)} item berhasil diekstrak")
+                return result_df
+            else:
+                print("\n✗ Tidak ada data yang berhasil diekstrak (PDF tanpa text layer/tabel BOQ?)")
+                return pd.DataFrame()
+        
+        except Exception as e:
+            print(f"\n✗ Error membaca file: {e}")
+            return pd.DataFrame()
+    
     def extract_data(self) -> Dict[str, List[Dict]]:
         """Ekstrak data dari file RAB"""
         print("\n" + "="*70)
         print("EKSTRAKSI DATA DARI RAB EXCEL")
         print("="*70)
         
-        df = self.read_excel_generic()
+        if self.filepath.lower().endswith('.pdf'):
+            df = self.read_pdf()
+        else:
+            df = self.read_excel_generic()
         
         if df.empty:
             return self.data
@@ -222,7 +435,7 @@ if __name__ == "__main__":
     
     for rab_file in rab_files:
         print(f"\n{'='*70}")
-        print(f"Testing: {rab_file.split('\\')[-1]}")
+        print(f"Testing: {os.path.basename(rab_file)}")
         print('='*70)
         
         reader = RABReader(rab_file)
@@ -0,0 +1,214 @@
+"""
+Similarity Backends for BOQ Item Matching
+Pluggable string ratio kernels used by the comparators
+
+Backends:
+- 'fast' (default): bit-parallel indel/LCS kernel calibrated to SequenceMatcher
+- 'difflib': plain difflib.SequenceMatcher (reference)
+- 'indel': raw indel ratio 2*LCS/(len(a)+len(b)), uncalibrated
+"""
+
+from abc import ABC, abstractmethod
+from difflib import SequenceMatcher
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+_WORD_BITS = 64
+
+
+def lcs_length(a: str, b: str) -> int:
+    """
+    Length of the longest common subsequence (Hyyro bit-parallel algorithm)
+
+    One big-int bit per character of a, one pass over b.
+    """
+    if not a or not b:
+        return 0
+
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+
+    mask = (1 << len(a)) - 1
+    v = mask
+    for ch in b:
+        u = v & peq.get(ch, 0)
+        v = ((v + u) | (v - u)) & mask
+
+    # Zero bits of v are the LCS positions
+    return len(a) - bin(v).count('1')
+
+
+def indel_ratio(a: str, b: str) -> float:
+    """Normalized indel similarity 2*LCS/(len(a)+len(b)), same scale as SequenceMatcher.ratio()"""
+    total = len(a) + len(b)
+    if total == 0:
+        return 1.0
+    return 2.0 * lcs_length(a, b) / total
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Bit count of uint64 values"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((values * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def lcs_length_many(query: str, choices: Sequence[str]) -> np.ndarray:
+    """
+    LCS length of one query against many strings in a single NumPy pass
+
+    Queries up to 64 characters run as one uint64 bit vector per choice,
+    advancing all choices one character position at a time. Longer queries
+    fall back to the big-int kernel per choice.
+
+    Args:
+        query: Query string
+        choices: Strings to compare against
+
+    Returns:
+        Int array of LCS lengths, aligned with choices
+    """
+    count = len(choices)
+    if count == 0 or not query:
+        return np.zeros(count, dtype=np.int64)
+
+    if len(query) > _WORD_BITS:
+        return np.fromiter((lcs_length(query, c) for c in choices), dtype=np.int64, count=count)
+
+    # Match mask per query character; index 0 is "no match" (other chars and padding)
+    symbols = {}
+    masks = [0]
+    for i, ch in enumerate(query):
+        if ch not in symbols:
+            symbols[ch] = len(masks)
+            masks.append(0)
+        masks[symbols[ch]] |= 1 << i
+    peq = np.array(masks, dtype=np.uint64)
+
+    width = max((len(c) for c in choices), default=0)
+    codes = np.zeros((count, width), dtype=np.intp)
+    for row, choice in enumerate(choices):
+        codes[row, :len(choice)] = [symbols.get(ch, 0) for ch in choice]
+
+    mask = np.uint64((1 << len(query)) - 1)
+    v = np.full(count, mask, dtype=np.uint64)
+    for position in range(width):
+        u = v & peq[codes[:, position]]
+        v = ((v + u) | (v - u)) & mask
+
+    return len(query) - _popcount(v)
+
+
+def indel_ratio_many(query: str, choices: Sequence[str]) -> np.ndarray:
+    """Indel ratio of one query against many strings (see lcs_length_many)"""
+    lengths = np.fromiter((len(c) for c in choices), dtype=np.int64, count=len(choices))
+    total = lengths + len(query)
+    ratios = np.ones(len(choices))
+    nonempty = total > 0
+    ratios[nonempty] = 2.0 * lcs_length_many(query, choices)[nonempty] / total[nonempty]
+    return ratios
+
+
+class SimilarityBackend(ABC):
+    """
+    Interface of a string similarity kernel (0.0 - 1.0)
+
+    score_cutoff lets a backend skip exact work: scores at or above the
+    cutoff must be exact, scores below it only need to stay below it.
+    Subclasses implement ratio(); ratio_many() defaults to a loop over it.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def ratio(self, a: str, b: str, score_cutoff: float = 0.0) -> float:
+        """Similarity of a and b"""
+
+    def ratio_many(self, query: str, choices: Sequence[str], score_cutoff: float = 0.0) -> np.ndarray:
+        """Score one query against every choice in one call"""
+        return np.fromiter(
+            (self.ratio(query, c, score_cutoff) for c in choices), dtype=float, count=len(choices)
+        )
+
+
+class DifflibBackend(SimilarityBackend):
+    """Reference backend: difflib.SequenceMatcher(None, a, b).ratio()"""
+
+    name = 'difflib'
+
+    def ratio(self, a: str, b: str, score_cutoff: float = 0.0) -> float:
+        return SequenceMatcher(None, a, b).ratio()
+
+
+class IndelBackend(SimilarityBackend):
+    """Raw indel ratio; never lower than SequenceMatcher, so thresholds get more lenient"""
+
+    name = 'indel'
+
+    def ratio(self, a: str, b: str, score_cutoff: float = 0.0) -> float:
+        return indel_ratio(a, b)
+
+    def ratio_many(self, query: str, choices: Sequence[str], score_cutoff: float = 0.0) -> np.ndarray:
+        return indel_ratio_many(query, choices)
+
+
+class FastBackend(SimilarityBackend):
+    """
+    Indel kernel calibrated to SequenceMatcher
+
+    SequenceMatcher matches are a common subsequence, so its ratio is never
+    above the indel ratio. Pairs whose indel ratio is below score_cutoff are
+    returned with that (sub-cutoff) bound; the rest get the exact
+    SequenceMatcher ratio. Scores that can reach a threshold are therefore
+    identical to difflib and 0.85/0.90 keep their meaning.
+    """
+
+    name = 'fast'
+
+    def ratio(self, a: str, b: str, score_cutoff: float = 0.0) -> float:
+        if score_cutoff > 0:
+            bound = indel_ratio(a, b)
+            if bound < score_cutoff:
+                return bound
+        return SequenceMatcher(None, a, b).ratio()
+
+    def ratio_many(self, query: str, choices: Sequence[str], score_cutoff: float = 0.0) -> np.ndarray:
+        if score_cutoff <= 0:
+            return super().ratio_many(query, choices)
+
+        scores = indel_ratio_many(query, choices)
+        for pos in np.flatnonzero(scores >= score_cutoff):
+            scores[pos] = SequenceMatcher(None, query, choices[pos]).ratio()
+        return scores
+
+
+BACKENDS = {
+    'fast': FastBackend,
+    'difflib': DifflibBackend,
+    'indel': IndelBackend,
+}
+
+
+def get_backend(backend=None) -> SimilarityBackend:
+    """
+    Resolve a backend name, class or instance (None = 'fast')
+
+    Raises:
+        ValueError: Unknown backend name
+    """
+    if backend is None:
+        backend = 'fast'
+    if isinstance(backend, SimilarityBackend):
+        return backend
+    if isinstance(backend, type) and issubclass(backend, SimilarityBackend):
+        return backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown similarity backend: {backend!r} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
@@ -3,10 +3,112 @@ STRUKTUR ANALYZER - Enhanced Analysis for Structural Work
 Provides detailed matching and comparison for structural items
 """
 
+import numpy as np
 import pandas as pd
-import re
+from collections import defaultdict
 from typing import Dict, List, Tuple, Optional
-from difflib import SequenceMatcher
+
+try:
+    from .assignment import check_match_mode, sparse_assignment
+    from .excel_stream import append_frame
+    from .gambar_reader import read_gambar_sheet
+    from .item_features import SPEC_PATTERNS, get_features
+    from .match_index import CharCountIndex
+    from .rab_cache import resolve_rab_cache
+    from .similarity import get_backend
+    from .volume_export import gambar_frame, read_gambar_sheets
+except ImportError:
+    from assignment import check_match_mode, sparse_assignment
+    from excel_stream import append_frame
+    from gambar_reader import read_gambar_sheet
+    from item_features import SPEC_PATTERNS, get_features
+    from match_index import CharCountIndex
+    from rab_cache import resolve_rab_cache
+    from similarity import get_backend
+    from volume_export import gambar_frame, read_gambar_sheets
+
+
+# Specs whose conflict makes calculate_similarity return 0.3
+KEY_SPECS = ('beton_grade', 'beton_fc', 'diameter_besi')
+
+# Similarity returned for conflicting key specs
+SPEC_CONFLICT_SIMILARITY = 0.3
+
+# BOQ sheet read by analyze_struktur_detail (header on row 7)
+RAB_SHEET = 'BOQ STRUKTUR'
+RAB_HEADER_ROW = 6
+
+# Bump when read_rab_sheet output changes (cached tables are then ignored)
+RAB_SHEET_VERSION = 1
+
+# Status order of match_items results
+STRUKTUR_STATUS_CATEGORIES = ['✓ OK', '⚠ MINOR', '⚠ WARNING', '❌ MAJOR', '❌ MISSING']
+
+
+class RabSpecIndex:
+    """RAB rows bucketed by (category, beton_grade, beton_fc, diameter_besi)
+    
+    rows_for() returns the rows worth scoring for one gambar item:
+    - rows in spec-compatible buckets (no differing key spec)
+    - restricted to its category plus the LAIN-LAIN wildcard bucket when
+      category_blocking is on (gambar items in LAIN-LAIN see all categories)
+    - of those, only rows that contain / are contained in the item or whose
+      SequenceMatcher upper bound reaches base_cutoff
+    
+    Without category blocking the rows left out can never reach
+    min_similarity, so results equal a full scan.
+    """
+    
+    WILDCARD = 'LAIN-LAIN'
+    
+    def __init__(self, rab_features: List, categories: List[str], category_blocking: bool = False):
+        """
+        Args:
+            rab_features: ItemFeatures of the RAB rows
+            categories: categorize_item() result per RAB row
+            category_blocking: Only score rows of the same category (+ wildcard)
+        """
+        self.rab_features = rab_features
+        self.category_blocking = category_blocking
+        self.buckets = defaultdict(list)
+        for rab_pos, (features, category) in enumerate(zip(rab_features, categories)):
+            self.buckets[self._key(features, category)].append(rab_pos)
+        self.bounds = CharCountIndex([features.clean for features in rab_features])
+        self._compatible = {}
+    
+    @staticmethod
+    def _key(features, category: str) -> Tuple:
+        specs = features.specifications
+        return (category,) + tuple(specs.get(name) for name in KEY_SPECS)
+    
+    def compatible_rows(self, features, category: str) -> np.ndarray:
+        """Rows in buckets without key spec conflict (and in category, if blocking)"""
+        key = self._key(features, category if self.category_blocking else None)
+        if key not in self._compatible:
+            query_category, query_specs = key[0], key[1:]
+            rows = []
+            for (bucket_category, *bucket_specs), positions in self.buckets.items():
+                if (self.category_blocking and query_category != self.WILDCARD
+                        and bucket_category not in (query_category, self.WILDCARD)):
+                    continue
+                if any(q is not None and b is not None and q != b for q, b in zip(query_specs, bucket_specs)):
+                    continue
+                rows.extend(positions)
+            self._compatible[key] = np.array(sorted(rows), dtype=np.int64)
+        return self._compatible[key]
+    
+    def rows_for(self, features, category: str, base_cutoff: float) -> List[int]:
+        """Rows to score for one gambar item, ascending"""
+        rows = self.compatible_rows(features, category)
+        if len(rows) == 0:
+            return []
+        
+        reachable = self.bounds.ratio_upper_bounds(features.clean)[rows] >= base_cutoff
+        query = features.clean
+        return [
+            rab_pos for rab_pos, keep in zip(rows.tolist(), reachable.tolist())
+            if keep or query in self.rab_features[rab_pos].clean or self.rab_features[rab_pos].clean in query
+        ]
 
 
 class StrukturAnalyzer:
@@ -26,44 +128,36 @@ class StrukturAnalyzer:
         'ATAP': ['atap', 'roof', 'kuda-kuda', 'rangka atap'],
     }
     
-    # Material specifications yang harus di-extract
-    SPEC_PATTERNS = {
-        'beton_grade': r'k-?\s*(\d+)',  # K-225, K-300, etc
-        'beton_fc': r'fc\s*(\d+)',       # fc 25, fc 30
-        'diameter_besi': r'd\s*(\d+)|diameter\s*(\d+)|ø\s*(\d+)',  # D13, diameter 16
-        'dimensi': r'(\d+\.?\d*)\s*x\s*(\d+\.?\d*)',  # 40x60, 30x40
-        'tebal': r't\s*=?\s*(\d+)|tebal\s*(\d+)',  # t=12, tebal 15
-        'panjang': r'p\s*=?\s*(\d+)|panjang\s*(\d+)',  # p=6000
-    }
+    # Material specifications yang harus di-extract (shared with item_features)
+    SPEC_PATTERNS = SPEC_PATTERNS
     
-    def __init__(self):
-        """Initialize struktur analyzer"""
+    def __init__(self, similarity_backend=None, category_blocking: bool = False):
+        """Initialize struktur analyzer
+        
+        Args:
+            similarity_backend: Similarity backend name/instance ('fast', 'difflib', 'indel'),
+                None = 'fast'
+            category_blocking: Only match gambar items against RAB rows of the same
+                categorize_item() category plus LAIN-LAIN (faster, may change matches)
+        """
+        self.similarity = get_backend(similarity_backend)
+        self.category_blocking = category_blocking
         self.matched_items = []
         self.unmatched_gambar = []
         self.unmatched_rab = []
         self.category_summary = {}
     
-    def extract_specifications(self, text: str) -> Dict[str, str]:
+    def extract_specifications(self, text) -> Dict[str, str]:
         """Extract technical specifications from item description
         
         Args:
-            text: Item description text
+            text: Item description text (or its ItemFeatures)
             
         Returns:
             Dictionary of extracted specifications
         """
-        specs = {}
-        text_lower = str(text).lower()
-        
-        for spec_name, pattern in self.SPEC_PATTERNS.items():
-            match = re.search(pattern, text_lower)
-            if match:
-                # Get the first non-None group
-                value = next((g for g in match.groups() if g is not None), None)
-                if value:
-                    specs[spec_name] = value
-        
-        return specs
+        # Parsed once per distinct text in the shared feature cache
+        return dict(get_features(text).specifications)
     
     def categorize_item(self, item_text: str) -> Optional[str]:
         """Categorize structural item
@@ -83,28 +177,32 @@ class StrukturAnalyzer:
         
         return 'LAIN-LAIN'
     
-    def calculate_similarity(self, text1: str, text2: str, 
-                           check_specs: bool = True) -> Tuple[float, Dict]:
+    def calculate_similarity(self, text1, text2, 
+                           check_specs: bool = True,
+                           score_cutoff: float = 0.0) -> Tuple[float, Dict]:
         """Calculate similarity with specification matching
         
         Args:
-            text1: First text
-            text2: Second text
+            text1: First text (or its ItemFeatures)
+            text2: Second text (or its ItemFeatures)
             check_specs: Whether to check specifications
+            score_cutoff: Base ratios below this may be approximate (still below it)
             
         Returns:
             Tuple of (similarity_score, match_details)
         """
-        text1_clean = str(text1).lower().strip()
-        text2_clean = str(text2).lower().strip()
+        features1 = get_features(text1)
+        features2 = get_features(text2)
+        text1_clean = features1.clean
+        text2_clean = features2.clean
         
         # Exact match
         if text1_clean == text2_clean:
             return 1.0, {'type': 'exact', 'specs_match': True}
         
-        # Extract specifications
-        specs1 = self.extract_specifications(text1) if check_specs else {}
-        specs2 = self.extract_specifications(text2) if check_specs else {}
+        # Specifications (precomputed per item, read-only)
+        specs1 = features1.specifications if check_specs else {}
+        specs2 = features2.specifications if check_specs else {}
         
         match_details = {
             'type': 'fuzzy',
@@ -129,7 +227,7 @@ class StrukturAnalyzer:
         
         # If critical specs don't match, return low similarity
         if not match_details['specs_match']:
-            return 0.3, match_details
+            return SPEC_CONFLICT_SIMILARITY, match_details
         
         # Calculate base similarity
         # Check containment first
@@ -137,7 +235,7 @@ class StrukturAnalyzer:
             base_similarity = 0.85
         else:
             # Use sequence matcher
-            base_similarity = SequenceMatcher(None, text1_clean, text2_clean).ratio()
+            base_similarity = self.similarity.ratio(text1_clean, text2_clean, score_cutoff)
         
         # Boost similarity if specs match
         if match_details['specs_compared'] and match_details['specs_match']:
@@ -147,24 +245,121 @@ class StrukturAnalyzer:
         
         return base_similarity, match_details
     
+    def _score_rab(self, features_gambar, rab_features: List, min_similarity: float,
+                   base_cutoff: float, rab_positions: List[int] = None) -> Dict[int, Tuple[float, Dict]]:
+        """Scores of the RAB rows reaching min_similarity for one gambar item
+        
+        Args:
+            rab_positions: Rows to score (default: all)
+        
+        Returns:
+            {rab position: (similarity, match_details)}
+        """
+        if rab_positions is None:
+            rab_positions = range(len(rab_features))
+        
+        scores = {}
+        for rab_pos in rab_positions:
+            similarity, details = self.calculate_similarity(
+                features_gambar, rab_features[rab_pos], check_specs=True,
+                score_cutoff=base_cutoff
+            )
+            if similarity >= min_similarity and similarity > 0:
+                scores[rab_pos] = (similarity, details)
+        return scores
+    
+    @staticmethod
+    def _build_results(columns: Dict[str, List], best_positions: np.ndarray, similarities: np.ndarray,
+                       match_details: List[Dict], rab_clean: pd.DataFrame) -> pd.DataFrame:
+        """Result table with all derived columns computed column-wise
+        
+        Args:
+            columns: Gambar columns (No ... Spesifikasi_Gambar), one value per result row
+            best_positions: Chosen rab_clean position per row (-1 = not found)
+            similarities: Similarity per row
+            match_details: calculate_similarity details per row
+            rab_clean: Cleaned RAB rows
+        """
+        if len(best_positions) == 0:
+            return pd.DataFrame()
+        
+        matched = best_positions >= 0
+        safe_pos = np.where(matched, best_positions, 0)
+        
+        def rab_column(name, default=0.0):
+            if name not in rab_clean.columns or rab_clean.empty:
+                return np.full(len(best_positions), default, dtype=float)
+            values = pd.to_numeric(rab_clean[name], errors='coerce').to_numpy(dtype=float)[safe_pos]
+            return np.where(matched, values, 0.0)
+        
+        vol_gambar = np.array(columns['Volume_Gambar'], dtype=float)
+        vol_rab = rab_column('VOLUME')
+        harga_satuan = rab_column('UNIT PRICE')
+        total_rab = rab_column('HARGA')
+        
+        selisih = vol_gambar - vol_rab
+        with np.errstate(divide='ignore', invalid='ignore'):
+            selisih_persen = np.where(vol_rab > 0, selisih / vol_rab * 100, 0.0)
+        
+        # Determine status
+        abs_persen = np.abs(selisih_persen)
+        status = np.select(
+            [abs_persen <= 5, abs_persen <= 10, abs_persen <= 25],
+            ['✓ OK', '⚠ MINOR', '⚠ WARNING'],
+            default='❌ MAJOR'
+        ).astype(object)
+        status[~matched] = '❌ MISSING'
+        
+        if rab_clean.empty:
+            item_rab = satuan_rab = np.full(len(best_positions), '', dtype=object)
+        else:
+            item_rab = rab_clean['PEKERJAAN'].astype(str).to_numpy(dtype=object)[safe_pos]
+            satuan_rab = (rab_clean['UNIT'].astype(str).to_numpy(dtype=object)[safe_pos]
+                          if 'UNIT' in rab_clean.columns else np.full(len(best_positions), '', dtype=object))
+        
+        results_df = pd.DataFrame(columns)
+        results_df['Volume_Gambar'] = vol_gambar
+        results_df['Item_RAB'] = np.where(matched, item_rab, '❌ NOT FOUND IN RAB')
+        results_df['Volume_RAB'] = vol_rab
+        results_df['Satuan_RAB'] = np.where(matched, satuan_rab, '-')
+        results_df['Selisih_Volume'] = selisih
+        results_df['Selisih_%'] = np.where(matched, selisih_persen, 0.0)
+        results_df['Status'] = pd.Categorical(status, categories=STRUKTUR_STATUS_CATEGORIES)
+        results_df['Similarity_%'] = similarities * 100
+        results_df['Specs_Match'] = [
+            ('YES' if details.get('specs_match', True) else 'NO') if is_matched else '-'
+            for details, is_matched in zip(match_details, matched)
+        ]
+        results_df['Harga_Satuan_RAB'] = harga_satuan
+        results_df['Total_RAB'] = total_rab
+        results_df['Dampak_Biaya'] = np.where(harga_satuan > 0, np.abs(selisih * harga_satuan), 0.0)
+        results_df['Match_Type'] = [
+            details.get('type', 'fuzzy') if is_matched else 'not_found'
+            for details, is_matched in zip(match_details, matched)
+        ]
+        return results_df
+    
     def match_items(self, gambar_df: pd.DataFrame, rab_df: pd.DataFrame,
-                   min_similarity: float = 0.75) -> pd.DataFrame:
+                   min_similarity: float = 0.75, match_mode: str = 'best') -> pd.DataFrame:
         """Match items from gambar with RAB
         
         Args:
             gambar_df: DataFrame from volume gambar (struktur sheet)
             rab_df: DataFrame from RAB struktur
             min_similarity: Minimum similarity threshold
+            match_mode: 'best' (each gambar item takes its best RAB row),
+                'one_to_one' (global assignment, each RAB row used once) or
+                'aggregate' (gambar items sharing a RAB row are summed)
             
         Returns:
             DataFrame with matching results
         """
+        check_match_mode(match_mode)
+        
         print("\n" + "="*80)
         print("DETAILED STRUKTUR ANALYSIS")
         print("="*80)
         
-        results = []
-        
         # Clean RAB data
         rab_clean = rab_df[pd.notna(rab_df['PEKERJAAN'])].copy()
         rab_clean = rab_clean[pd.notna(rab_clean['VOLUME'])]
@@ -175,124 +370,144 @@ class StrukturAnalyzer:
         print(f"   Gambar items: {len(gambar_df)}")
         print(f"   RAB items: {len(rab_clean)}")
         print(f"   Similarity threshold: {min_similarity*100}%")
+        if match_mode != 'best':
+            print(f"   Match mode: {match_mode}")
         
-        # Categorize items
-        print(f"\n📂 Categorizing items...")
+        # Matching features computed once per RAB item
+        rab_features = [get_features(str(item)) for item in rab_clean['PEKERJAAN']]
+        
+        # Spec match adds +0.1, so base ratios below this can never reach min_similarity
+        base_cutoff = max(0.0, min_similarity - 0.1 - 1e-9)
         
+        # Valid gambar items
+        entries = []
         for _, gambar_row in gambar_df.iterrows():
             item_gambar = str(gambar_row.get('Item', gambar_row.get('Uraian', '')))
             vol_gambar = float(gambar_row.get('Volume', 0))
-            satuan_gambar = str(gambar_row.get('Satuan', ''))
-            lokasi_gambar = str(gambar_row.get('Lokasi', gambar_row.get('Lantai', '')))
             
             if not item_gambar or item_gambar == 'nan' or vol_gambar == 0:
                 continue
             
-            # Categorize
-            category = self.categorize_item(item_gambar)
-            specs_gambar = self.extract_specifications(item_gambar)
+            entries.append((gambar_row, item_gambar, vol_gambar))
+        
+        # Score spec-compatible RAB rows (once per distinct gambar text)
+        rab_index = None
+        if min_similarity > SPEC_CONFLICT_SIMILARITY:
+            rab_index = RabSpecIndex(
+                rab_features, [self.categorize_item(f.text) for f in rab_features],
+                category_blocking=self.category_blocking
+            )
+        
+        scores_by_text = {}
+        for _, item_gambar, _ in entries:
+            if item_gambar not in scores_by_text:
+                features_gambar = get_features(item_gambar)
+                rab_positions = None
+                if rab_index is not None:
+                    rab_positions = rab_index.rows_for(
+                        features_gambar, self.categorize_item(item_gambar), base_cutoff
+                    )
+                scores_by_text[item_gambar] = self._score_rab(
+                    features_gambar, rab_features, min_similarity, base_cutoff, rab_positions
+                )
+        
+        # Choose RAB row per gambar item
+        if match_mode == 'one_to_one':
+            edges = {
+                (entry_pos, rab_pos): similarity
+                for entry_pos, (_, item_gambar, _) in enumerate(entries)
+                for rab_pos, (similarity, _) in scores_by_text[item_gambar].items()
+            }
+            chosen = sparse_assignment(edges)
+        else:
+            chosen = {}
+            for entry_pos, (_, item_gambar, _) in enumerate(entries):
+                best_pos = None
+                best_similarity = 0.0
+                for rab_pos, (similarity, _) in sorted(scores_by_text[item_gambar].items()):
+                    if similarity > best_similarity:
+                        best_similarity = similarity
+                        best_pos = rab_pos
+                if best_pos is not None:
+                    chosen[entry_pos] = best_pos
+        
+        # Group gambar items per result row ('aggregate' merges items sharing a RAB row)
+        groups = []
+        group_by_rab = {}
+        for entry_pos in range(len(entries)):
+            rab_pos = chosen.get(entry_pos)
+            if match_mode == 'aggregate' and rab_pos is not None and rab_pos in group_by_rab:
+                groups[group_by_rab[rab_pos]][0].append(entry_pos)
+                continue
+            if match_mode == 'aggregate' and rab_pos is not None:
+                group_by_rab[rab_pos] = len(groups)
+            groups.append(([entry_pos], rab_pos))
+        
+        # Categorize items
+        print(f"\n📂 Categorizing items...")
+        
+        columns = {name: [] for name in ('No', 'Kategori', 'Item_Gambar', 'Lokasi', 'Volume_Gambar',
+                                         'Satuan_Gambar', 'Spesifikasi_Gambar')}
+        best_positions = []
+        similarities = []
+        match_details = []
+        
+        for entry_positions, best_pos in groups:
+            group = [entries[pos] for pos in entry_positions]
+            gambar_row, item_gambar, vol_gambar = group[0]
+            lokasi_gambar = str(gambar_row.get('Lokasi', gambar_row.get('Lantai', '')))
             
-            # Find best match in RAB
-            best_match = None
-            best_similarity = 0.0
-            best_details = {}
+            if len(group) > 1:
+                item_gambar = '; '.join(dict.fromkeys(item for _, item, _ in group))
+                vol_gambar = sum(vol for _, _, vol in group)
+                lokasi_gambar = '; '.join(dict.fromkeys(
+                    str(row.get('Lokasi', row.get('Lantai', ''))) for row, _, _ in group
+                ))
             
-            for _, rab_row in rab_clean.iterrows():
-                item_rab = str(rab_row['PEKERJAAN'])
-                
-                similarity, details = self.calculate_similarity(
-                    item_gambar, item_rab, check_specs=True
-                )
-                
-                if similarity > best_similarity and similarity >= min_similarity:
-                    best_similarity = similarity
-                    best_match = rab_row
-                    best_details = details
+            specs_gambar = self.extract_specifications(group[0][1])
             
-            # Build result
-            result = {
-                'No': gambar_row.get('No', ''),
-                'Kategori': category,
-                'Item_Gambar': item_gambar,
-                'Lokasi': lokasi_gambar,
-                'Volume_Gambar': vol_gambar,
-                'Satuan_Gambar': satuan_gambar,
-                'Spesifikasi_Gambar': str(specs_gambar) if specs_gambar else '-',
-            }
+            columns['No'].append(gambar_row.get('No', ''))
+            columns['Kategori'].append(self.categorize_item(group[0][1]))
+            columns['Item_Gambar'].append(item_gambar)
+            columns['Lokasi'].append(lokasi_gambar)
+            columns['Volume_Gambar'].append(vol_gambar)
+            columns['Satuan_Gambar'].append(str(gambar_row.get('Satuan', '')))
+            columns['Spesifikasi_Gambar'].append(str(specs_gambar) if specs_gambar else '-')
             
-            if best_match is not None:
-                vol_rab = float(best_match['VOLUME'])
-                harga_satuan = float(best_match.get('UNIT PRICE', 0))
-                total_rab = float(best_match.get('HARGA', 0))
-                
-                selisih = vol_gambar - vol_rab
-                selisih_persen = (selisih / vol_rab * 100) if vol_rab > 0 else 0
-                
-                # Determine status
-                if abs(selisih_persen) <= 5:
-                    status = '✓ OK'
-                elif abs(selisih_persen) <= 10:
-                    status = '⚠ MINOR'
-                elif abs(selisih_persen) <= 25:
-                    status = '⚠ WARNING'
-                else:
-                    status = '❌ MAJOR'
-                
-                result.update({
-                    'Item_RAB': str(best_match['PEKERJAAN']),
-                    'Volume_RAB': vol_rab,
-                    'Satuan_RAB': str(best_match.get('UNIT', '')),
-                    'Selisih_Volume': selisih,
-                    'Selisih_%': selisih_persen,
-                    'Status': status,
-                    'Similarity_%': best_similarity * 100,
-                    'Specs_Match': 'YES' if best_details.get('specs_match', True) else 'NO',
-                    'Harga_Satuan_RAB': harga_satuan,
-                    'Total_RAB': total_rab,
-                    'Dampak_Biaya': abs(selisih * harga_satuan) if harga_satuan > 0 else 0,
-                    'Match_Type': best_details.get('type', 'fuzzy'),
-                })
-                
-                self.matched_items.append(result)
+            # Chosen match in RAB (lowest similarity of the group)
+            if best_pos is None:
+                best_positions.append(-1)
+                similarities.append(0.0)
+                match_details.append({})
             else:
-                # Unmatched item
-                result.update({
-                    'Item_RAB': '❌ NOT FOUND IN RAB',
-                    'Volume_RAB': 0,
-                    'Satuan_RAB': '-',
-                    'Selisih_Volume': vol_gambar,
-                    'Selisih_%': 0,
-                    'Status': '❌ MISSING',
-                    'Similarity_%': 0,
-                    'Specs_Match': '-',
-                    'Harga_Satuan_RAB': 0,
-                    'Total_RAB': 0,
-                    'Dampak_Biaya': 0,
-                    'Match_Type': 'not_found',
-                })
-                
-                self.unmatched_gambar.append(result)
-            
-            results.append(result)
+                best_similarity, best_details = min(
+                    (scores_by_text[item][best_pos] for _, item, _ in group), key=lambda score: score[0]
+                )
+                best_positions.append(best_pos)
+                similarities.append(best_similarity)
+                match_details.append(best_details)
+        
+        results_df = self._build_results(columns, np.array(best_positions, dtype=np.int64),
+                                         np.array(similarities, dtype=float), match_details, rab_clean)
+        
+        matched_mask = (results_df['Match_Type'] != 'not_found').to_numpy() if len(results_df) else []
+        self.matched_items.extend(results_df[matched_mask].to_dict('records') if len(results_df) else [])
+        self.unmatched_gambar.extend(results_df[~matched_mask].to_dict('records') if len(results_df) else [])
         
         # Find RAB items not in gambar
         print(f"\n🔍 Checking for RAB items not in gambar...")
         gambar_items_matched = set([r['Item_RAB'] for r in self.matched_items])
         
-        for _, rab_row in rab_clean.iterrows():
-            item_rab = str(rab_row['PEKERJAAN'])
-            if item_rab not in gambar_items_matched:
-                self.unmatched_rab.append({
-                    'Item': item_rab,
-                    'Volume': rab_row['VOLUME'],
-                    'Satuan': rab_row.get('UNIT', ''),
-                    'Harga_Satuan': rab_row.get('UNIT PRICE', 0),
-                    'Total': rab_row.get('HARGA', 0),
-                    'Kategori': self.categorize_item(item_rab),
-                })
-        
-        # Create DataFrame
-        results_df = pd.DataFrame(results)
+        rab_items = rab_clean['PEKERJAAN'].astype(str)
+        rab_only = rab_clean[~rab_items.isin(gambar_items_matched)]
+        self.unmatched_rab.extend(pd.DataFrame({
+            'Item': rab_only['PEKERJAAN'].astype(str),
+            'Volume': rab_only['VOLUME'],
+            'Satuan': rab_only['UNIT'] if 'UNIT' in rab_only.columns else '',
+            'Harga_Satuan': rab_only['UNIT PRICE'] if 'UNIT PRICE' in rab_only.columns else 0,
+            'Total': rab_only['HARGA'] if 'HARGA' in rab_only.columns else 0,
+            'Kategori': [self.categorize_item(item) for item in rab_only['PEKERJAAN'].astype(str)],
+        }).to_dict('records'))
         
         # Generate summary
         self._generate_summary(results_df)
@@ -306,17 +521,20 @@ class StrukturAnalyzer:
         print("="*80)
         
         if not results_df.empty and 'Kategori' in results_df.columns:
-            category_groups = results_df.groupby('Kategori')
+            # One value_counts over (Kategori, Status) for all categories
+            status_counts = results_df.groupby('Kategori')['Status'].value_counts().unstack(fill_value=0)
+            dampak = results_df.groupby('Kategori')['Dampak_Biaya'].sum() if 'Dampak_Biaya' in results_df.columns else None
             
-            for category, group in category_groups:
-                matched = len(group[group['Status'].str.contains('OK|MINOR|WARNING', na=False)])
-                missing = len(group[group['Status'].str.contains('MISSING', na=False)])
-                major_diff = len(group[group['Status'].str.contains('MAJOR', na=False)])
+            for category, counts in status_counts.iterrows():
+                total_items = int(counts.sum())
+                matched = int(sum(counts.get(status, 0) for status in ('✓ OK', '⚠ MINOR', '⚠ WARNING')))
+                missing = int(counts.get('❌ MISSING', 0))
+                major_diff = int(counts.get('❌ MAJOR', 0))
                 
-                total_dampak = group['Dampak_Biaya'].sum() if 'Dampak_Biaya' in group.columns else 0
+                total_dampak = dampak[category] if dampak is not None else 0
                 
                 self.category_summary[category] = {
-                    'total_items': len(group),
+                    'total_items': total_items,
                     'matched': matched,
                     'missing': missing,
                     'major_diff': major_diff,
@@ -324,7 +542,7 @@ class StrukturAnalyzer:
                 }
                 
                 print(f"\n📂 {category}:")
-                print(f"   Total items: {len(group)}")
+                print(f"   Total items: {total_items}")
                 print(f"   Matched: {matched}")
                 print(f"   Missing in RAB: {missing}")
                 print(f"   Major difference: {major_diff}")
@@ -344,23 +562,9 @@ class StrukturAnalyzer:
             output_file: Path to output Excel file
         """
         from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-        
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove default sheet
-        
-        # Styles
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(name='Calibri', size=11, bold=True, color="FFFFFF")
-        ok_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        warning_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-        error_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        
+        # Write-only: rows are streamed to disk as they are appended
+        wb = Workbook(write_only=True)
         
         # Sheet 1: Summary
         ws_summary = wb.create_sheet("Summary")
@@ -368,7 +572,7 @@ class StrukturAnalyzer:
         ws_summary.append([])
         ws_summary.append(["Category", "Total Items", "Matched", "Missing", "Major Diff", "Cost Impact (Rp)"])
         
-        for row_idx, (category, data) in enumerate(self.category_summary.items(), start=4):
+        for category, data in self.category_summary.items():
             ws_summary.append([
                 category,
                 data['total_items'],
@@ -378,41 +582,49 @@ class StrukturAnalyzer:
                 data['total_dampak_biaya']
             ])
         
-        # Sheet 2: Matched Items
-        if self.matched_items:
-            ws_matched = wb.create_sheet("Matched Items")
-            if self.matched_items:
-                df_matched = pd.DataFrame(self.matched_items)
-                for r_idx, row in enumerate([df_matched.columns.tolist()] + df_matched.values.tolist(), start=1):
-                    ws_matched.append(row)
-        
-        # Sheet 3: Missing in RAB
-        if self.unmatched_gambar:
-            ws_missing = wb.create_sheet("Missing in RAB")
-            df_missing = pd.DataFrame(self.unmatched_gambar)
-            for r_idx, row in enumerate([df_missing.columns.tolist()] + df_missing.values.tolist(), start=1):
-                ws_missing.append(row)
-        
-        # Sheet 4: RAB Not in Gambar
-        if self.unmatched_rab:
-            ws_rab_only = wb.create_sheet("RAB Not in Gambar")
-            df_rab_only = pd.DataFrame(self.unmatched_rab)
-            for r_idx, row in enumerate([df_rab_only.columns.tolist()] + df_rab_only.values.tolist(), start=1):
-                ws_rab_only.append(row)
+        # Sheet 2-4: Matched Items, Missing in RAB, RAB Not in Gambar
+        for sheet_name, rows in (("Matched Items", self.matched_items),
+                                 ("Missing in RAB", self.unmatched_gambar),
+                                 ("RAB Not in Gambar", self.unmatched_rab)):
+            if rows:
+                append_frame(wb.create_sheet(sheet_name), pd.DataFrame(rows))
         
         # Save
         wb.save(output_file)
         print(f"\n✅ Detailed report saved: {output_file}")
 
 
+def read_rab_sheet(rab_file: str, sheet_name: str = RAB_SHEET, header: int = RAB_HEADER_ROW,
+                   rab_cache=None) -> pd.DataFrame:
+    """Read the BOQ sheet, from the parsed-RAB cache when the workbook is unchanged
+    
+    Args:
+        rab_file: Path to RAB struktur file
+        sheet_name: BOQ sheet name
+        header: Header row (0-based) for pd.read_excel
+        rab_cache: None (default cache), False (bypass), directory or RabCache
+    """
+    cache = resolve_rab_cache(rab_cache)
+    
+    def read():
+        return pd.read_excel(rab_file, sheet_name=sheet_name, header=header)
+    
+    if cache is None:
+        return read()
+    return cache.cached(rab_file, f"sheet_{sheet_name}_h{header}", RAB_SHEET_VERSION, read)
+
+
 # Helper function for easy use
-def analyze_struktur_detail(gambar_file: str, rab_file: str, output_dir: str = "output/reports") -> pd.DataFrame:
+def analyze_struktur_detail(gambar_file: str, rab_file: str, output_dir: str = "output/reports",
+                            match_mode: str = 'best', rab_cache=None) -> pd.DataFrame:
     """Convenience function for detailed struktur analysis
     
     Args:
         gambar_file: Path to volume gambar file
         rab_file: Path to RAB struktur file
         output_dir: Output directory for reports
+        match_mode: 'best', 'one_to_one' or 'aggregate' (see StrukturAnalyzer.match_items)
+        rab_cache: Parsed-RAB cache (None = default, False = bypass, see read_rab_sheet)
         
     Returns:
         DataFrame with analysis results
@@ -420,21 +632,24 @@ def analyze_struktur_detail(gambar_file: str, rab_file: str, output_dir: str = "
     import os
     os.makedirs(output_dir, exist_ok=True)
     
-    # Read gambar
+    # Read gambar (data export next to the workbook when present, see volume_export)
     print("Reading volume from gambar...")
-    gambar_df = pd.read_excel(gambar_file, sheet_name='STRUKTUR', header=4)
-    gambar_df = gambar_df[gambar_df.columns[:10]]
-    gambar_df.columns = ['No', 'Item', 'Lokasi', 'Panjang', 'Lebar', 'Tinggi', 'Jumlah', 'Satuan', 'Volume', 'Rumus']
+    exported = read_gambar_sheets(gambar_file)
+    if exported is not None:
+        gambar_df = exported['struktur']
+    else:
+        # Columns by header name, same frame as the export
+        gambar_df = gambar_frame(read_gambar_sheet(gambar_file, 'STRUKTUR'))
     gambar_df = gambar_df[pd.notna(gambar_df['Item'])]
     gambar_df = gambar_df[pd.notna(gambar_df['Volume'])]
     
     # Read RAB
     print("Reading RAB struktur...")
-    rab_df = pd.read_excel(rab_file, sheet_name='BOQ STRUKTUR', header=6)
+    rab_df = read_rab_sheet(rab_file, rab_cache=rab_cache)
     
     # Analyze
     analyzer = StrukturAnalyzer()
-    results_df = analyzer.match_items(gambar_df, rab_df, min_similarity=0.75)
+    results_df = analyzer.match_items(gambar_df, rab_df, min_similarity=0.75, match_mode=match_mode)
     
     # Generate report
     timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
@@ -1,14 +1,33 @@
 """
 Generator Template Excel untuk Input Volume dari Gambar DED
 Template ini akan diisi manual berdasarkan pembacaan gambar
+
+Template dibangun sekali per proses sebagai byte image xlsx di memori
+(template_image, key TEMPLATE_VERSION); file template di disk juga di-cache
+per proses (load_template/open_template, key path + mtime + ukuran), sehingga
+batch konversi tidak membangun atau membaca template berulang kali.
 """
 
-from openpyxl import Workbook
+import io
+import os
+from typing import Dict, Optional, Tuple
+
+from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 
 
+# Naikkan jika isi/layout template berubah (image template lama tidak dipakai lagi)
+TEMPLATE_VERSION = 2
+
+# (TEMPLATE_VERSION, tanggal) -> byte image template hasil generator
+_images: Dict[Tuple[int, str], bytes] = {}
+
+# key template -> (byte image, Workbook hasil parse) untuk load_template/open_template
+_templates: Dict[Tuple, Tuple[bytes, Workbook]] = {}
+
+
 class VolumeTemplateGenerator:
     """Generator template Excel untuk input volume"""
     
@@ -548,39 +567,88 @@ class VolumeTemplateGenerator:
         
         return ws
     
-    def generate(self):
-        """Generate template Excel lengkap"""
-        print("\n" + "="*70)
-        print("MEMBUAT TEMPLATE EXCEL UNTUK INPUT VOLUME")
-        print("="*70)
-        
+    def build(self) -> Workbook:
+        """Bangun semua sheet template di self.wb (tanpa menyimpan)"""
         # Remove default sheet
         if 'Sheet' in self.wb.sheetnames:
             self.wb.remove(self.wb['Sheet'])
         
-        print("\n✓ Membuat sheet STRUKTUR...")
         self.create_struktur_sheet()
-        
-        print("✓ Membuat sheet ARSITEKTUR...")
         self.create_arsitektur_sheet()
-        
-        print("✓ Membuat sheet MEP...")
         self.create_mep_sheet()
-        
-        print("✓ Membuat sheet PANDUAN...")
         self.create_panduan_sheet()
+        return self.wb
+    
+    def generate(self):
+        """Generate template Excel lengkap (dari image template yang di-cache per proses)"""
+        print("\n" + "="*70)
+        print("MEMBUAT TEMPLATE EXCEL UNTUK INPUT VOLUME")
+        print("="*70)
         
-        # Save workbook
-        self.wb.save(self.output_path)
+        print(f"\n✓ Sheet STRUKTUR, ARSITEKTUR, MEP, PANDUAN (template v{TEMPLATE_VERSION})")
+        with open(self.output_path, 'wb') as f:
+            f.write(template_image())
         print(f"\n✓ Template berhasil dibuat: {self.output_path}")
         print("="*70)
         
         return self.output_path
 
 
+def template_image() -> bytes:
+    """Template hasil VolumeTemplateGenerator sebagai byte xlsx, dibangun sekali per proses (per hari)"""
+    key = (TEMPLATE_VERSION, datetime.now().strftime("%d-%m-%Y"))
+    if key not in _images:
+        _images.clear()
+        buffer = io.BytesIO()
+        VolumeTemplateGenerator(None).build().save(buffer)
+        _images[key] = buffer.getvalue()
+    return _images[key]
+
+
+def _template(path: Optional[str]) -> Tuple[bytes, Workbook]:
+    """Byte image dan Workbook hasil parse template (cache per proses)"""
+    if path is None:
+        key = ('generated', TEMPLATE_VERSION, datetime.now().strftime("%d-%m-%Y"))
+    else:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _templates:
+        # Versi lama template yang sama tidak dipakai lagi
+        for old in [k for k in _templates if k[0] == key[0]]:
+            del _templates[old]
+        if path is None:
+            image = template_image()
+        else:
+            with open(path, 'rb') as f:
+                image = f.read()
+        _templates[key] = (image, load_workbook(io.BytesIO(image)))
+    return _templates[key]
+
+
+def load_template(path: Optional[str] = None) -> Workbook:
+    """
+    Template sebagai Workbook yang di-cache per proses, HANYA untuk dibaca
+    (mis. disalin ke workbook write-only); dipakai bersama oleh semua pemanggil
+    
+    Args:
+        path: File template, None = template hasil generator (TEMPLATE_VERSION)
+    """
+    return _template(path)[1]
+
+
+def open_template(path: Optional[str] = None) -> Workbook:
+    """Salinan baru template untuk diisi di tempat (parse dari byte image di memori)"""
+    return load_workbook(io.BytesIO(_template(path)[0]))
+
+
+def clear_template_cache():
+    """Lupakan semua template yang di-cache"""
+    _images.clear()
+    _templates.clear()
+
+
 if __name__ == "__main__":
     import sys
-    import os
     
     # Get project root
     project_root = r"d:\2. NATA_PROJECTAPP\Github_RS.Sari Darma\RS-SARIDARMA"
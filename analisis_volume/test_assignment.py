@@ -0,0 +1,102 @@
+"""
+Unit Tests for Global Assignment
+Tests sparse maximum-weight matching and match modes
+"""
+
+import pytest
+import sys
+import os
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.assignment import (
+    check_match_mode, connected_components, max_weight_assignment, sparse_assignment
+)
+from analisis_volume.struktur_analyzer import StrukturAnalyzer
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+class TestAssignment:
+    """Test assignment solver against brute force"""
+
+    def test_max_weight_matches_brute_force(self):
+        """Test optimal total score on small random matrices"""
+        rng = np.random.default_rng(3)
+        for _ in range(100):
+            rows, cols = (int(x) for x in rng.integers(1, 5, 2))
+            scores = rng.random((rows, cols)) * (rng.random((rows, cols)) < 0.6)
+            pairs = max_weight_assignment(scores)
+
+            assert len({r for r, _ in pairs}) == len({c for _, c in pairs}) == len(pairs)
+            assert all(scores[r, c] > 0 for r, c in pairs)
+
+            small, large = sorted((rows, cols))
+            matrix = scores if rows <= cols else scores.T
+            best = max(
+                sum(matrix[i, perm[i]] for i in range(small))
+                for perm in itertools.permutations(range(large), small)
+            )
+            assert abs(sum(scores[r, c] for r, c in pairs) - best) < 1e-9
+
+    def test_sparse_components(self):
+        """Test components are solved independently"""
+        edges = {(0, 0): 0.9, (1, 0): 0.95, (1, 1): 0.9, (2, 5): 0.88}
+
+        assert len(connected_components(list(edges))) == 2
+        assert sparse_assignment(edges) == {0: 0, 1: 1, 2: 5}
+
+    def test_unknown_mode(self):
+        """Test invalid match mode is rejected"""
+        with pytest.raises(ValueError):
+            check_match_mode('greedy')
+
+
+class TestMatchModes:
+    """Test match modes in both comparators"""
+
+    GAMBAR = ["Plesteran Dinding", "Plesteran dinding", "Galian Tanah"]
+    RAB = ["Plesteran Dinding 1:4", "Plesteran Dinding 1:2", "Urugan Pasir"]
+
+    def _comparator(self, match_mode):
+        comparator = VolumeComparator({}, {}, match_mode=match_mode, match_cache=False)
+        comparator.gambar_data['struktur'] = pd.DataFrame({
+            'Item': self.GAMBAR, 'Volume': [2.0, 3.0, 1.0], 'Satuan': ['m2'] * 3,
+        })
+        comparator.rab_data['struktur'] = pd.DataFrame({
+            'item': self.RAB, 'volume': [5.0, 5.0, 1.0], 'satuan': ['m2'] * 3,
+        })
+        return comparator
+
+    def test_one_to_one(self):
+        """Test each RAB row is used by at most one gambar item"""
+        result = self._comparator('one_to_one').compare_volumes('struktur')
+
+        assert result['Item RAB'].tolist()[:2] == ["Plesteran Dinding 1:4", "Plesteran Dinding 1:2"]
+        assert result['Gambar per RAB'].tolist() == [1, 1, 0, 0]
+
+    def test_aggregate(self):
+        """Test gambar items sharing a RAB row are summed into one row"""
+        result = self._comparator('aggregate').compare_volumes('struktur')
+        first = result.iloc[0]
+
+        assert first['Item'] == "Plesteran Dinding; Plesteran dinding"
+        assert first['Volume Gambar'] == 5.0
+        assert first['Status'] == 'MATCH'
+        assert first['Gambar per RAB'] == 2
+
+    def test_struktur_modes(self):
+        """Test StrukturAnalyzer one_to_one and aggregate modes"""
+        gambar_df = pd.DataFrame({'Item': self.GAMBAR, 'Volume': [2.0, 3.0, 1.0], 'Satuan': ['m2'] * 3})
+        rab_df = pd.DataFrame({'PEKERJAAN': self.RAB, 'VOLUME': [5.0, 5.0, 1.0], 'UNIT': ['m2'] * 3})
+
+        result = StrukturAnalyzer().match_items(gambar_df, rab_df, match_mode='one_to_one')
+        assert result['Item_RAB'].tolist()[:2] == ["Plesteran Dinding 1:4", "Plesteran Dinding 1:2"]
+
+        result = StrukturAnalyzer().match_items(gambar_df, rab_df, match_mode='aggregate')
+        assert result['Volume_Gambar'].tolist()[0] == 5.0
+        assert result['Status'].tolist()[0] == '✓ OK'
@@ -0,0 +1,79 @@
+"""
+Unit Tests for the Auto Read Batch Mode
+Tests file selection, the JSON run summary and exit codes
+"""
+
+import pytest
+import sys
+import os
+import json
+
+import ezdxf
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# auto_read_workflow imports its sibling modules as top-level modules (script)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analisis_volume.auto_read_workflow import (
+    EXIT_NO_FILES, EXIT_OK, EXIT_PARTIAL, EXIT_USAGE, SUMMARY_FILE, batch_main,
+)
+
+
+def _write_dxf(path, columns):
+    doc = ezdxf.new()
+    doc.layers.add('S-KOLOM')
+    msp = doc.modelspace()
+    for i in range(columns):
+        msp.add_lwpolyline([(i * 5, 0), (i * 5 + 0.4, 0), (i * 5 + 0.4, 0.4), (i * 5, 0.4)], close=True,
+                           dxfattribs={'layer': 'S-KOLOM'})
+        msp.add_text('K1 40x40', dxfattribs={'layer': 'S-KOLOM', 'insert': (i * 5, 1)})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.saveas(path)
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Project folder with two valid drawings and one broken file"""
+    dxf = tmp_path / 'drawing' / 'dxf'
+    _write_dxf(dxf / 'str' / 'denah.dxf', 3)
+    _write_dxf(dxf / 'mep' / 'lampu.dxf', 2)
+    (dxf / 'str' / 'rusak.dxf').write_text('bukan dxf')
+    return tmp_path
+
+
+class TestBatchMode:
+    """Test batch_main"""
+
+    def test_all_files_with_failure(self, project, capsys):
+        """Test every DXF is converted in a pool, failures reported in summary and exit code"""
+        code = batch_main(['--all', '--jobs', '2', '--base-dir', str(project)])
+        assert code == EXIT_PARTIAL
+
+        summary = json.loads((project / 'output' / 'volumes' / SUMMARY_FILE).read_text(encoding='utf-8'))
+        assert (summary['files'], summary['succeeded'], summary['failed']) == (3, 2, 1)
+        assert summary['exit_code'] == EXIT_PARTIAL
+        results = {os.path.basename(r['file']): r for r in summary['results']}
+        assert results['rusak.dxf']['status'] == 'failed' and results['rusak.dxf']['output'] is None
+        assert results['denah.dxf']['items'] > 0 and results['denah.dxf']['seconds'] > 0
+        assert os.path.exists(results['lampu.dxf']['output'])
+        assert 'log' not in results['lampu.dxf']
+        assert 'Log rusak.dxf' in capsys.readouterr().out
+
+    def test_category_output_dir(self, project, tmp_path):
+        """Test --category selects files, outputs and summary go to --output-dir"""
+        output_dir = tmp_path / 'hasil'
+        code = batch_main(['--category', 'mep', '--jobs', '1', '--output-dir', str(output_dir),
+                           '--base-dir', str(project)])
+        assert code == EXIT_OK
+        assert (output_dir / 'Volume_dari_Gambar_AUTO_mep_lampu.xlsx').exists()
+        summary = json.loads((output_dir / SUMMARY_FILE).read_text(encoding='utf-8'))
+        assert summary['categories'] == ['mep'] and summary['files'] == 1
+
+    def test_no_files_and_usage(self, tmp_path):
+        """Test exit codes without matching files and without a selection"""
+        assert batch_main(['--category', 'ars', '--base-dir', str(tmp_path)]) == EXIT_NO_FILES
+        assert (tmp_path / 'output' / 'volumes' / SUMMARY_FILE).exists()
+        with pytest.raises(SystemExit) as exc:
+            batch_main(['--jobs', '2'])
+        assert exc.value.code == EXIT_USAGE
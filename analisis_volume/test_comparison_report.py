@@ -0,0 +1,118 @@
+"""
+Unit Tests for the Comparison Report Workbooks
+Tests the write-only report layout and its conditional-formatting rules
+"""
+
+import pytest
+import sys
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.struktur_analyzer import StrukturAnalyzer
+from analisis_volume.volume_comparator import VolumeComparator, _status_categorical
+
+
+@pytest.fixture
+def comparator():
+    result = pd.DataFrame({
+        'Item': ['Kolom K1', 'Balok B1', 'TIDAK DITEMUKAN'],
+        'Item RAB': ['Kolom K1 40x40', 'TIDAK DITEMUKAN', 'Sloof S1'],
+        'Satuan': ['m3', None, 'm3'], 'Volume Gambar': [1.28, 3.0, 0.0], 'Volume RAB': [1.3, 0.0, 2.0],
+        'Selisih': [-0.02, 3.0, -2.0], 'Selisih %': [-1.538, 100.0, -100.0],
+        'Status': ['MATCH', 'HANYA DI GAMBAR', 'HANYA DI RAB'], 'Similarity': [0.95, 0.0, 0.0],
+        'Gambar per RAB': [1, 0, 0],
+    })
+    result['Status'] = _status_categorical(result['Status'])
+    comparator = VolumeComparator('Volume_dari_Gambar.xlsx', {}, match_cache=False)
+    comparator.comparison_results = {'struktur': result, 'arsitektur': pd.DataFrame(), 'mep': result.iloc[:1]}
+    return comparator
+
+
+def _rules(ws):
+    return [(str(cf.sqref), rule.formula[0]) for cf in ws.conditional_formatting for rule in cf.rules]
+
+
+class TestComparisonReport:
+    """Test VolumeComparator.generate_report"""
+
+    def test_comparison_sheet(self, comparator, tmp_path):
+        """Test data rows as plain values, status colours and column format as rules"""
+        output = tmp_path / 'LAPORAN.xlsx'
+        comparator.generate_report(str(output))
+
+        wb = load_workbook(output)
+        assert wb.sheetnames == ['RINGKASAN', 'STRUKTUR', 'MEP']
+
+        ws = wb['STRUKTUR']
+        assert ws['A1'].value == 'PERBANDINGAN VOLUME STRUKTUR'
+        assert {str(r) for r in ws.merged_cells.ranges} == {'A1:J1'}
+        assert ws['I3'].value == 'Status' and ws['I3'].fill.fgColor.rgb == '00366092'
+        assert [cell.value for cell in ws[5]] == [2, 'Balok B1', 'TIDAK DITEMUKAN', None, 3, 0, 3, 100,
+                                                  'HANYA DI GAMBAR', 0]
+        assert ws.max_row == 6
+        assert ws['A4'].fill.fill_type is None
+        assert ws.column_dimensions['B'].width == 35
+        assert _rules(ws) == [
+            ('A4:J6', 'OR($I4="HANYA DI GAMBAR",$I4="HANYA DI RAB",$I4="SELISIH BESAR")'),
+            ('A4:J6', '$I4="MATCH"'),
+            ('A4:J6', 'TRUE'),
+            ('H4:H6', 'TRUE'),
+        ]
+        assert [rule.dxf.numFmt.formatCode for cf in ws.conditional_formatting for rule in cf.rules
+                if str(cf.sqref) == 'H4:H6'] == ['0.00']
+
+    def test_summary_sheet(self, comparator, tmp_path):
+        """Test summary rows per non-empty category"""
+        output = tmp_path / 'LAPORAN.xlsx'
+        comparator.generate_report(str(output))
+
+        ws = load_workbook(output)['RINGKASAN']
+        assert ws['A9'].value == 'Kategori'
+        assert [cell.value for cell in ws[10]] == ['STRUKTUR', 3, 1, 0, 1, 1, '⚠ PERLU REVIEW']
+        assert [cell.value for cell in ws[11]] == ['MEP', 1, 1, 0, 0, 0, '✓ OK']
+        assert ws.max_row == 11
+        assert [formula for _, formula in _rules(ws)] == ['$G10="✓ OK"', '$G10="⚠ PERLU REVIEW"', 'TRUE']
+
+    def test_continuation_sheets(self, comparator, tmp_path):
+        """Test rows beyond MAX_SHEET_ROWS continue on 'STRUKTUR (2)' with an index sheet"""
+        comparator.MAX_SHEET_ROWS = 5
+        output = tmp_path / 'LAPORAN.xlsx'
+        comparator.generate_report(str(output))
+
+        wb = load_workbook(output)
+        assert wb.sheetnames == ['RINGKASAN', 'DAFTAR SHEET', 'STRUKTUR', 'STRUKTUR (2)', 'MEP']
+        index = [[cell.value for cell in row] for row in wb['DAFTAR SHEET'].iter_rows(min_row=2)]
+        assert index == [['STRUKTUR', 'STRUKTUR', None, 1, 2, 2],
+                         ['STRUKTUR (2)', 'STRUKTUR', None, 3, 3, 1],
+                         ['MEP', 'MEP', None, 1, 1, 1]]
+        ws = wb['STRUKTUR (2)']
+        assert ws['A1'].value == 'PERBANDINGAN VOLUME STRUKTUR (2)'
+        assert [cell.value for cell in ws[4]][:3] == [3, 'TIDAK DITEMUKAN', 'Sloof S1']
+        assert _rules(ws)[0][0] == 'A4:J4'
+
+
+class TestDetailReport:
+    """Test StrukturAnalyzer.generate_detail_report"""
+
+    def test_sheets_from_frames(self, tmp_path):
+        """Test item lists become sheets with a header row, empty lists no sheet"""
+        analyzer = StrukturAnalyzer()
+        analyzer.category_summary = {'KOLOM': {'total_items': 2, 'matched': 1, 'missing': 1,
+                                               'major_diff': 0, 'total_dampak_biaya': 1500000.0}}
+        analyzer.matched_items = [{'item_gambar': 'Kolom K1', 'volume': 1.28, 'catatan': None}]
+        analyzer.unmatched_gambar = [{'item_gambar': 'Kolom K2', 'volume': 0.64}]
+        analyzer.unmatched_rab = []
+
+        output = tmp_path / 'detail.xlsx'
+        analyzer.generate_detail_report(str(output))
+
+        wb = load_workbook(output)
+        assert wb.sheetnames == ['Summary', 'Matched Items', 'Missing in RAB']
+        assert [cell.value for cell in wb['Summary'][4]] == ['KOLOM', 2, 1, 1, 0, 1500000]
+        rows = [[cell.value for cell in row] for row in wb['Matched Items'].iter_rows()]
+        assert rows == [['item_gambar', 'volume', 'catatan'], ['Kolom K1', 1.28, None]]
@@ -0,0 +1,87 @@
+"""
+Unit Tests for DimensionParser
+Tests compiled/combined regex path and parse cache against expected results
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.dimension_parser import DimensionParser
+
+
+SAMPLE_TEXTS = [
+    "K1 20x30", "K1 (200x300)", "Balok 15/25", "KOLOM 300x400mm", "20x30cm",
+    "0.2x0.3", "0.2x0.3m", "20 x 30", "200 X 300", "H=400", "h=4.0",
+    "HEIGHT=400", "T=150", "t=0.15", "K1 (30x40) H=400", "Kolom K1", "",
+    "ABC DEF", "0x0", "R. RAWAT INAP",
+]
+
+
+class TestParseCache:
+    """Test cached / combined parsing gives the same result as plain parsing"""
+
+    def test_cached_equals_uncached(self):
+        """Test LRU cache and combined pre-screen do not change results"""
+        cached = DimensionParser()
+        plain = DimensionParser(cache_size=0, use_combined=False)
+
+        for text in SAMPLE_TEXTS * 2:
+            assert cached.parse(text) == plain.parse(text)
+            assert cached.parse_all(text) == plain.parse_all(text)
+
+    def test_cache_hits(self):
+        """Test repeated texts are served from the cache"""
+        parser = DimensionParser(cache_size=16)
+
+        for _ in range(3):
+            parser.parse("K1 20x30", context="LT_1_KOLOM")
+
+        info = parser.cache_info()
+        assert info.hits == 2
+        assert info.misses == 1
+
+    def test_cache_disabled(self):
+        """Test cache_size=0 disables caching"""
+        parser = DimensionParser(cache_size=0)
+        assert parser.cache_info() is None
+        assert parser.parse("Balok 25/60") == (0.25, 0.60, None)
+
+
+class TestParseBatch:
+    """Test vectorized batch parsing over text columns"""
+
+    def setup_method(self):
+        """Setup parser"""
+        self.parser = DimensionParser()
+
+    def test_batch_matches_single_parse(self):
+        """Test parse_batch gives the same result as parse() per row"""
+        frame = self.parser.parse_batch(SAMPLE_TEXTS)
+
+        assert list(frame.columns) == ['width', 'length', 'height']
+        assert len(frame) == len(SAMPLE_TEXTS)
+
+        for text, dims in zip(SAMPLE_TEXTS, DimensionParser.batch_to_tuples(frame)):
+            assert dims == self.parser.parse(text)
+
+    def test_batch_series_index_and_missing(self):
+        """Test Series index is preserved and non-text entries stay empty"""
+        import pandas as pd
+
+        series = pd.Series(["K1 20x30", None, "H=400", float('nan')], index=[10, 11, 12, 13])
+        frame = self.parser.parse_batch(series)
+
+        assert list(frame.index) == [10, 11, 12, 13]
+        assert abs(frame.loc[10, 'width'] - 0.20) < 1e-9
+        assert frame.loc[11].isna().all()
+        assert abs(frame.loc[12, 'height'] - 4.0) < 1e-9
+        assert frame.loc[13].isna().all()
+
+    def test_batch_contexts_length(self):
+        """Test contexts must align with texts"""
+        with pytest.raises(ValueError):
+            self.parser.parse_batch(["K1 20x30"], contexts=["A", "B"])
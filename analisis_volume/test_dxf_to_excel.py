@@ -0,0 +1,122 @@
+"""
+Unit Tests for DXF to Excel Converter Output
+Tests the write-only streaming mode against the in-place template mode
+and sheet partitioning of large item sets
+"""
+
+import pytest
+import sys
+import os
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.dxf_to_excel import DXFToExcelConverter
+from analisis_volume.gambar_reader import read_gambar_sheet
+
+
+HEADERS = ['No', 'Kode', 'Item Pekerjaan', 'Lantai', 'Lokasi/As Grid', 'Panjang (m)',
+           'Lebar (m)', 'Tinggi (m)', 'Jumlah', 'Satuan', 'Volume', 'Metode']
+
+
+@pytest.fixture
+def template_file(tmp_path):
+    """Template with a merged title, project info, styled header row and a guide sheet"""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for sheet_name in ('STRUKTUR', 'ARSITEKTUR', 'MEP'):
+        ws = wb.create_sheet(sheet_name)
+        ws['A1'] = f'VOLUME PEKERJAAN {sheet_name} - DARI GAMBAR DED'
+        ws['A1'].font = Font(bold=True)
+        ws.merge_cells('A1:J1')
+        ws['A2'], ws['B2'] = 'Project:', 'RS Sari Dharma'
+        for col, header in enumerate(HEADERS, 1):
+            cell = ws.cell(row=5, column=col, value=header)
+            cell.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+        ws.column_dimensions['C'].width = 30
+    guide = wb.create_sheet('PANDUAN')
+    guide['A1'] = 'PANDUAN PENGISIAN TEMPLATE VOLUME'
+    path = tmp_path / 'template.xlsx'
+    wb.save(path)
+    return str(path)
+
+
+def _converter(template_file, output_file, streaming):
+    converter = DXFToExcelConverter('gambar/str/denah.dxf', template_file, str(output_file), streaming=streaming)
+    converter.items = [
+        {'item': f'Kolom K{i}', 'layer': 'S-KOLOM', 'kategori': 'kolom', 'panjang': 0.4, 'lebar': 0.4,
+         'tinggi': 4.0 if i % 2 else 0, 'jumlah': i, 'satuan': 'm3', 'volume': 0.64 * i, 'method': 'polyline'}
+        for i in range(1, 51)
+    ]
+    return converter
+
+
+class TestStreamingOutput:
+    """Test the write-only output mode"""
+
+    def test_same_cells_as_template_mode(self, template_file, tmp_path):
+        """Test header block and item rows equal the in-place mode, fills via one rule"""
+        assert _converter(template_file, tmp_path / 'legacy.xlsx', streaming=False).populate_template()
+        assert _converter(template_file, tmp_path / 'stream.xlsx', streaming=True).populate_template()
+
+        legacy = load_workbook(tmp_path / 'legacy.xlsx')
+        stream = load_workbook(tmp_path / 'stream.xlsx')
+        assert stream.sheetnames == legacy.sheetnames
+
+        for sheet_name in legacy.sheetnames:
+            expected = [[cell.value for cell in row] for row in legacy[sheet_name].iter_rows()]
+            actual = [[cell.value for cell in row] for row in stream[sheet_name].iter_rows()]
+            assert actual == expected
+
+        ws = stream['STRUKTUR']
+        assert ws.max_row == 55
+        assert {str(r) for r in ws.merged_cells.ranges} == {'A1:J1'}
+        assert ws['A5'].fill.fgColor.rgb == legacy['STRUKTUR']['A5'].fill.fgColor.rgb
+        assert ws.column_dimensions['C'].width == 30
+        assert ws['A6'].fill.fill_type is None
+        rules = [(str(cf.sqref), rule.formula) for cf in ws.conditional_formatting for rule in cf.rules]
+        assert rules == [('A6:L55', ['TRUE'])]
+
+
+class TestSheetPartitioning:
+    """Test continuation and per-lantai sheets"""
+
+    def test_continuation_sheets(self, template_file, tmp_path):
+        """Test items beyond MAX_SHEET_ROWS go to 'STRUKTUR (2)', read back as one sheet"""
+        output = tmp_path / 'split.xlsx'
+        converter = _converter(template_file, output, streaming=False)
+        converter.MAX_SHEET_ROWS = 25
+        assert converter.populate_template()
+
+        wb = load_workbook(output)
+        assert wb.sheetnames == ['DAFTAR SHEET', 'STRUKTUR', 'STRUKTUR (2)', 'STRUKTUR (3)', 'ARSITEKTUR',
+                                 'MEP', 'PANDUAN']
+        index = [[cell.value for cell in row] for row in wb['DAFTAR SHEET'].iter_rows(min_row=2)]
+        assert index == [['STRUKTUR', 'STRUKTUR', None, 1, 20, 20],
+                         ['STRUKTUR (2)', 'STRUKTUR', None, 21, 40, 20],
+                         ['STRUKTUR (3)', 'STRUKTUR', None, 41, 50, 10]]
+        ws = wb['STRUKTUR (2)']
+        assert ws['A5'].value == 'No' and ws['A6'].value == 21 and ws.max_row == 25
+
+        df = read_gambar_sheet(str(output), 'STRUKTUR')
+        assert df['No'].tolist() == list(range(1, 51))
+
+    def test_per_lantai_sheets(self, template_file, tmp_path):
+        """Test one sheet per lantai, item numbers of the category kept"""
+        output = tmp_path / 'lantai.xlsx'
+        converter = _converter(template_file, output, streaming=False)
+        converter.split_by_lantai = True
+        for item in converter.items:
+            item['lantai'] = 'LT.2' if item['jumlah'] % 2 else 'LT.1'
+        assert converter.populate_template()
+
+        wb = load_workbook(output)
+        assert wb.sheetnames == ['DAFTAR SHEET', 'STRUKTUR LT.2', 'STRUKTUR LT.1', 'ARSITEKTUR', 'MEP', 'PANDUAN']
+        assert [row[0].value for row in wb['STRUKTUR LT.1'].iter_rows(min_row=6)] == list(range(2, 51, 2))
+
+        df = read_gambar_sheet(str(output), 'STRUKTUR')
+        assert df['No'].tolist() == list(range(1, 51))
+        assert df['Lantai'].tolist()[:2] == ['LT.2', 'LT.1']
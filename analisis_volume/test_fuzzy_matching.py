@@ -11,7 +11,7 @@ from volume_comparator import VolumeComparator
 
 def test_critical_material_detection():
     """Test critical material detection"""
-    comparator = VolumeComparator({}, {})
+    comparator = VolumeComparator({}, {}, match_cache=False)
     
     print("="*70)
     print("TEST 1: Critical Material Detection")
@@ -62,7 +62,7 @@ def test_critical_material_detection():
 
 def test_fuzzy_matching_thresholds():
     """Test fuzzy matching with new thresholds"""
-    comparator = VolumeComparator({}, {})
+    comparator = VolumeComparator({}, {}, match_cache=False)
     
     print("\n" + "="*70)
     print("TEST 2: Fuzzy Matching with Material-Specific Thresholds")
@@ -0,0 +1,84 @@
+"""
+Unit Tests for the Gambar Workbook Reader
+Tests single-open parsing, the in-process cache and its invalidation
+"""
+
+import pytest
+import sys
+import os
+import time
+
+import pandas as pd
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume import gambar_reader
+from analisis_volume.gambar_reader import clear_gambar_cache, read_gambar_sheet
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+def _write_workbook(path, volume=2.5, sheets=('STRUKTUR', 'ARSITEKTUR', 'MEP')):
+    with pd.ExcelWriter(path) as writer:
+        for sheet in sheets:
+            pd.DataFrame([[1, f'Item {sheet}', 'A-1', 1, 1, 1, 1, 'm3', volume, '']],
+                         columns=['No', 'Item', 'Lokasi', 'P', 'L', 'T', 'Jumlah', 'Satuan', 'Volume', 'Rumus']
+                         ).to_excel(writer, sheet_name=sheet, startrow=4, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Count workbook opens of the reader"""
+    clear_gambar_cache()
+    paths = []
+    excel_file = pd.ExcelFile
+
+    def counting(path, *args, **kwargs):
+        paths.append(path)
+        return excel_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(gambar_reader.pd, 'ExcelFile', counting)
+    yield paths
+    clear_gambar_cache()
+
+
+class TestGambarReader:
+    """Test the cached gambar workbook reader"""
+
+    def test_one_open_for_all_sheets(self, tmp_path, opened):
+        """Test all sheets come from one parse and equal pd.read_excel"""
+        workbook = _write_workbook(tmp_path / 'Volume.xlsx')
+
+        comparator = VolumeComparator(workbook, {}, match_cache=False)
+        comparator.read_volume_gambar()
+        struktur = read_gambar_sheet(workbook, 'STRUKTUR')
+
+        assert len(opened) == 1
+        pd.testing.assert_frame_equal(struktur, pd.read_excel(workbook, sheet_name='STRUKTUR', header=4))
+        assert comparator.gambar_data['mep']['Item'].tolist() == ['Item MEP']
+
+        # Callers get copies
+        struktur.loc[0, 'Item'] = 'diubah'
+        assert read_gambar_sheet(workbook, 'STRUKTUR').loc[0, 'Item'] == 'Item STRUKTUR'
+        assert len(opened) == 1
+
+    def test_saved_workbook_parsed_again(self, tmp_path, opened):
+        """Test a workbook written again during the run is not served from the cache"""
+        workbook = _write_workbook(tmp_path / 'Volume.xlsx')
+        assert read_gambar_sheet(workbook, 'MEP')['Volume'].tolist() == [2.5]
+
+        _write_workbook(tmp_path / 'Volume.xlsx', volume=7.0)
+        later = time.time() + 10
+        os.utime(workbook, (later, later))
+        assert read_gambar_sheet(workbook, 'MEP')['Volume'].tolist() == [7.0]
+        assert len(opened) == 2
+
+    def test_missing_sheet_raises(self, tmp_path, opened):
+        """Test a missing sheet raises its own error, other sheets still load"""
+        workbook = _write_workbook(tmp_path / 'Volume.xlsx', sheets=('STRUKTUR',))
+
+        assert len(read_gambar_sheet(workbook, 'STRUKTUR')) == 1
+        with pytest.raises(ValueError):
+            read_gambar_sheet(workbook, 'MEP')
+        assert len(opened) == 1
@@ -0,0 +1,59 @@
+"""
+Unit Tests for ItemFeatures
+Tests shared per-item feature cache used by the matchers
+"""
+
+import sys
+import os
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.item_features import ItemFeatures, get_features
+from analisis_volume.struktur_analyzer import StrukturAnalyzer
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+class TestItemFeatures:
+    """Test feature extraction and caching"""
+
+    def test_basic_features(self):
+        """Test normalized text, critical flag and key specs"""
+        features = get_features("  Besi D13 Ulir ")
+
+        assert features.clean == "besi d13 ulir"
+        assert features.is_critical
+        assert features.key_specs == frozenset({"d13"})
+        assert not get_features("Plesteran dinding").is_critical
+
+    def test_shared_cache(self):
+        """Test the same string returns the same cached object"""
+        assert get_features("Beton K-225") is get_features("Beton K-225")
+
+        features = ItemFeatures("Beton K-300")
+        assert get_features(features) is features
+
+    def test_struktur_specifications(self):
+        """Test specifications match StrukturAnalyzer and stay unmodified"""
+        analyzer = StrukturAnalyzer()
+        specs = analyzer.extract_specifications("Beton K-300 Kolom 40x60 D16")
+
+        assert specs == {'beton_grade': '300', 'diameter_besi': '16', 'dimensi': '40'}
+        specs['beton_grade'] = '225'
+        assert analyzer.extract_specifications("Beton K-300 Kolom 40x60 D16")['beton_grade'] == '300'
+
+    def test_matchers_accept_features(self):
+        """Test matchers give the same score for strings and features"""
+        comparator = VolumeComparator({}, {}, match_cache=False)
+        analyzer = StrukturAnalyzer()
+        pairs = [
+            ("Beton K-225", "Beton K-300"),
+            ("Besi D13", "Besi D13 ulir"),
+            ("Pasangan bata", "Pasangan Bata Merah"),
+        ]
+
+        for item1, item2 in pairs:
+            assert comparator.fuzzy_match_items(item1, item2) == \
+                comparator.fuzzy_match_items(get_features(item1), get_features(item2))
+            assert analyzer.calculate_similarity(item1, item2) == \
+                analyzer.calculate_similarity(get_features(item1), get_features(item2))
@@ -0,0 +1,147 @@
+"""
+Unit Tests for Match Decision Cache
+Tests persistent pair scores, chosen matches, eviction and bypass
+"""
+
+import pytest
+import sys
+import os
+import json
+
+import pandas as pd
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.match_cache import CACHE_ENV, STATE_KEEP, MatchCache, fingerprint, resolve_cache
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+class TestMatchCache:
+    """Test the SQLite store"""
+
+    def test_roundtrip_after_reopen(self, tmp_path):
+        """Test entries written by one instance are read by the next"""
+        path = str(tmp_path / 'cache.sqlite')
+        cache = MatchCache(path)
+        cache.put_scores('m', 'balok b1', {'balok b1 20x40': 0.92, 'kolom k1': 0.0})
+        cache.put_matches('m', 'rab', {'balok b1': [0, 0.92]})
+        cache.close()
+
+        cache = MatchCache(path)
+        assert cache.get_scores('m', 'balok b1') == {'balok b1 20x40': 0.92, 'kolom k1': 0.0}
+        assert cache.get_matches('m', 'rab', ['balok b1', 'galian']) == {'balok b1': [0, 0.92]}
+        assert cache.get_matches('other', 'rab', ['balok b1']) == {}
+        assert (cache.hits, cache.misses) == (1, 2)
+        cache.close()
+
+    def test_prune_evicts_old_and_excess_entries(self, tmp_path):
+        """Test eviction by age and by table size"""
+        cache = MatchCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+        cache.put_scores('m', 'a', {'x': 1.0, 'y': 0.5, 'z': 0.0})
+        cache.flush()
+        assert cache.prune() == 1
+        assert len(cache.get_scores('m', 'a')) == 2
+
+        cache.max_age_days = -1
+        assert cache.prune() == 2
+        assert cache.get_scores('m', 'a') == {}
+        cache.close()
+
+    def test_resolve_cache(self, tmp_path, monkeypatch):
+        """Test bypass switch and path arguments"""
+        assert resolve_cache(False) is None
+
+        monkeypatch.setenv(CACHE_ENV, 'off')
+        assert resolve_cache() is None
+
+        monkeypatch.setenv(CACHE_ENV, str(tmp_path / 'env.sqlite'))
+        assert resolve_cache().path == str(tmp_path / 'env.sqlite')
+        assert resolve_cache(str(tmp_path / 'arg.sqlite')).path == str(tmp_path / 'arg.sqlite')
+
+    def test_fingerprint_is_order_sensitive(self):
+        """Test RAB lists with the same texts in another order differ"""
+        assert fingerprint(['a', 'b']) == fingerprint(['a', 'b'])
+        assert fingerprint(['a', 'b']) != fingerprint(['b', 'a'])
+        assert fingerprint(['ab']) != fingerprint(['a', 'b'])
+
+
+class TestComparatorCache:
+    """Test VolumeComparator results with the cache"""
+
+    GAMBAR = ["Balok B20/40", "Plesteran Dinding", "Plesteran dinding", "Galian Tanah"]
+    RAB = ["Balok B20/40", "Plesteran Dinding 1:4", "Urugan Pasir", "Beton K-225"]
+
+    def _pairs(self, match_cache, rab_items=None, match_mode='best'):
+        rab_items = rab_items or self.RAB
+        comparator = VolumeComparator({}, {}, match_mode=match_mode, match_cache=match_cache)
+        comparator.gambar_data['struktur'] = pd.DataFrame({'Item': self.GAMBAR, 'Volume': [1.0] * len(self.GAMBAR)})
+        comparator.rab_data['struktur'] = pd.DataFrame({'item': rab_items, 'volume': [1.0] * len(rab_items)})
+        comparator.compare_volumes('struktur')
+        return comparator.match_pairs['struktur']
+
+    @pytest.mark.parametrize('match_mode', ['best', 'one_to_one'])
+    def test_cached_run_is_identical(self, tmp_path, match_mode):
+        """Test a repeat run is served from the cache with the same pairs"""
+        path = str(tmp_path / 'cache.sqlite')
+        expected = self._pairs(False, match_mode=match_mode)
+
+        assert self._pairs(path, match_mode=match_mode) == expected
+
+        # Without a stored match state the chosen matches are read per text
+        cache = MatchCache(path)
+        with cache._connect() as connection:
+            connection.execute('DELETE FROM states')
+        assert self._pairs(cache, match_mode=match_mode) == expected
+        assert cache.misses == 0 and cache.hits == 3
+
+    def test_changed_rab_list_rescored(self, tmp_path):
+        """Test chosen matches are not reused for a different RAB list"""
+        path = str(tmp_path / 'cache.sqlite')
+        self._pairs(path)
+
+        changed = ["Urugan Pasir"] + self.RAB
+        assert self._pairs(path, rab_items=changed) == self._pairs(False, rab_items=changed)
+
+    @pytest.mark.parametrize('match_mode', ['best', 'one_to_one'])
+    def test_state_shared_between_instances(self, tmp_path, match_mode):
+        """Test a second comparator on the same cache rematches incrementally after a RAB edit"""
+        path = str(tmp_path / 'cache.sqlite')
+        self._pairs(path, match_mode=match_mode)
+
+        changed = self.RAB[:2] + ["Galian Tanah Biasa"]
+        comparator = VolumeComparator({}, {}, match_mode=match_mode, match_cache=path)
+        comparator.gambar_data['struktur'] = pd.DataFrame({'Item': self.GAMBAR, 'Volume': [1.0] * len(self.GAMBAR)})
+        comparator.rab_data['struktur'] = pd.DataFrame({'item': changed, 'volume': [1.0] * len(changed)})
+        comparator.compare_volumes('struktur')
+
+        assert comparator.match_stats['struktur'] == {'reused': 4, 'scored': 0}
+        assert comparator.match_pairs['struktur'] == self._pairs(False, rab_items=changed, match_mode=match_mode)
+
+    def test_state_stored_as_json(self, tmp_path):
+        """Test the stored state is plain JSON without the index, unreadable rows are ignored"""
+        path = str(tmp_path / 'cache.sqlite')
+        self._pairs(path)
+
+        cache = MatchCache(path)
+        state, = [json.loads(row[0]) for row in cache._connect().execute('SELECT state FROM states')]
+        assert sorted(state) == ['matcher', 'rab_clean', 'results']
+        assert len(state['results']) == len(self.GAMBAR)
+
+        with cache._connect() as connection:
+            connection.execute("UPDATE states SET state = x'80049500'")
+        assert cache.get_state(state['matcher'], 'struktur', 'g', 'r') is None
+        cache.close()
+
+    def test_state_kept_per_category(self, tmp_path):
+        """Test only the newest STATE_KEEP states of a category are stored"""
+        cache = MatchCache(str(tmp_path / 'cache.sqlite'))
+        for n in range(6):
+            cache.put_state('m', 'struktur', 'g', f'r{n}', {'n': n})
+            cache.flush()
+
+        assert cache.get_state('m', 'struktur', 'g', 'r5') == {'n': 5}
+        assert cache.get_state('m', 'struktur', 'g', 'r0') == {'n': 5}
+        assert cache.get_state('m', 'mep', 'g', 'r5') is None
+        assert cache._connect().execute('SELECT COUNT(*) FROM states').fetchone()[0] == STATE_KEEP
+        cache.close()
@@ -0,0 +1,192 @@
+"""
+Unit Tests for CandidateIndex
+Tests candidate blocking for RAB matching against a full scan
+"""
+
+import pytest
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.match_index import CandidateIndex
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+RAB_ITEMS = [
+    "Pekerjaan Galian Tanah Pondasi",
+    "Beton K-225 untuk Kolom",
+    "Balok B20/40",
+    "Balok B30/45",
+    "Balok B20/40",
+    "Pasangan Dinding Bata Merah",
+    "Plesteran Dinding 1:4",
+    "Pipa PVC D 1/2",
+    "Kabel NYM 3x2.5mm",
+    "Keramik Lantai 40x40cm",
+]
+
+
+class TestCandidateIndex:
+    """Test candidate generation and ratio bounds"""
+
+    def test_containment_always_candidate(self):
+        """Test rows containing the query survive any top_k cut-off"""
+        index = CandidateIndex(RAB_ITEMS, top_k=1)
+        candidates = index.candidates("dinding")
+
+        assert 5 in candidates
+        assert 6 in candidates
+
+    def test_ratio_upper_bounds(self):
+        """Test bounds never fall below the real SequenceMatcher ratio"""
+        from difflib import SequenceMatcher
+
+        index = CandidateIndex(RAB_ITEMS)
+        query = "balok b20/45"
+        bounds = index.ratio_upper_bounds(query)
+
+        assert len(bounds) == len(RAB_ITEMS)
+        for row, text in enumerate(index.texts):
+            assert bounds[row] >= SequenceMatcher(None, query, text).ratio()
+
+    def test_empty_index(self):
+        """Test empty RAB gives no candidates"""
+        index = CandidateIndex([])
+        assert index.candidates("Balok") == []
+        assert len(index.ratio_upper_bounds("Balok")) == 0
+
+
+class TestFindBestMatch:
+    """Test indexed matching equals a full scan"""
+
+    @pytest.mark.parametrize("query", [
+        "Balok B20/40", "Balok Bc0/4", "Dinding bata", "Kabel NYM 3x2.5",
+        "Pipa PVC D 3/4", "Beton K-300 Kolom", "Atap Genteng",
+    ])
+    def test_same_as_full_scan(self, query):
+        """Test best row and score match an exhaustive first-best scan"""
+        comparator = VolumeComparator({}, {}, match_cache=False)
+        index = CandidateIndex(RAB_ITEMS, top_k=1)
+
+        expected_pos, expected_score = None, 0.0
+        for pos, rab_item in enumerate(RAB_ITEMS):
+            score = comparator.fuzzy_match_items(query, rab_item, check_threshold=True)
+            if score > expected_score and score > 0:
+                expected_pos, expected_score = pos, score
+
+        assert comparator._find_best_match(query, RAB_ITEMS, index) == (expected_pos, expected_score)
+
+
+class TestCompareVolumes:
+    """Test RAB-only rows come from the chosen pairs"""
+
+    def _comparator(self, gambar_items, rab_items):
+        comparator = VolumeComparator({}, {}, match_cache=False)
+        comparator.gambar_data['struktur'] = pd.DataFrame({
+            'Item': gambar_items,
+            'Volume': [1.0] * len(gambar_items),
+            'Satuan': ['m3'] * len(gambar_items),
+        })
+        comparator.rab_data['struktur'] = pd.DataFrame({
+            'item': rab_items,
+            'volume': [1.0] * len(rab_items),
+            'satuan': ['m3'] * len(rab_items),
+        })
+        return comparator
+
+    def test_rab_only_is_set_difference(self):
+        """Test a RAB row similar to a gambar item but not chosen stays RAB-only"""
+        comparator = self._comparator(
+            ["Balok B20/40"],
+            ["Balok B20/40", "Balok B20/40 ", "Pasangan Bata Merah"],
+        )
+        result = comparator.compare_volumes('struktur')
+
+        assert comparator.match_pairs['struktur'] == [(0, 0, 1.0)]
+        rab_only = result[result['Status'] == 'HANYA DI RAB']['Item RAB'].tolist()
+        assert rab_only == ["Balok B20/40 ", "Pasangan Bata Merah"]
+
+    def test_many_to_one_reported(self):
+        """Test gambar items sharing one RAB row are counted"""
+        comparator = self._comparator(
+            ["Plesteran Dinding", "Plesteran dinding", "Galian Tanah"],
+            ["Plesteran Dinding 1:4", "Urugan Pasir"],
+        )
+        result = comparator.compare_volumes('struktur')
+
+        assert result['Gambar per RAB'].tolist() == [2, 2, 0, 0]
+        assert result['Status'].tolist()[-1] == 'HANYA DI RAB'
+
+    def test_status_categorical_and_counts(self):
+        """Test Status is categorical and counts come from value_counts"""
+        comparator = self._comparator(
+            ["Plesteran Dinding", "Galian Tanah"],
+            ["Plesteran Dinding 1:4", "Urugan Pasir"],
+        )
+        comparator.rab_data['struktur'].loc[0, 'volume'] = 2.0
+        result = comparator.compare_volumes('struktur')
+
+        assert isinstance(result['Status'].dtype, pd.CategoricalDtype)
+        assert result['Status'].tolist() == ['SELISIH BESAR', 'HANYA DI GAMBAR', 'HANYA DI RAB']
+        assert result['Selisih %'].tolist() == [-50.0, 100.0, -100.0]
+        assert VolumeComparator.status_counts(result) == {
+            'total': 3, 'match': 0, 'selisih': 1, 'gambar_only': 1, 'rab_only': 1,
+        }
+
+    def test_sharded_matching_is_identical(self):
+        """Test matching sharded over worker processes gives the same pairs"""
+        gambar_items = [f"Kolom K{i} 30x40" for i in range(12)] + ["Galian Tanah"]
+        rab_items = [f"Kolom K{i} 30x40 beton" for i in range(0, 12, 2)] + ["Urugan Pasir"]
+
+        comparator = self._comparator(gambar_items, rab_items)
+        comparator.compare_volumes('struktur')
+
+        sharded = self._comparator(gambar_items, rab_items)
+        sharded.match_jobs = 2
+        sharded.SHARD_MIN_ITEMS = 1
+        sharded.compare_volumes('struktur')
+
+        assert sharded.match_pairs == comparator.match_pairs
+
+    def test_parallel_categories_merged_in_order(self):
+        """Test per-category processes give the same results as a sequential run"""
+        sequential = self._comparator(["Galian Tanah"], [])
+        sequential.rab_files = {'struktur': 'tidak_ada.xlsx'}
+        sequential.compare_categories(jobs=1)
+
+        parallel = self._comparator(["Galian Tanah"], [])
+        parallel.rab_files = {'struktur': 'tidak_ada.xlsx'}
+        parallel.compare_categories(jobs=3)
+
+        assert list(parallel.comparison_results) == ['struktur', 'arsitektur', 'mep']
+        for category, result in sequential.comparison_results.items():
+            pd.testing.assert_frame_equal(parallel.comparison_results[category], result)
+
+    @pytest.mark.parametrize('match_mode', ['best', 'one_to_one', 'aggregate'])
+    def test_incremental_rerun_equals_full(self, match_mode):
+        """Test a rerun after RAB/gambar edits equals a fresh comparison"""
+        gambar_items = ["Plesteran Dinding", "Plesteran dinding", "Galian Tanah", "Balok B20/40"]
+        rab_items = ["Plesteran Dinding 1:4", "Urugan Pasir", "Balok B20/40"]
+        comparator = self._comparator(gambar_items, rab_items)
+        comparator.match_mode = match_mode
+        comparator.compare_volumes('struktur')
+
+        edited_gambar = gambar_items[:3] + ["Galian Tanah Biasa"]
+        edited_rab = ["Galian Tanah", "Plesteran Dinding 1:4", "Balok B20/40 K-225", "Plesteran Dinding"]
+        incremental = comparator
+        fresh = self._comparator(edited_gambar, edited_rab)
+        fresh.match_mode = match_mode
+        for target in (incremental, fresh):
+            target.gambar_data['struktur'] = fresh.gambar_data['struktur']
+            target.rab_data['struktur'] = fresh.rab_data['struktur']
+
+        result = incremental.compare_volumes('struktur')
+        expected = fresh.compare_volumes('struktur')
+
+        assert incremental.match_stats['struktur']['reused'] > 0
+        assert incremental.match_pairs == fresh.match_pairs
+        pd.testing.assert_frame_equal(result, expected)
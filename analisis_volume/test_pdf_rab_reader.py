@@ -0,0 +1,137 @@
+"""
+Unit Tests for the PDF RAB Reader
+Tests number formats, table layout of a text-layer page and the per-page cache
+"""
+
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume import rab_reader
+from analisis_volume.pdf_table import parse_number
+from analisis_volume.rab_cache import RabCache
+from analisis_volume.rab_reader import RABReader
+
+
+HEADER = [(50, 700, 'NO.'), (120, 700, 'URAIAN'), (300, 700, 'SATUAN'), (360, 700, 'VOLUME'),
+          (420, 706, 'HARGA SATUAN'), (432, 694, '(Rp.)'), (500, 700, 'JUMLAH')]
+
+
+def _page(*rows):
+    """Header + rows of (no, uraian, satuan, volume, harga, jumlah), one every 12 points"""
+    texts = list(HEADER)
+    y = 680
+    for no, item, unit, volume, price, total in rows:
+        for x, text in ((50, no), (120, item), (300, unit)):
+            if text:
+                texts.append((x, y, text))
+        # Numbers right aligned on the header columns (Helvetica digits: 4 points at size 8)
+        for right, text in ((384, volume), (468, price), (524, total)):
+            if text:
+                texts.append((right - 4 * len(text), y, text))
+        y -= 12
+    return texts
+
+
+def _write_pdf(path, pages):
+    """Minimal uncompressed PDF, one Helvetica Tj per text"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    kids = []
+    for texts in pages:
+        content = b''.join(b'BT /F1 8 Tf %d %d Td (%s) Tj ET\n' % (x, y, text.encode('cp1252'))
+                           for x, y, text in texts)
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (len(objects)))
+        kids.append(b'%d 0 R' % len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+
+    data = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(data)
+    data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    data += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    data += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(bytes(data))
+    return str(path)
+
+
+PAGES = [
+    [(200, 750, 'REKAPITULASI'), (120, 700, 'URAIAN PEKERJAAN'), (420, 700, 'JUMLAH HARGA')],
+    _page(('1.1.', 'PEKERJAAN PLUMBING', '', '', '', ''),
+          ('a.', 'Pipa PVC 4"', 'm1', '120.50', '85,000.00', '10,242,500.00'),
+          ('-', 'Pompa booster', 'unit', '2.00', '1,500,000.00', '3,000,000.00'),
+          ('', 'JUMLAH', '', '', '', '13,242,500.00')),
+    _page(('b.', 'Lampu downlight LED', 'bh', '1.234,5', '125.000', '154.312.500')),
+]
+
+
+class TestPdfRABReader:
+    """Test the PDF BOQ reader"""
+
+    def test_parse_number(self):
+        """Test English/Indonesian separators and non-numbers"""
+        assert parse_number('5,660,635.20') == 5660635.2
+        assert parse_number('5.660.635,20') == 5660635.2
+        assert parse_number('1.00') == 1.0
+        assert parse_number('1,000') == 1000.0
+        assert parse_number('0,250') == 0.25
+        assert parse_number('Rp 12.500') == 12500.0
+        assert parse_number('(3.00)') == -3.0
+        assert parse_number('bh') is None
+        assert parse_number('-') is None
+
+    def test_read_pdf(self, tmp_path):
+        """Test items of table pages, rekap page and total rows skipped"""
+        pdf_file = _write_pdf(tmp_path / 'rab.pdf', PAGES)
+        df = RABReader(pdf_file, rab_cache=False, jobs=1).read_pdf()
+
+        assert df['item'].tolist() == ['Pipa PVC 4"', 'Pompa booster', 'Lampu downlight LED']
+        assert df['sheet'].tolist() == ['Halaman 2', 'Halaman 2', 'Halaman 3']
+        assert df['no'].tolist() == ['a.', '-', 'b.']
+        assert df['satuan'].tolist() == ['m1', 'unit', 'bh']
+        assert df['volume'].tolist() == [120.5, 2.0, 1234.5]
+        assert df['harga_satuan'].tolist() == [85000.0, 1500000.0, 125000.0]
+        assert df['jumlah'].tolist() == [10242500.0, 3000000.0, 154312500.0]
+        assert df['kategori'].tolist() == ['mep', 'mep', 'mep']
+
+    def test_pages_cached_by_content(self, tmp_path, monkeypatch):
+        """Test only changed pages are parsed again, result independent of the cache"""
+        cache = RabCache(str(tmp_path / 'cache'))
+        parsed = []
+        read_page = rab_reader._read_pdf_page
+
+        def counting(page_number):
+            parsed.append(page_number)
+            return read_page(page_number)
+
+        monkeypatch.setattr(rab_reader, '_read_pdf_page', counting)
+
+        pdf_file = _write_pdf(tmp_path / 'rab.pdf', PAGES)
+        first = RABReader(pdf_file, rab_cache=cache, jobs=1).read_pdf()
+        assert parsed == [0, 1, 2]
+
+        parsed.clear()
+        pd.testing.assert_frame_equal(RABReader(pdf_file, rab_cache=cache, jobs=1).read_pdf(), first)
+        assert parsed == []
+
+        changed = PAGES[:2] + [_page(('b.', 'Lampu downlight LED', 'bh', '3.00', '125.000', '375.000'))]
+        _write_pdf(tmp_path / 'rab.pdf', changed)
+        df = RABReader(pdf_file, rab_cache=cache, jobs=1).read_pdf()
+        assert parsed == [2]
+        assert df['volume'].tolist() == [120.5, 2.0, 3.0]
+
+    def test_extract_data_dispatches_pdf(self, tmp_path):
+        """Test extract_data reads .pdf files with the PDF reader"""
+        pdf_file = _write_pdf(tmp_path / 'rab.pdf', PAGES)
+        data = RABReader(pdf_file, rab_cache=False, jobs=1).extract_data()
+        assert len(data['mep']) == 3
@@ -0,0 +1,80 @@
+"""
+Unit Tests for Parsed RAB Cache
+Tests content-hash keys, reader integration and bypass
+"""
+
+import sys
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.rab_cache import CACHE_ENV, RabCache, resolve_rab_cache
+from analisis_volume.rab_reader import RABReader
+from analisis_volume.struktur_analyzer import read_rab_sheet
+
+
+def _write_rab(path, volume=12.5):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'BOQ STRUKTUR'
+    for _ in range(6):
+        ws.append([])
+    ws.append(['NO', 'PEKERJAAN', 'VOLUME', 'UNIT'])
+    ws.append([1, 'Beton K-225 kolom', volume, 'm3'])
+    wb.save(path)
+    return str(path)
+
+
+class TestRabCache:
+    """Test the cache directory"""
+
+    def test_store_and_load(self, tmp_path):
+        """Test a stored table is returned until the workbook content changes"""
+        rab_file = _write_rab(tmp_path / 'rab.xlsx')
+        cache = RabCache(str(tmp_path / 'cache'))
+        df = pd.DataFrame({'item': ['Beton K-225'], 'volume': [12.5]})
+
+        assert cache.load(rab_file, 'items', 1) is None
+        cache.store(rab_file, 'items', 1, df)
+        pd.testing.assert_frame_equal(cache.load(rab_file, 'items', 1), df)
+        assert cache.load(rab_file, 'items', 2) is None
+
+        _write_rab(tmp_path / 'rab.xlsx', volume=20.0)
+        assert cache.load(rab_file, 'items', 1) is None
+        assert cache.clear() == 1
+
+    def test_reader_uses_cache(self, tmp_path):
+        """Test the second read comes from the cache and equals the parsed table"""
+        rab_file = _write_rab(tmp_path / 'rab.xlsx')
+        cache = RabCache(str(tmp_path / 'cache'))
+
+        parsed = RABReader(rab_file, rab_cache=cache).read_excel_generic()
+        cached = RABReader(rab_file, rab_cache=cache).read_excel_generic()
+
+        assert len(os.listdir(cache.directory)) == 1
+        pd.testing.assert_frame_equal(cached, parsed)
+        assert cached['volume'].tolist() == [12.5]
+
+    def test_read_rab_sheet(self, tmp_path):
+        """Test the StrukturAnalyzer sheet read is cached per sheet/header"""
+        rab_file = _write_rab(tmp_path / 'rab.xlsx')
+        cache = RabCache(str(tmp_path / 'cache'))
+
+        expected = pd.read_excel(rab_file, sheet_name='BOQ STRUKTUR', header=6)
+        pd.testing.assert_frame_equal(read_rab_sheet(rab_file, rab_cache=cache), expected)
+        pd.testing.assert_frame_equal(read_rab_sheet(rab_file, rab_cache=cache), expected)
+        assert len(os.listdir(cache.directory)) == 1
+
+    def test_resolve_rab_cache(self, tmp_path, monkeypatch):
+        """Test bypass switch and directory arguments"""
+        assert resolve_rab_cache(False) is None
+
+        monkeypatch.setenv(CACHE_ENV, 'off')
+        assert resolve_rab_cache() is None
+
+        monkeypatch.setenv(CACHE_ENV, str(tmp_path))
+        assert resolve_rab_cache().directory == str(tmp_path)
@@ -0,0 +1,95 @@
+"""
+Unit Tests for RAB Reader
+Tests streaming header detection and row extraction
+"""
+
+import pytest
+import sys
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.rab_cache import CACHE_ENV
+from analisis_volume.rab_reader import RABReader
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+@pytest.fixture
+def rab_file(tmp_path):
+    """Workbook with a title block, a header row, data, a total row and a sheet without header"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'BOQ'
+    ws.append(['RENCANA ANGGARAN BIAYA'])
+    ws.append([])
+    ws.append(['NO', 'URAIAN PEKERJAAN', 'VOLUME', 'SATUAN', 'JUMLAH'])
+    ws.append([1, 'Beton K-225 kolom', 12.5, 'm3', 1000000])
+    ws.append([2.0, 'Pasangan bata merah', '1,200', 'm2', None])
+    ws.append([3, 'Galian tanah', 0, 'm3', 0])
+    ws.append([None, None, None, None, None])
+    ws.append([None, 'TOTAL', 13.7, None, 1000000])
+    ws.append([4, 'Instalasi kabel NYY', 40, None, '#REF!'])
+
+    other = wb.create_sheet('Catatan')
+    other.append(['Dokumen ini tidak berisi tabel'])
+
+    path = tmp_path / 'rab.xlsx'
+    wb.save(path)
+    return str(path)
+
+
+class TestRABReader:
+    """Test single-open streaming reader"""
+
+    def test_rows_extracted(self, rab_file):
+        """Test header detection, skipped rows and cell conversion"""
+        df = RABReader(rab_file, rab_cache=False).read_excel_generic()
+
+        assert df['item'].tolist() == ['Beton K-225 kolom', 'Pasangan bata merah', 'Instalasi kabel NYY']
+        assert df['volume'].tolist() == [12.5, 1200.0, 40.0]
+        assert df['no'].tolist() == ['1', '2', '4']
+        assert df['satuan'].tolist() == ['m3', 'm2', 'nan']
+        assert df['jumlah'].tolist() == [1000000.0, 0.0, 0.0]
+        assert df['harga_satuan'].tolist() == [0.0, 0.0, 0.0]
+        assert df['kategori'].tolist() == ['struktur', 'arsitektur', 'mep']
+
+    def test_map_columns(self):
+        """Test header cells map to column positions"""
+        reader = RABReader('')
+        mapping = reader.map_columns(['No.', None, 'Uraian', 'Vol', 'Volume', 'Sat', 'Satuan', 'Harga Total'])
+
+        assert mapping == {'no': 0, 'item': 2, 'volume': 4, 'satuan': 6, 'jumlah': 7}
+
+    def test_extract_data_groups_categories(self, rab_file):
+        """Test extract_data groups streamed items by category"""
+        data = RABReader(rab_file, rab_cache=False).extract_data()
+
+        assert [item['item'] for item in data['struktur']] == ['Beton K-225 kolom']
+        assert [item['item'] for item in data['mep']] == ['Instalasi kabel NYY']
+
+
+class TestReadVolumeRab:
+    """Test concurrent loading of the RAB files of all categories"""
+
+    def test_parallel_load_equals_sequential(self, rab_file, tmp_path, monkeypatch):
+        """Test files load in a pool, with per-file timings and errors collected"""
+        monkeypatch.setenv(CACHE_ENV, 'off')
+        rab_files = {'struktur': rab_file, 'arsitektur': rab_file, 'mep': str(tmp_path / 'tidak_ada.pdf')}
+
+        sequential = VolumeComparator('', rab_files, match_cache=False)
+        sequential.read_volume_rab(jobs=1)
+        parallel = VolumeComparator('', rab_files, match_cache=False)
+        parallel.read_volume_rab(jobs=3)
+
+        for category in rab_files:
+            pd.testing.assert_frame_equal(parallel.rab_data[category], sequential.rab_data[category])
+        stats = parallel.rab_load_stats
+        assert stats['struktur']['items'] == 3 and stats['struktur']['error'] is None
+        assert stats['struktur']['seconds'] > 0
+        assert 'Header ditemukan' in stats['struktur']['log']
+        assert stats['mep']['error'] == 'File tidak ditemukan'
+        assert parallel.rab_data['mep'].empty
@@ -0,0 +1,106 @@
+"""
+Unit Tests for Similarity Backends
+Tests bit-parallel LCS kernel and calibration against difflib
+"""
+
+import pytest
+import sys
+import os
+import random
+from difflib import SequenceMatcher
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.similarity import (
+    FastBackend, SimilarityBackend, get_backend, indel_ratio, lcs_length, lcs_length_many
+)
+from analisis_volume.volume_comparator import VolumeComparator
+
+
+def _lcs_dp(a, b):
+    """Reference dynamic-programming LCS"""
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+class TestLCSKernel:
+    """Test bit-parallel LCS against dynamic programming"""
+
+    def test_single_and_batch(self):
+        """Test big-int and NumPy kernels on short and >64 char queries"""
+        rng = random.Random(7)
+        for _ in range(200):
+            query = ''.join(rng.choice('abc d') for _ in range(rng.randint(0, 90)))
+            choices = [''.join(rng.choice('abcde ') for _ in range(rng.randint(0, 90))) for _ in range(4)]
+            expected = [_lcs_dp(query, c) for c in choices]
+
+            assert [lcs_length(query, c) for c in choices] == expected
+            assert list(lcs_length_many(query, choices)) == expected
+
+    def test_indel_is_upper_bound(self):
+        """Test indel ratio never falls below SequenceMatcher ratio"""
+        pairs = [("beton k-225 kolom", "beton k-300 balok"), ("pipa pvc d 1/2", "pipa pvc d 3/4"), ("", "")]
+        for a, b in pairs:
+            assert indel_ratio(a, b) >= SequenceMatcher(None, a, b).ratio()
+
+
+class TestBackends:
+    """Test backend selection and calibration"""
+
+    def test_fast_backend_calibrated(self):
+        """Test scores at or above the cutoff equal difflib, others stay below"""
+        backend = FastBackend()
+        query = "pekerjaan beton k-225 untuk kolom"
+        choices = ["pekerjaan beton k-225 untuk balok", "pasangan bata merah", "beton k-225 kolom", ""]
+        reference = [SequenceMatcher(None, query, c).ratio() for c in choices]
+
+        scores = backend.ratio_many(query, choices, score_cutoff=0.85)
+        for score, expected in zip(scores, reference):
+            if expected >= 0.85:
+                assert score == expected
+            else:
+                assert score < 0.85
+
+        assert list(backend.ratio_many(query, choices)) == reference
+
+    def test_get_backend(self):
+        """Test names, instances and unknown names"""
+        assert get_backend().name == 'fast'
+        assert get_backend('difflib').name == 'difflib'
+        backend = FastBackend()
+        assert get_backend(backend) is backend
+        with pytest.raises(ValueError):
+            get_backend('levenshtein')
+
+    def test_backend_requires_ratio(self):
+        """Test a backend without ratio() cannot be created, ratio_many() defaults to it"""
+        class NoRatio(SimilarityBackend):
+            name = 'no_ratio'
+
+        class Exact(SimilarityBackend):
+            name = 'exact'
+
+            def ratio(self, a, b, score_cutoff=0.0):
+                return float(a == b)
+
+        with pytest.raises(TypeError):
+            NoRatio()
+        assert list(Exact().ratio_many('beton', ['beton', 'bata'])) == [1.0, 0.0]
+        assert get_backend(Exact).name == 'exact'
+
+    def test_comparator_backends_agree(self):
+        """Test fast and difflib backends give the same thresholded matches"""
+        fast = VolumeComparator({}, {}, match_cache=False)
+        reference = VolumeComparator({}, {}, similarity_backend='difflib', match_cache=False)
+        rab = ["Beton K-225 Kolom", "Plesteran Dinding 1:4", "Pipa PVC D 1/2", "Pasangan Bata Merah"]
+
+        for item in ["Beton K-225 Kolom Lt 2", "Plesteran dinding 1:3", "Pasangan bata", "Atap"]:
+            assert list(fast.fuzzy_match_many(item, rab)) == list(reference.fuzzy_match_many(item, rab))
+            assert [fast.fuzzy_match_items(item, r) for r in rab] == \
+                [reference.fuzzy_match_items(item, r) for r in rab]
@@ -0,0 +1,86 @@
+"""
+Unit Tests for the Volume Template Generator
+Tests the per-process template image and template cache
+"""
+
+import pytest
+import sys
+import os
+
+from openpyxl import load_workbook
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume import dxf_to_excel, template_generator
+from analisis_volume.dxf_to_excel import DXFToExcelConverter
+from analisis_volume.template_generator import (
+    VolumeTemplateGenerator, clear_template_cache, load_template, open_template, template_image,
+)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Count template builds"""
+    clear_template_cache()
+    count = []
+    build = VolumeTemplateGenerator.build
+
+    def counting(self):
+        count.append(1)
+        return build(self)
+
+    monkeypatch.setattr(VolumeTemplateGenerator, 'build', counting)
+    yield count
+    clear_template_cache()
+
+
+class TestTemplateCache:
+    """Test template image and cached template workbooks"""
+
+    def test_generate_builds_once(self, builds, tmp_path):
+        """Test generated files come from one build, a new version builds again"""
+        first = VolumeTemplateGenerator(str(tmp_path / 'a.xlsx')).generate()
+        second = VolumeTemplateGenerator(str(tmp_path / 'b.xlsx')).generate()
+        assert len(builds) == 1
+
+        wb = load_workbook(second)
+        assert wb.sheetnames == ['STRUKTUR', 'ARSITEKTUR', 'MEP', 'PANDUAN']
+        assert wb['STRUKTUR']['C5'].value == 'Item Pekerjaan'
+        assert open(first, 'rb').read() == open(second, 'rb').read()
+
+        template_generator.TEMPLATE_VERSION += 1
+        try:
+            template_image()
+        finally:
+            template_generator.TEMPLATE_VERSION -= 1
+        assert len(builds) == 2
+
+    def test_template_copies_independent(self, builds):
+        """Test open_template gives fresh copies of the cached template"""
+        copy = open_template()
+        copy['STRUKTUR']['C7'] = 'diubah'
+        assert open_template()['STRUKTUR']['C7'].value == 'Galian Tanah Pondasi'
+        assert load_template() is load_template()
+        assert len(builds) == 1
+
+    def test_conversions_share_template(self, tmp_path, monkeypatch):
+        """Test conversions without a template file use the generated template, parsed once"""
+        # dxf_to_excel imports the module as top-level 'template_generator'
+        module = sys.modules[dxf_to_excel.load_template.__module__]
+        module.clear_template_cache()
+        builds, parsed = [], []
+        build, load = module.VolumeTemplateGenerator.build, module.load_workbook
+        monkeypatch.setattr(module.VolumeTemplateGenerator, 'build', lambda self: builds.append(1) or build(self))
+        monkeypatch.setattr(module, 'load_workbook', lambda *args, **kwargs: parsed.append(1) or load(*args, **kwargs))
+
+        for name in ('a.xlsx', 'b.xlsx', 'c.xlsx'):
+            converter = DXFToExcelConverter('denah.dxf', None, str(tmp_path / name), streaming=True)
+            converter.items = [{'item': 'Kolom K1', 'kategori': 'kolom', 'jumlah': 2, 'satuan': 'm3',
+                                'volume': 1.28, 'method': 'polyline'}]
+            assert converter.populate_template()
+
+        assert len(builds) == 1 and len(parsed) == 1
+        ws = load_workbook(tmp_path / 'c.xlsx')['STRUKTUR']
+        assert ws['A5'].value == 'No' and ws['C6'].value == 'Kolom K1'
+        module.clear_template_cache()
@@ -0,0 +1,80 @@
+"""
+Unit Tests for Text Utilities
+Tests AutoCAD MTEXT cleaning and category detection
+"""
+
+import sys
+import os
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.text_utils import CategoryDetector, TextCleaner, clean_text, detect_category
+
+
+class TestTextCleaner:
+    """Test single-pass MTEXT cleaning"""
+
+    def test_formatting_codes(self):
+        """Test documented AutoCAD formatting examples"""
+        text = r'\pxsm1,qd;{\W0.85;\fISOCPEUR|b0|i0|c0|p34;\H0.8x;RAG\P400x600mm}'
+        assert clean_text(text) == 'RAG 400x600mm'
+
+        text = r'{\T0.9;\fISOCPEUR|b0|i0|c0|p34;\C0;SAD.600x400}'
+        assert clean_text(text) == 'SAD 600x400'
+
+    def test_inline_codes(self):
+        """Test stacking, non-breaking space and special symbols"""
+        assert clean_text(r'PIPA %%c100 \S1/2;"') == 'PIPA Ø100 1/2"'
+        assert clean_text(r'm\S2^;') == 'm2'
+        assert clean_text(r'K1\~20x30') == 'K1 20x30'
+        assert clean_text('%%d90 %%p5') == '°90 ±5'
+        assert clean_text(r'\{A\}') == '{A}'
+
+    def test_clean_text_untouched(self):
+        """Test already-clean texts only get whitespace normalized"""
+        assert clean_text('Balok 25/60  H=400') == 'Balok 25/60 H=400'
+        assert clean_text('K1 0.2x0.3 h=4.0') == 'K1 0.2x0.3 h=4.0'
+        assert clean_text('') == ''
+        assert clean_text(None) == ''
+
+    def test_clean_batch(self):
+        """Test batch cleaning keeps order and handles empty entries"""
+        texts = [r'{\C1;K1 20x30}', None, r'{\C1;K1 20x30}', 'PLAT']
+        assert TextCleaner.clean_batch(texts) == ['K1 20x30', '', 'K1 20x30', 'PLAT']
+
+
+class TestCategoryDetector:
+    """Test file-bound category detection"""
+
+    def test_instance_matches_static_detection(self):
+        """Test bound detector gives the same result as detect_category"""
+        file_path = 'drawing/dxf/mep/AC Lantai 1.dxf'
+        detector = CategoryDetector(file_path)
+
+        cases = [
+            ('HVAC', 'AC 2 PK'),
+            ('LT_1_KOLOM', 'K1 30x40'),
+            ('A-WALL', 'Dinding bata'),
+            ('0', 'PVC Ø100'),
+            ('', ''),
+        ]
+        for layer, text in cases:
+            assert detector.detect(layer, text) == detect_category(file_path, layer, text)
+
+    def test_folder_and_layer_cached(self):
+        """Test folder category computed once and layer lookups cached"""
+        detector = CategoryDetector('drawing\\dxf\\str\\Struktur.dxf')
+        assert detector.folder_category == 'struktur'
+
+        detector.detect('S-BEAM', 'B1 20/30')
+        detector.detect('S-BEAM', 'B2 25/40')
+        assert detector._layer_cache == {'S-BEAM': 'struktur'}
+
+    def test_detect_batch(self):
+        """Test batch detection returns aligned arrays"""
+        detector = CategoryDetector('drawing/dxf/mep/AC.dxf')
+        categories, confidences = detector.detect_batch(['HVAC', 'xyz'], ['AC 2 PK', 'abc'])
+
+        assert list(categories) == ['mep', 'mep']
+        assert list(confidences) == [100, 40]
@@ -0,0 +1,128 @@
+"""
+Unit Tests for the Columnar Volume Export
+Tests the fixed schema, freshness against the workbook and reader preference
+"""
+
+import pytest
+import sys
+import os
+import time
+
+import pandas as pd
+
+# Add parent directory to path to support both direct execution and pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analisis_volume.dxf_to_excel import DXFToExcelConverter
+from analisis_volume.gambar_reader import clear_gambar_cache, read_gambar_sheet
+from analisis_volume.volume_comparator import VolumeComparator, _status_categorical
+from analisis_volume.volume_export import (
+    COMPARISON_COLUMNS, ITEM_COLUMNS, export_comparison, export_items, find_export, gambar_frame,
+    read_comparison, read_gambar_sheets,
+)
+
+
+GROUPED = {
+    'struktur': [
+        {'item': 'Kolom K1 40x40', 'grid': 'A-1', 'panjang': 0.4, 'lebar': 0.4, 'tinggi': 4.0,
+         'jumlah': 2, 'satuan': 'm3', 'volume': 1.28, 'method': 'polyline'},
+        {'item': 'TOTAL', 'volume': 1.28},
+    ],
+    'arsitektur': [],
+    'mep': [{'item': 'Lampu Downlight', 'jumlah': 12, 'satuan': 'titik', 'volume': 12, 'method': 'block'}],
+}
+
+
+def _write_workbook(path):
+    with pd.ExcelWriter(path) as writer:
+        for sheet in ('STRUKTUR', 'ARSITEKTUR', 'MEP'):
+            pd.DataFrame([['Plat Lantai', 99.0]]).to_excel(writer, sheet_name=sheet, startrow=5,
+                                                           header=False, index=False)
+    return str(path)
+
+
+class TestVolumeExport:
+    """Test export files and their readers"""
+
+    def test_items_round_trip(self, tmp_path):
+        """Test items export in the workbook sheet layout"""
+        workbook = str(tmp_path / 'Volume_AUTO.xlsx')
+        path = export_items(GROUPED, workbook)
+        assert os.path.basename(path).startswith('Volume_AUTO.items.v1.')
+
+        raw = pd.read_csv(path) if path.endswith('.csv') else pd.read_parquet(path)
+        assert list(raw.columns) == ITEM_COLUMNS
+
+        sheets = read_gambar_sheets(workbook)
+        struktur = sheets['struktur']
+        assert struktur['Item'].tolist() == ['Kolom K1 40x40', 'TOTAL']
+        assert struktur['Volume'].tolist() == [1.28, 1.28]
+        assert struktur['Lokasi'].tolist()[0] == 'A-1' and pd.isna(struktur['Lokasi'][1])
+        assert struktur['Rumus'].tolist() == ['Auto: polyline', 'Auto: DXF']
+        assert sheets['arsitektur'].empty
+        assert sheets['mep']['Satuan'].tolist() == ['titik']
+
+    def test_stale_export_ignored(self, tmp_path):
+        """Test a workbook saved after the export is read instead of the export"""
+        workbook = _write_workbook(tmp_path / 'Volume.xlsx')
+        export_items(GROUPED, workbook)
+        assert find_export(workbook, 'items') is not None
+
+        later = time.time() + 10
+        os.utime(workbook, (later, later))
+        assert find_export(workbook, 'items') is None
+        assert read_gambar_sheets(workbook) is None
+
+    def test_comparator_prefers_export(self, tmp_path):
+        """Test VolumeComparator reads the export (rows filtered like the workbook rows)"""
+        workbook = _write_workbook(tmp_path / 'Volume.xlsx')
+        export_items(GROUPED, workbook)
+
+        comparator = VolumeComparator(workbook, {}, match_cache=False)
+        data = comparator.read_volume_gambar()
+        assert data['struktur']['Item'].tolist() == ['Kolom K1 40x40']
+        assert data['mep']['Volume'].tolist() == [12.0]
+
+    def test_comparison_round_trip(self, tmp_path):
+        """Test comparison results of all categories in one table"""
+        result = pd.DataFrame({
+            'Item': ['Kolom K1', 'TIDAK DITEMUKAN'], 'Item RAB': ['Kolom K1 40x40', 'Balok B1'],
+            'Satuan': ['m3', None], 'Volume Gambar': [1.28, 0.0], 'Volume RAB': [1.3, 2.0],
+            'Selisih': [-0.02, -2.0], 'Selisih %': [-1.5, -100.0], 'Status': ['MATCH', 'HANYA DI RAB'],
+            'Similarity': [0.95, 0.0], 'Gambar per RAB': [1, 0],
+        })
+        result['Status'] = _status_categorical(result['Status'])
+        report = str(tmp_path / 'LAPORAN.xlsx')
+        export_comparison({'struktur': result, 'mep': result.iloc[:0]}, report)
+
+        df = read_comparison(report)
+        assert list(df.columns) == COMPARISON_COLUMNS
+        assert df['kategori'].tolist() == ['struktur', 'struktur']
+        assert df['status'].tolist() == ['MATCH', 'HANYA DI RAB']
+        assert df['satuan'].tolist() == ['m3', '']
+        assert df['selisih_persen'].tolist() == [-1.5, -100.0]
+
+    @pytest.mark.parametrize('streaming', [False, True])
+    def test_export_equals_workbook(self, tmp_path, streaming):
+        """Test converter output read through the export and through the xlsx gives the same frames"""
+        workbook = str(tmp_path / 'Volume_AUTO.xlsx')
+        converter = DXFToExcelConverter('denah.dxf', None, workbook, streaming=streaming)
+        converter.items = [
+            {'item': 'Balok 40/60', 'kode': 'K40', 'kategori': 'balok', 'lantai': 'Unknown', 'grid': 'D30',
+             'panjang': 0.4, 'lebar': 0.6, 'jumlah': 2, 'satuan': 'm3', 'volume': 0.144,
+             'method': 'text_extraction'},
+            {'item': 'Pas. Dinding Bata', 'kategori': 'dinding', 'panjang': 4.0, 'tinggi': 3.0,
+             'satuan': 'm2', 'volume': 12.0, 'method': 'polyline'},
+            {'item': 'Lampu Downlight', 'kategori': 'lampu', 'jumlah': 12, 'satuan': 'titik', 'volume': 12,
+             'method': 'block'},
+        ]
+        assert converter.populate_template()
+
+        exported = read_gambar_sheets(workbook)
+        clear_gambar_cache()
+        for sheet in ('STRUKTUR', 'ARSITEKTUR', 'MEP'):
+            from_workbook = gambar_frame(read_gambar_sheet(workbook, sheet))
+            pd.testing.assert_frame_equal(from_workbook, exported[sheet.lower()])
+
+        struktur = exported['struktur']
+        assert struktur['Item'].tolist() == ['Balok 40/60'] and struktur['Volume'].tolist() == [0.144]
@@ -4,7 +4,67 @@ Clean AutoCAD formatting codes and parse MEP abbreviations
 """
 
 import re
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# All MTEXT inline codes in one alternation, applied in a single re.sub pass
+_MTEXT_CODE = re.compile(
+    r'\\(?:p|[fFHhWwCcTtAaQq])[^;\\{}]*;'                 # \pxsm1,qd; \fISOCPEUR|b0; \H0.8x; \C4; \T0.9;
+    r'|\\S(?P<top>[^;^/#]*)(?P<sep>[\^/#])(?P<bottom>[^;]*);'  # \S1/2; \S1#2; \S2^; (stacking)
+    r'|\\U\+(?P<unicode>[0-9A-Fa-f]{4})'                 # \U+2205
+    r'|\\(?P<literal>[\\{}])'                            # \\ \{ \} (escaped characters)
+    r'|\\[PN~X]'                                         # paragraph/column break, non-breaking space
+    r'|\\[LlOoKk]'                                       # underline/overline/strike on/off
+    r'|[{}]'                                             # formatting groups
+    r'|%%(?P<charcode>\d{3})'                            # %%nnn character code
+    r'|%%(?P<symbol>[cCdDpP%])'                          # %%c Ø, %%d °, %%p ±, %%% %
+    r'|%%[uUoOkK]'                                       # %%u %%o %%k toggles
+    r'|(?<!\d)\.(?=\d)'                                  # SAD.600x400 (dot before size)
+)
+
+# Quick check: texts without these characters only need whitespace cleanup
+_MTEXT_TRIGGER = re.compile(r'[\\{}%.]')
+
+_MTEXT_SYMBOLS = {'c': 'Ø', 'd': '°', 'p': '±', '%': '%'}
+
+_SPACE_CODES = {'\\P', '\\N', '\\~', '\\X'}
+
+
+def _replace_mtext_code(match: re.Match) -> str:
+    """Replacement for one _MTEXT_CODE token"""
+    sep = match.group('sep')
+    if sep is not None:
+        top, bottom = match.group('top'), match.group('bottom')
+        if sep == '^' and not (top and bottom):
+            return top + bottom  # superscript/subscript
+        return f"{top}/{bottom}"
+    
+    if match.group('unicode') is not None:
+        return chr(int(match.group('unicode'), 16))
+    if match.group('literal') is not None:
+        return match.group('literal')
+    if match.group('charcode') is not None:
+        return chr(int(match.group('charcode')))
+    if match.group('symbol') is not None:
+        return _MTEXT_SYMBOLS[match.group('symbol').lower()]
+    
+    token = match.group(0)
+    if token in _SPACE_CODES or token == '.':
+        return ' '
+    return ''
+
+
+@lru_cache(maxsize=65536)
+def _clean_autocad_text_cached(text: str) -> str:
+    """Single-pass MTEXT cleanup, memoized on content"""
+    if _MTEXT_TRIGGER.search(text):
+        text = _MTEXT_CODE.sub(_replace_mtext_code, text)
+    
+    # Clean up extra spaces
+    return ' '.join(text.split())
 
 
 class TextCleaner:
@@ -15,38 +75,46 @@ class TextCleaner:
         """
         Remove AutoCAD formatting codes from text
         
+        All MTEXT inline codes are handled by one combined pattern in a single
+        pass, results are cached per content (MTEXT labels repeat heavily).
+        
         Examples:
             Input:  \\pxsm1,qd;{\\W0.85;\\fISOCPEUR|b0|i0|c0|p34;\\H0.8x;RAG\\P400x600mm}
             Output: RAG 400x600mm
             
             Input:  {\\T0.9;\\fISOCPEUR|b0|i0|c0|p34;\\C0;SAD.600x400}
             Output: SAD 600x400
+            
+            Input:  PIPA %%c100 \\S1/2;"
+            Output: PIPA Ø100 1/2"
         """
         if not text:
             return ""
         
-        # Remove common AutoCAD formatting codes
-        patterns_to_remove = [
-            r'\\pxsm\d+,\w+;',           # \\pxsm1,qd;
-            r'\{\\W[\d.]+;',             # {\\W0.85;
-            r'\\f[^;]+;',                # \\fISOCPEUR|b0|i0|c0|p34;
-            r'\\[HhCcTtAa][\d.]+x?;',   # \\H0.8x; \\C4; \\T0.9;
-            r'\\[PpLl]',                 # \\P \\L (paragraph marks)
-            r'[\{\}]',                   # { }
-            r'\\\\',                     # \\
-        ]
-        
-        cleaned = text
-        for pattern in patterns_to_remove:
-            cleaned = re.sub(pattern, '', cleaned)
-        
-        # Replace dot notation with space (SAD.600x400 → SAD 600x400)
-        cleaned = re.sub(r'\.(?=\d)', ' ', cleaned)
+        return _clean_autocad_text_cached(text)
+    
+    @staticmethod
+    def clean_batch(texts: Iterable[str]) -> List[str]:
+        """
+        Clean a whole list of texts, each distinct text is processed once
         
-        # Clean up extra spaces
-        cleaned = ' '.join(cleaned.split())
+        Args:
+            texts: Iterable of raw AutoCAD texts (None/empty allowed)
         
-        return cleaned.strip()
+        Returns:
+            List of cleaned texts in the same order
+        """
+        seen: Dict[str, str] = {}
+        results = []
+        for text in texts:
+            if not text:
+                results.append("")
+                continue
+            cleaned = seen.get(text)
+            if cleaned is None:
+                cleaned = seen[text] = _clean_autocad_text_cached(text)
+            results.append(cleaned)
+        return results
 
 
 class MEPAbbreviationParser:
@@ -95,6 +163,16 @@ class MEPAbbreviationParser:
         'PL': 'Plat/Slab',
     }
     
+    # MEP abbreviations (category hint)
+    MEP_ABBR = frozenset([
+        'RAG', 'SAG', 'SAD', 'FAD', 'EXH', 'EG', 'AC', 'FCU', 'AHU',
+        'DUCT', 'VRV', 'PWC', 'SWP', 'VWP', 'HYD', 'SPR', 'GAS',
+        'O2', 'VAC', 'AIR', 'MDP', 'SDP', 'LP', 'PP', 'SK', 'LAMPU', 'KABEL',
+    ])
+    
+    # Structure abbreviations (category hint)
+    STR_ABBR = frozenset(['K', 'B', 'S', 'P', 'PL'])
+    
     @staticmethod
     def parse_abbreviation(text: str) -> str:
         """
@@ -135,26 +213,94 @@ class MEPAbbreviationParser:
         if not text:
             return None
         
-        first_word = text.split()[0].upper() if text.split() else ""
-        
-        # MEP abbreviations
-        mep_abbr = ['RAG', 'SAG', 'SAD', 'FAD', 'EXH', 'EG', 'AC', 'FCU', 'AHU',
-                   'DUCT', 'VRV', 'PWC', 'SWP', 'VWP', 'HYD', 'SPR', 'GAS',
-                   'O2', 'VAC', 'AIR', 'MDP', 'SDP', 'LP', 'PP', 'SK', 'LAMPU', 'KABEL']
-        
-        # Structure abbreviations
-        str_abbr = ['K', 'B', 'S', 'P', 'PL']
+        parts = text.split()
+        first_word = parts[0].upper() if parts else ""
         
-        if first_word in mep_abbr:
+        if first_word in MEPAbbreviationParser.MEP_ABBR:
             return 'mep'
-        elif first_word in str_abbr and len(first_word) <= 2:
+        elif first_word in MEPAbbreviationParser.STR_ABBR and len(first_word) <= 2:
             return 'struktur'
         
         return None
 
 
+# Layer keywords per category, checked in this order (substring match)
+_LAYER_KEYWORDS = {
+    'mep': [
+        'ac', 'hvac', 'mep', 'mechanical', 'electrical', 'plumbing',
+        'pipa', 'pipe', 'ducting', 'duct', 'kabel', 'cable',
+        'panel', 'hydrant', 'sprinkler', 'gas', 'medis',
+        'fire', 'alarm', 'lighting', 'power', 'outlet',
+        'air', 'water', 'sanitasi', 'plumb'
+    ],
+    'struktur': [
+        'kolom', 'column', 'balok', 'beam', 'plat', 'slab',
+        'struktur', 'structure', 'sloof', 'pondasi', 'foundation',
+        'footing', 'pile', 'tangga', 'stair'
+    ],
+    'arsitektur': [
+        'dinding', 'wall', 'pintu', 'door', 'jendela', 'window',
+        'arsitektur', 'architecture', 'denah', 'floor plan',
+        'lantai', 'floor', 'plafon', 'ceiling', 'atap', 'roof',
+        'interior', 'eksterior'
+    ],
+}
+
+# Text content patterns per category, checked in this order
+_TEXT_PATTERNS = {
+    'mep': [
+        r'\b(ac|hvac|fcu|ahu)\b',
+        r'\b(rag|sad|fad|exh)\b',
+        r'\bpipa\b',
+        r'\b(hydrant|sprinkler)\b',
+        r'\b(panel|kabel|lampu)\b',
+        r'\b\d+\s*pk\b',  # "2 PK" (AC capacity)
+        r'pvc.*ø',         # "PVC Ø100" (pipe)
+    ],
+    'struktur': [
+        r'\b[ksb]\d+\b',   # K1, B2, S3
+        r'\bkolom\b',
+        r'\bbalok\b',
+        r'\bplat\b',
+    ],
+}
+
+# One precompiled alternation per category
+_LAYER_REGEX = {
+    cat: re.compile('|'.join(re.escape(kw) for kw in keywords))
+    for cat, keywords in _LAYER_KEYWORDS.items()
+}
+_TEXT_REGEX = {
+    cat: re.compile('|'.join(f'(?:{p})' for p in patterns))
+    for cat, patterns in _TEXT_PATTERNS.items()
+}
+
+# Confidence points per source
+_FOLDER_SCORE = 40
+_LAYER_SCORE = 30
+_TEXT_SCORE = 20
+_ABBR_SCORE = 10
+
+
 class CategoryDetector:
-    """Detect category from various sources"""
+    """
+    Detect category from various sources
+    
+    The static methods work on single values. An instance is bound to one
+    DXF file: the folder category is computed once and layer categories are
+    cached, so per-item detection only looks at the item text.
+    
+    Example:
+        detector = CategoryDetector("drawing/dxf/mep/AC.dxf")
+        category, confidence = detector.detect(layer_name, item_text)
+        categories, confidences = detector.detect_batch(layer_names, item_texts)
+    """
+    
+    def __init__(self, file_path: str = ''):
+        self.file_path = file_path
+        self.folder_category = self.from_folder_path(file_path)
+        self._layer_cache: Dict[str, Optional[str]] = {}
+        self._result_cache: Dict[tuple, tuple] = {}
     
     @staticmethod
     def from_folder_path(file_path: str) -> Optional[str]:
@@ -171,11 +317,11 @@ class CategoryDetector:
         
         path_lower = file_path.lower().replace('\\', '/')
         
-        if 'dxf/mep' in path_lower or 'dxf\\mep' in path_lower:
+        if 'dxf/mep' in path_lower:
             return 'mep'
-        elif 'dxf/str' in path_lower or 'dxf\\str' in path_lower:
+        elif 'dxf/str' in path_lower:
             return 'struktur'
-        elif 'dxf/ars' in path_lower or 'dxf\\ars' in path_lower:
+        elif 'dxf/ars' in path_lower:
             return 'arsitektur'
         
         return None
@@ -194,37 +340,9 @@ class CategoryDetector:
         
         layer_lower = layer_name.lower()
         
-        # MEP keywords (comprehensive)
-        mep_keywords = [
-            'ac', 'hvac', 'mep', 'mechanical', 'electrical', 'plumbing',
-            'pipa', 'pipe', 'ducting', 'duct', 'kabel', 'cable',
-            'panel', 'hydrant', 'sprinkler', 'gas', 'medis',
-            'fire', 'alarm', 'lighting', 'power', 'outlet',
-            'air', 'water', 'sanitasi', 'plumb'
-        ]
-        
-        # Struktur keywords
-        str_keywords = [
-            'kolom', 'column', 'balok', 'beam', 'plat', 'slab',
-            'struktur', 'structure', 'sloof', 'pondasi', 'foundation',
-            'footing', 'pile', 'tangga', 'stair'
-        ]
-        
-        # Arsitektur keywords
-        ars_keywords = [
-            'dinding', 'wall', 'pintu', 'door', 'jendela', 'window',
-            'arsitektur', 'architecture', 'denah', 'floor plan',
-            'lantai', 'floor', 'plafon', 'ceiling', 'atap', 'roof',
-            'interior', 'eksterior'
-        ]
-        
-        # Check keywords
-        if any(kw in layer_lower for kw in mep_keywords):
-            return 'mep'
-        elif any(kw in layer_lower for kw in str_keywords):
-            return 'struktur'
-        elif any(kw in layer_lower for kw in ars_keywords):
-            return 'arsitektur'
+        for category, regex in _LAYER_REGEX.items():
+            if regex.search(layer_lower):
+                return category
         
         return None
     
@@ -238,61 +356,35 @@ class CategoryDetector:
         
         text_lower = text.lower()
         
-        # MEP patterns
-        mep_patterns = [
-            r'\b(ac|hvac|fcu|ahu)\b',
-            r'\b(rag|sad|fad|exh)\b',
-            r'\bpipa\b',
-            r'\b(hydrant|sprinkler)\b',
-            r'\b(panel|kabel|lampu)\b',
-            r'\b\d+\s*pk\b',  # "2 PK" (AC capacity)
-            r'pvc.*ø',         # "PVC Ø100" (pipe)
-        ]
-        
-        # Struktur patterns
-        str_patterns = [
-            r'\b[ksb]\d+\b',   # K1, B2, S3
-            r'\bkolom\b',
-            r'\bbalok\b',
-            r'\bplat\b',
-        ]
-        
-        # Check patterns
-        if any(re.search(pattern, text_lower) for pattern in mep_patterns):
-            return 'mep'
-        elif any(re.search(pattern, text_lower) for pattern in str_patterns):
-            return 'struktur'
+        for category, regex in _TEXT_REGEX.items():
+            if regex.search(text_lower):
+                return category
         
         return None
     
     @staticmethod
-    def detect_with_confidence(file_path: str, layer_name: str, text: str) -> tuple[Optional[str], int]:
-        """
-        Detect category with confidence score (0-100)
-        
-        Returns: (category, confidence)
-        """
+    def _combine_scores(folder_cat: Optional[str], layer_cat: Optional[str],
+                        text: str) -> tuple[Optional[str], int]:
+        """Combine folder/layer hints with text hints into (category, confidence)"""
         scores = {'mep': 0, 'struktur': 0, 'arsitektur': 0}
         
         # Folder path (highest confidence: 40 points)
-        folder_cat = CategoryDetector.from_folder_path(file_path)
         if folder_cat:
-            scores[folder_cat] += 40
+            scores[folder_cat] += _FOLDER_SCORE
         
         # Layer name (medium confidence: 30 points)
-        layer_cat = CategoryDetector.from_layer_name(layer_name)
         if layer_cat:
-            scores[layer_cat] += 30
+            scores[layer_cat] += _LAYER_SCORE
         
         # Text content (lower confidence: 20 points)
         text_cat = CategoryDetector.from_text_content(text)
         if text_cat:
-            scores[text_cat] += 20
+            scores[text_cat] += _TEXT_SCORE
         
         # Abbreviation hint (medium confidence: 10 points)
         abbr_cat = MEPAbbreviationParser.get_category_from_abbreviation(text)
         if abbr_cat:
-            scores[abbr_cat] += 10
+            scores[abbr_cat] += _ABBR_SCORE
         
         # Get highest score
         if max(scores.values()) == 0:
@@ -302,6 +394,60 @@ class CategoryDetector:
         confidence = scores[best_category]
         
         return best_category, confidence
+    
+    @staticmethod
+    def detect_with_confidence(file_path: str, layer_name: str, text: str) -> tuple[Optional[str], int]:
+        """
+        Detect category with confidence score (0-100)
+        
+        Returns: (category, confidence)
+        """
+        return CategoryDetector._combine_scores(
+            CategoryDetector.from_folder_path(file_path),
+            CategoryDetector.from_layer_name(layer_name),
+            text,
+        )
+    
+    def layer_category(self, layer_name: str) -> Optional[str]:
+        """Cached from_layer_name for this file"""
+        try:
+            return self._layer_cache[layer_name]
+        except KeyError:
+            category = self._layer_cache[layer_name] = self.from_layer_name(layer_name)
+            return category
+    
+    def detect(self, layer_name: str, text: str) -> tuple[Optional[str], int]:
+        """
+        Detect category of one item of the bound file
+        
+        Returns: (category, confidence)
+        """
+        key = (layer_name, text)
+        result = self._result_cache.get(key)
+        if result is None:
+            result = self._result_cache[key] = self._combine_scores(
+                self.folder_category, self.layer_category(layer_name), text
+            )
+        return result
+    
+    def detect_batch(self, layer_names: Iterable[str], texts: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Detect categories of all items of the bound file
+        
+        Args:
+            layer_names: Layer name per item
+            texts: Item text per item (same length as layer_names)
+        
+        Returns:
+            (categories, confidences): object array (None if undetected) and int array
+        """
+        results = [self.detect(layer, text) for layer, text in zip(layer_names, texts)]
+        
+        categories = np.empty(len(results), dtype=object)
+        categories[:] = [category for category, _ in results]
+        confidences = np.fromiter((conf for _, conf in results), dtype=int, count=len(results))
+        
+        return categories, confidences
 
 
 # Convenience functions
@@ -309,6 +455,10 @@ def clean_text(text: str) -> str:
     """Clean AutoCAD text formatting"""
     return TextCleaner.clean_autocad_text(text)
 
+def clean_texts(texts: Iterable[str]) -> List[str]:
+    """Clean a list of AutoCAD texts"""
+    return TextCleaner.clean_batch(texts)
+
 def parse_abbreviation(text: str) -> str:
     """Parse MEP abbreviation to full name"""
     return MEPAbbreviationParser.parse_abbreviation(text)
@@ -3,29 +3,167 @@ Script Utama: Perbandingan Volume dari Gambar vs RAB
 Menghasilkan laporan analisis lengkap dengan Excel dan visualisasi
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.chart import BarChart, Reference
+from openpyxl.worksheet.cell_range import CellRange
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from datetime import datetime
+from difflib import SequenceMatcher
+import io
 import os
+import time
+
+try:
+    from .assignment import check_match_mode, sparse_assignment
+    from .excel_stream import (
+        EXCEL_MAX_ROWS, INDEX_SHEET, add_rule, append_frame, equals_formula, sheet_parts, write_index,
+    )
+    from .gambar_reader import read_gambar_sheet
+    from .item_features import get_features
+    from .match_cache import MATCHER_VERSION, fingerprint, resolve_cache
+    from .match_index import CandidateIndex, CharCountIndex
+    from .similarity import get_backend
+    from .volume_export import export_comparison, gambar_frame, read_gambar_sheets
+except ImportError:
+    from assignment import check_match_mode, sparse_assignment
+    from excel_stream import (
+        EXCEL_MAX_ROWS, INDEX_SHEET, add_rule, append_frame, equals_formula, sheet_parts, write_index,
+    )
+    from gambar_reader import read_gambar_sheet
+    from item_features import get_features
+    from match_cache import MATCHER_VERSION, fingerprint, resolve_cache
+    from match_index import CandidateIndex, CharCountIndex
+    from similarity import get_backend
+    from volume_export import export_comparison, gambar_frame, read_gambar_sheets
+
+
+CATEGORIES = ['struktur', 'arsitektur', 'mep']
+
+STATUS_REVIEW = 'MATCH ⚠️ REVIEW (Critical material <90%)'
+
+# Urutan kategori Status (status selisih harga 'MATCH ⚠️ PRICE DIFF n%' ditambahkan dinamis)
+STATUS_CATEGORIES = ['MATCH', STATUS_REVIEW, 'SELISIH KECIL', 'SELISIH BESAR', 'HANYA DI GAMBAR', 'HANYA DI RAB']
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Kolom numerik sebagai float array (tidak ada / kosong = 0)"""
+    if column not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+
+def _text(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Kolom sebagai object array (tidak ada / kosong = '')"""
+    if column not in df.columns:
+        return np.full(len(df), '', dtype=object)
+    return df[column].where(pd.notna(df[column]), '').to_numpy(dtype=object)
+
+
+def valid_gambar_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Baris gambar yang valid: ada item dan volume > 0, bukan baris judul/total"""
+    df = df[pd.notna(df['Item'])]
+    df = df[~df['Item'].astype(str).str.contains('TOTAL|PEKERJAAN|^[A-Z]\\.', na=False, regex=True)]
+    df = df[pd.notna(df['Volume'])]
+    return df[df['Volume'] > 0]
+
+
+def _status_categorical(status: pd.Series) -> pd.Categorical:
+    """Status sebagai categorical dengan urutan STATUS_CATEGORIES"""
+    extra = sorted(set(status.astype(str)) - set(STATUS_CATEGORIES))
+    return pd.Categorical(status, categories=STATUS_CATEGORIES + extra)
+
+
+# State of a matching shard worker (set once per process by _init_shard_worker)
+_shard_state = {}
+
+
+def _init_shard_worker(matcher, rab_features, index):
+    """Simpan matcher dan index RAB (read-only) di proses worker"""
+    _shard_state['args'] = (matcher, rab_features, index)
+
+
+def _score_shard(texts: List[str], all_matches: bool) -> List:
+    """Skor satu shard teks gambar terhadap index RAB milik worker"""
+    matcher, rab_features, index = _shard_state['args']
+    return matcher._score_texts(texts, rab_features, index, all_matches)
+
+
+def _load_rab_worker(matcher, category: str, filepath: str):
+    """Baca RAB satu kategori di proses terpisah, lihat VolumeComparator.load_rab_file"""
+    return matcher.load_rab_file(category, filepath)
+
+
+def _compare_category_worker(matcher, category: str, gambar_df: pd.DataFrame, rab_file, state: Dict):
+    """Baca RAB lalu bandingkan satu kategori (dijalankan di proses terpisah)
+
+    Args:
+        state: match_state run sebelumnya untuk kategori ini (untuk matching inkremental)
+
+    Returns:
+        (category, rab_df, pairs, result_df, log output, detik, match_state, statistik baca RAB)
+    """
+    start = time.perf_counter()
+    log = io.StringIO()
+    _, rab_df, load_stats = matcher.load_rab_file(category, rab_file)
+    log.write(load_stats['log'])
+    with redirect_stdout(log):
+        matcher.match_state = state
+        matcher.gambar_data[category] = gambar_df
+        matcher.rab_data[category] = rab_df
+        result = matcher.compare_volumes(category)
+    return (category, matcher.rab_data[category], matcher.match_pairs.get(category, []),
+            result, log.getvalue(), time.perf_counter() - start, matcher.match_state, load_stats)
 
 
 class VolumeComparator:
     """Class untuk membandingkan volume dari gambar dengan RAB"""
     
-    def __init__(self, gambar_file: str, rab_files: dict):
+    # Minimal jumlah teks gambar unik sebelum matching dipecah ke beberapa proses
+    SHARD_MIN_ITEMS = 200
+    
+    # Baris maksimum per sheet laporan; hasil lebih banyak dilanjutkan di sheet 'MEP (2)', ...
+    MAX_SHEET_ROWS = EXCEL_MAX_ROWS
+    
+    def __init__(self, gambar_file: str, rab_files: dict, top_k: int = 50,
+                 similarity_backend=None, match_mode: str = 'best', match_jobs: int = 1,
+                 match_cache=None):
         """
         Args:
             gambar_file: Path ke file Volume_dari_Gambar.xlsx
             rab_files: Dict dengan key 'struktur', 'arsitektur', 'mep' dan value path file RAB
+            top_k: Jumlah kandidat RAB terbaik (TF-IDF) yang di-scoring per item gambar,
+                None = scoring semua kandidat yang berbagi token/trigram
+            similarity_backend: Nama/instance backend similarity ('fast', 'difflib', 'indel'),
+                None = 'fast'
+            match_mode: 'best' (tiap item gambar ambil RAB terbaik), 'one_to_one'
+                (assignment global, satu baris RAB untuk satu item gambar) atau
+                'aggregate' (item gambar dengan baris RAB yang sama dijumlahkan)
+            match_jobs: Jumlah proses untuk matching satu kategori besar; item gambar
+                dibagi ke beberapa worker dengan index RAB yang sama (1 = tanpa shard)
+            match_cache: Cache keputusan matching (SQLite) antar run: None = cache default
+                (lihat match_cache.CACHE_ENV), False = bypass, path file, atau MatchCache
         """
         self.gambar_file = gambar_file
         self.rab_files = rab_files
+        self.top_k = top_k
+        self.similarity = get_backend(similarity_backend)
+        self.match_mode = check_match_mode(match_mode)
+        self.match_jobs = max(1, int(match_jobs or 1))
+        self.match_cache = resolve_cache(match_cache)
         self.gambar_data = {}
         self.rab_data = {}
         self.comparison_results = {}
+        self.match_pairs = {}
+        self.match_state = {}
+        self.match_stats = {}
+        self.rab_load_stats = {}
         
         # Styles
         self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
@@ -40,11 +178,23 @@ class VolumeComparator:
         )
     
     def read_volume_gambar(self) -> Dict[str, pd.DataFrame]:
-        """Baca data volume dari gambar"""
+        """Baca data volume dari gambar
+        
+        Export data (Parquet/CSV, lihat volume_export) di samping file Excel
+        dipakai jika ada dan tidak lebih lama dari file Excel-nya.
+        """
         print("\n" + "="*70)
         print("MEMBACA VOLUME DARI GAMBAR")
         print("="*70)
         
+        exported = read_gambar_sheets(self.gambar_file)
+        if exported is not None:
+            for category, df in exported.items():
+                self.gambar_data[category] = valid_gambar_rows(df)
+                print(f"✓ {category.upper()}: {len(self.gambar_data[category])} item (data export)")
+            print("="*70)
+            return self.gambar_data
+        
         if not os.path.exists(self.gambar_file):
             print(f"✗ File tidak ditemukan: {self.gambar_file}")
             return {}
@@ -53,17 +203,14 @@ class VolumeComparator:
         
         for sheet in sheets:
             try:
-                df = pd.read_excel(self.gambar_file, sheet_name=sheet, header=4)
+                # Workbook dibuka sekali untuk semua sheet (cache in-process, lihat gambar_reader)
+                df = read_gambar_sheet(self.gambar_file, sheet)
                 
-                # Filter data yang valid (ada volume)
-                df = df[df.columns[:10]]  # Ambil 10 kolom pertama
-                df.columns = ['No', 'Item', 'Lokasi', 'Panjang', 'Lebar', 'Tinggi', 'Jumlah', 'Satuan', 'Volume', 'Rumus']
+                # Kolom berdasarkan nama header (sama dengan data export)
+                df = gambar_frame(df)
                 
                 # Remove rows yang tidak valid
-                df = df[pd.notna(df['Item'])]
-                df = df[~df['Item'].astype(str).str.contains('TOTAL|PEKERJAAN|^[A-Z]\\.', na=False, regex=True)]
-                df = df[pd.notna(df['Volume'])]
-                df = df[df['Volume'] > 0]
+                df = valid_gambar_rows(df)
                 
                 self.gambar_data[sheet.lower()] = df
                 print(f"✓ {sheet}: {len(df)} item")
@@ -75,136 +222,706 @@ class VolumeComparator:
         print("="*70)
         return self.gambar_data
     
-    def read_volume_rab(self) -> Dict[str, pd.DataFrame]:
-        """Baca data volume dari RAB"""
+    def read_rab_category(self, category: str, filepath: str) -> pd.DataFrame:
+        """Baca volume RAB satu kategori"""
+        if not os.path.exists(filepath):
+            print(f"✗ {category}: File tidak ditemukan")
+            return pd.DataFrame()
+        
+        from rab_reader import RABReader
+        
+        print(f"\n→ {category.upper()}: {os.path.basename(filepath)}")
+        reader = RABReader(filepath)
+        data = reader.extract_data()
+        
+        # Convert to DataFrame
+        all_items = []
+        for cat, items in data.items():
+            all_items.extend(items)
+        
+        if all_items:
+            df = pd.DataFrame(all_items)
+            print(f"  ✓ {len(df)} item diekstrak")
+            return df
+        
+        print(f"  ✗ Tidak ada data")
+        return pd.DataFrame()
+    
+    def load_rab_file(self, category: str, filepath: str) -> Tuple[str, pd.DataFrame, Dict]:
+        """Baca RAB satu kategori; output dan error dikumpulkan, tidak dicetak
+        
+        Returns:
+            (category, rab_df, statistik {'file', 'items', 'seconds', 'error', 'log'})
+        """
+        start = time.perf_counter()
+        log = io.StringIO()
+        error = None
+        rab_df = pd.DataFrame()
+        try:
+            with redirect_stdout(log):
+                if not os.path.exists(filepath):
+                    error = 'File tidak ditemukan'
+                rab_df = self.read_rab_category(category, filepath)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if error is None and rab_df.empty:
+            error = 'Tidak ada data'
+        return category, rab_df, {
+            'file': filepath,
+            'items': len(rab_df),
+            'seconds': time.perf_counter() - start,
+            'error': error,
+            'log': log.getvalue(),
+        }
+    
+    def read_volume_rab(self, jobs: int = None) -> Dict[str, pd.DataFrame]:
+        """Baca data volume dari RAB, semua file sekaligus di process pool
+        
+        Hasil masuk ke self.rab_data begitu satu file selesai; waktu baca,
+        jumlah item, error dan log per file disimpan di self.rab_load_stats
+        dan diringkas setelah semua file selesai.
+        
+        Args:
+            jobs: Jumlah proses (None = sebanyak file/CPU, 1 = berurutan)
+        """
         print("\n" + "="*70)
         print("MEMBACA VOLUME DARI RAB")
         print("="*70)
         
-        from rab_reader import RABReader
+        start = time.perf_counter()
+        jobs = min(len(self.rab_files), jobs or os.cpu_count() or 1)
+        pending = dict(self.rab_files)
         
-        for category, filepath in self.rab_files.items():
-            if os.path.exists(filepath):
-                print(f"\n→ {category.upper()}: {os.path.basename(filepath)}")
-                reader = RABReader(filepath)
-                data = reader.extract_data()
-                
-                # Convert to DataFrame
-                all_items = []
-                for cat, items in data.items():
-                    all_items.extend(items)
-                
-                if all_items:
-                    df = pd.DataFrame(all_items)
-                    self.rab_data[category] = df
-                    print(f"  ✓ {len(df)} item diekstrak")
-                else:
-                    self.rab_data[category] = pd.DataFrame()
-                    print(f"  ✗ Tidak ada data")
+        if jobs > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    futures = [executor.submit(_load_rab_worker, self._matcher(), category, filepath)
+                               for category, filepath in pending.items()]
+                    for future in as_completed(futures):
+                        category, rab_df, stats = future.result()
+                        self.rab_data[category] = rab_df
+                        self.rab_load_stats[category] = stats
+                        del pending[category]
+            except (OSError, RuntimeError) as e:
+                print(f"⚠ Proses paralel gagal ({e}), file sisa dibaca berurutan")
+        
+        for category, filepath in pending.items():
+            _, self.rab_data[category], self.rab_load_stats[category] = self.load_rab_file(category, filepath)
+        
+        for category in self.rab_files:
+            stats = self.rab_load_stats[category]
+            name = os.path.basename(stats['file'])
+            if stats['error']:
+                print(f"✗ {category.upper()}: {name} - {stats['error']} ({stats['seconds']:.1f} detik)")
             else:
-                print(f"✗ {category}: File tidak ditemukan")
-                self.rab_data[category] = pd.DataFrame()
+                print(f"✓ {category.upper()}: {name} - {stats['items']} item ({stats['seconds']:.1f} detik)")
+        print(f"  Total waktu baca RAB: {time.perf_counter() - start:.1f} detik")
         
         print("="*70)
         return self.rab_data
     
-    def _is_critical_material(self, item: str) -> bool:
-        """✅ Priority #8: Detect critical materials that need high matching threshold"""
-        item_lower = str(item).lower()
-        
-        # Critical materials that must match accurately
-        critical_patterns = [
-            'beton k-',           # Beton with K grade (K-225, K-300, K-350, etc)
-            'beton ready mix',   # Ready mix concrete
-            'beton fc',           # Beton with fc (concrete strength)
-            'besi diameter',      # Rebar with diameter
-            'besi d',             # Besi D10, D13, D16, etc
-            'besi ulir',          # Rebar (ulir)
-            'besi polos',         # Plain bar
-            'tulangan',           # Reinforcement
-            'wiremesh',           # Wire mesh
-            'kawat',              # Wire
-            'semen',              # Cement
-            'pasir',              # Sand
-            'split',              # Gravel
-            'keramik',            # Ceramic
-            'granit',             # Granite
-            'marmer',             # Marble
-            'pipa pvc',           # PVC pipe (with diameter/schedule)
-            'kabel nyyhy',        # Cable with specs
-            'kabel nyy',          # Cable NYY
-            'ac split',           # AC with BTU/PK
-            'pompa',              # Pump with capacity
-        ]
+    def _is_critical_material(self, item) -> bool:
+        """✅ Priority #8: Detect critical materials that need high matching threshold
         
-        for pattern in critical_patterns:
-            if pattern in item_lower:
-                return True
-        
-        return False
+        Args:
+            item: Item name or its ItemFeatures (patterns in item_features.CRITICAL_PATTERNS)
+        """
+        return get_features(item).is_critical
     
-    def _get_required_threshold(self, item: str) -> float:
+    def _get_required_threshold(self, item) -> float:
         """✅ Priority #8: Get required similarity threshold based on material type"""
         if self._is_critical_material(item):
             return 0.90  # 90% for critical materials (beton K-xxx, besi dia, etc)
         else:
             return 0.85  # 85% for standard materials (was 60%)
     
-    def fuzzy_match_items(self, item1: str, item2: str, check_threshold: bool = True) -> float:
-        """✅ Priority #8: Enhanced fuzzy matching with material-specific thresholds
-        
-        Args:
-            item1: First item name
-            item2: Second item name
-            check_threshold: If True, return 0 if below threshold (for filtering)
-        
-        Returns:
-            Similarity score (0.0 - 1.0)
-        """
-        from difflib import SequenceMatcher
-        import re
-        
-        item1_clean = str(item1).lower().strip()
-        item2_clean = str(item2).lower().strip()
+    def _rule_similarity(self, features1, features2):
+        """Score decided by exact/spec/containment rules, or None if the text ratio is needed"""
+        item1_clean = features1.clean
+        item2_clean = features2.clean
         
         # Exact match
         if item1_clean == item2_clean:
             return 1.0
         
         # ✅ Enhanced: Check for key attribute matches in critical materials
-        # For critical materials, check if key specs match (K-grade, diameter, etc)
-        if self._is_critical_material(item1):
-            # Extract key specs (K-225, D13, 3x2.5mm, etc)
-            specs1 = set(re.findall(r'k-?\d+|d\s*\d+|fc\s*\d+|\d+x\d+\.?\d*\s*mm|\d+/\d+"', item1_clean))
-            specs2 = set(re.findall(r'k-?\d+|d\s*\d+|fc\s*\d+|\d+x\d+\.?\d*\s*mm|\d+/\d+"', item2_clean))
+        # For critical materials, check if key specs match (K-225, diameter, etc)
+        if features1.is_critical:
+            # Key specs (K-225, D13, 3x2.5mm, etc) are precomputed per item
+            specs1 = features1.key_specs
+            specs2 = features2.key_specs
             
             # If key specs don't match, lower similarity significantly
             if specs1 and specs2 and not specs1.intersection(specs2):
                 # Different specs = different material (e.g., K-225 vs K-300, D13 vs D16)
-                base_similarity = 0.5  # Force below threshold
-            else:
-                # Check if one contains the other
-                if item1_clean in item2_clean or item2_clean in item1_clean:
-                    base_similarity = 0.92  # High score for containment with matching specs
-                else:
-                    # Use sequence matcher
-                    base_similarity = SequenceMatcher(None, item1_clean, item2_clean).ratio()
+                return 0.5  # Force below threshold
+            
+            # Check if one contains the other
+            if item1_clean in item2_clean or item2_clean in item1_clean:
+                return 0.92  # High score for containment with matching specs
         else:
             # Standard materials: more lenient
             if item1_clean in item2_clean or item2_clean in item1_clean:
-                base_similarity = 0.88  # Good score for containment
-            else:
-                # Use sequence matcher
-                base_similarity = SequenceMatcher(None, item1_clean, item2_clean).ratio()
+                return 0.88  # Good score for containment
+        
+        return None
+    
+    def fuzzy_match_items(self, item1, item2, check_threshold: bool = True) -> float:
+        """✅ Priority #8: Enhanced fuzzy matching with material-specific thresholds
+        
+        Args:
+            item1: First item name (or its ItemFeatures)
+            item2: Second item name (or its ItemFeatures)
+            check_threshold: If True, return 0 if below threshold (for filtering)
+        
+        Returns:
+            Similarity score (0.0 - 1.0)
+        """
+        features1 = get_features(item1)
+        features2 = get_features(item2)
+        required_threshold = self._get_required_threshold(features1)
+        
+        base_similarity = self._rule_similarity(features1, features2)
+        if base_similarity is None:
+            # Text ratio from the similarity backend (exact above the cutoff)
+            base_similarity = self.similarity.ratio(
+                features1.clean, features2.clean,
+                score_cutoff=required_threshold if check_threshold else 0.0
+            )
         
         # Apply threshold check if requested
         if check_threshold:
-            required_threshold = self._get_required_threshold(item1)
             if base_similarity < required_threshold:
                 return 0.0  # Below threshold = not a match
         
         return base_similarity
     
+    def fuzzy_match_many(self, item, candidates: List, check_threshold: bool = True) -> np.ndarray:
+        """Score one item against many candidates in one call
+        
+        Same scores as fuzzy_match_items per pair; the text ratios of all
+        candidates not decided by the rules go to the backend in one batch.
+        
+        Args:
+            item: Item name (or its ItemFeatures)
+            candidates: Candidate names (or their ItemFeatures)
+            check_threshold: If True, scores below threshold become 0
+        
+        Returns:
+            Float array aligned with candidates
+        """
+        features = get_features(item)
+        candidate_features = [get_features(c) for c in candidates]
+        required_threshold = self._get_required_threshold(features)
+        
+        scores = np.zeros(len(candidate_features))
+        pending = []
+        for pos, other in enumerate(candidate_features):
+            rule_score = self._rule_similarity(features, other)
+            if rule_score is None:
+                pending.append(pos)
+            else:
+                scores[pos] = rule_score
+        
+        if pending:
+            scores[pending] = self.similarity.ratio_many(
+                features.clean, [candidate_features[pos].clean for pos in pending],
+                score_cutoff=required_threshold if check_threshold else 0.0
+            )
+        
+        if check_threshold:
+            scores[scores < required_threshold] = 0.0
+        
+        return scores
+    
+    def _score_candidates(self, item_gambar, rab_features: List, index: CandidateIndex,
+                          all_matches: bool = False) -> Dict[int, float]:
+        """Thresholded scores of the RAB rows that can matter for one gambar item
+        
+        Pass 1 scores the TF-IDF/containment candidates. Pass 2 scores the
+        remaining rows whose SequenceMatcher upper bound can still reach the
+        best score (all_matches=False) or the threshold (all_matches=True).
+        Rows outside both sets cannot reach that score.
+        
+        Returns:
+            {position in rab_features: similarity} (0 = below threshold)
+        """
+        features = get_features(item_gambar)
+        threshold = self._get_required_threshold(features)
+        
+        known = self._cached_scores(features)
+        
+        candidates = index.candidates(features.text)
+        scores = dict(zip(candidates, self._score_rows(features, rab_features, candidates, known)))
+        
+        best_so_far = max(scores.values(), default=0.0)
+        floor = best_so_far if best_so_far > 0 and not all_matches else threshold
+        remaining = [
+            pos for pos in np.flatnonzero(index.ratio_upper_bounds(features.text) >= floor).tolist()
+            if pos not in scores
+        ]
+        if remaining:
+            scores.update(zip(remaining, self._score_rows(features, rab_features, remaining, known)))
+        
+        return scores
+    
+    def _cached_scores(self, features):
+        """Skor pasangan tersimpan untuk satu item gambar ({teks RAB: skor}), None tanpa cache"""
+        if self.match_cache is None:
+            return None
+        return self.match_cache.get_scores(self._matcher_key('pair'), features.clean)
+    
+    def _score_rows(self, features, rab_features: List, positions: List[int], known) -> List[float]:
+        """fuzzy_match_many pada baris RAB terpilih; pasangan yang sudah ada di cache tidak di-skor ulang"""
+        if known is None:
+            return self.fuzzy_match_many(features, [rab_features[pos] for pos in positions]).tolist()
+        
+        keys = [get_features(rab_features[pos]).clean for pos in positions]
+        missing = [i for i, key in enumerate(keys) if key not in known]
+        if missing:
+            new = self.fuzzy_match_many(features, [rab_features[positions[i]] for i in missing]).tolist()
+            fresh = {keys[i]: score for i, score in zip(missing, new)}
+            known.update(fresh)
+            self.match_cache.put_scores(self._matcher_key('pair'), features.clean, fresh)
+        return [known[key] for key in keys]
+    
+    def _matcher_key(self, kind: str) -> str:
+        """Kunci cache: jenis hasil + versi aturan matching + backend similarity"""
+        return f"volume/{kind}/v{MATCHER_VERSION}/{self.similarity.name}"
+    
+    def _find_best_match(self, item_gambar, rab_features: List, index: CandidateIndex) -> Tuple[object, float]:
+        """Best RAB row for one gambar item, scoring only the index candidates
+        
+        Same result as a full scan (see _score_candidates), including ties
+        resolving to the first RAB row.
+        
+        Args:
+            item_gambar: Gambar item name (or its ItemFeatures)
+            rab_features: ItemFeatures (or names) of the indexed RAB items, in index order
+            index: CandidateIndex built over the same RAB items
+        
+        Returns:
+            (position in rab_features or None, similarity)
+        """
+        scores = self._score_candidates(item_gambar, rab_features, index)
+        
+        best_pos = None
+        best_similarity = 0.0
+        for pos in sorted(scores):
+            similarity = scores[pos]
+            if similarity > best_similarity and similarity > 0:
+                best_similarity = similarity
+                best_pos = pos
+        
+        return best_pos, best_similarity
+    
+    def find_matches(self, gambar_df: pd.DataFrame, rab_df: pd.DataFrame,
+                     category: str = None) -> List[Tuple[int, object, float]]:
+        """Cari pasangan gambar-RAB yang dipilih
+        
+        match_mode 'best'/'aggregate': tiap item gambar mengambil baris RAB
+        terbaiknya sendiri (satu baris RAB bisa dipakai beberapa item gambar).
+        match_mode 'one_to_one': assignment global berbobot maksimum pada
+        matriks skor sparse, tiap baris RAB dipakai paling banyak satu kali.
+        
+        Dengan category, hasil per teks disimpan di match_state; run berikutnya
+        untuk kategori yang sama hanya men-skor teks gambar baru dan baris RAB
+        yang ditambah/diubah (hasil tetap sama dengan hitung ulang penuh).
+        
+        Returns:
+            List (posisi baris gambar, posisi baris RAB atau None, similarity),
+            satu entri per baris gambar.
+        """
+        if gambar_df.empty:
+            return []
+        if rab_df.empty:
+            return [(pos, None, 0.0) for pos in range(len(gambar_df))]
+        
+        # Results computed once per distinct gambar text
+        gambar_items = [str(item) for item in gambar_df['Item'].tolist()]
+        all_matches = self.match_mode == 'one_to_one'
+        results = self._match_texts(list(dict.fromkeys(gambar_items)), rab_df['item'].tolist(),
+                                    all_matches, category)
+        
+        if all_matches:
+            edges = {}
+            for pos, key in enumerate(gambar_items):
+                for rab_pos, similarity in results[key].items():
+                    edges[(pos, rab_pos)] = similarity
+            
+            matched = sparse_assignment(edges)
+            return [
+                (pos, matched[pos], edges[(pos, matched[pos])]) if pos in matched else (pos, None, 0.0)
+                for pos in range(len(gambar_items))
+            ]
+        
+        return [(pos,) + results[key] for pos, key in enumerate(gambar_items)]
+    
+    def _match_texts(self, texts: List[str], rab_items: List, all_matches: bool,
+                     category: str = None) -> Dict[str, object]:
+        """Hasil matching per teks gambar unik (lihat _score_texts)
+        
+        Urutan sumber hasil:
+        1. Run sebelumnya untuk kategori yang sama (match_state, atau state
+           tersimpan di match_cache dari proses lain): hasil per teks
+           diperbarui terhadap baris RAB yang ditambah/diubah saja
+           (lihat _update_results).
+        2. match_cache untuk daftar RAB yang sama (fingerprint teks RAB
+           berurutan).
+        3. Scoring penuh untuk teks yang tersisa.
+        """
+        rab_features = [get_features(item) for item in rab_items]
+        rab_clean = [features.clean for features in rab_features]
+        matcher = self._matcher_key('all' if all_matches else 'best')
+        
+        if self.match_cache is not None:
+            rab_set = fingerprint(rab_clean)
+            gambar_set = fingerprint(texts)
+        
+        state = self.match_state.get(category) if category is not None else None
+        if state is None and category is not None and self.match_cache is not None:
+            state = self._load_state(matcher, category, gambar_set, rab_set, all_matches)
+        if state is not None and state['matcher'] == matcher:
+            results = self._update_results(state, texts, rab_features, all_matches)
+            index = state.get('index') if state['rab_clean'] == rab_clean else None
+        else:
+            results, index = {}, None
+        reused = len(results)
+        
+        if self.match_cache is not None:
+            keys = {text: get_features(text).clean for text in texts}
+            pending = [text for text in texts if text not in results]
+            cached = self.match_cache.get_matches(matcher, rab_set, [keys[text] for text in pending])
+            for text in pending:
+                if keys[text] in cached:
+                    results[text] = self._decode_result(cached[keys[text]], all_matches)
+        
+        missing = [text for text in texts if text not in results]
+        if missing:
+            if index is None:
+                index = CandidateIndex(rab_items, top_k=self.top_k)
+            results.update(zip(missing, self._score_distinct(missing, rab_features, index, all_matches)))
+        
+        if self.match_cache is not None:
+            self.match_cache.put_matches(matcher, rab_set, {
+                keys[text]: self._encode_result(results[text], all_matches)
+                for text in texts if keys[text] not in cached
+            })
+        
+        if category is not None:
+            self.match_state[category] = {
+                'matcher': matcher,
+                'rab_clean': rab_clean,
+                'index': index,
+                'results': {text: results[text] for text in texts},
+            }
+            if self.match_cache is not None:
+                self.match_cache.put_state(matcher, category, gambar_set, rab_set, {
+                    'matcher': matcher,
+                    'rab_clean': rab_clean,
+                    'results': {text: self._encode_result(results[text], all_matches) for text in texts},
+                })
+            self.match_stats[category] = {'reused': reused, 'scored': len(missing)}
+        if self.match_cache is not None:
+            self.match_cache.flush()
+        return results
+    
+    def _load_state(self, matcher: str, category: str, gambar_set: str, rab_set: str,
+                    all_matches: bool) -> Optional[Dict]:
+        """match_state tersimpan di match_cache (tanpa index; dibangun ulang bila perlu)"""
+        stored = self.match_cache.get_state(matcher, category, gambar_set, rab_set)
+        if stored is None:
+            return None
+        try:
+            return {
+                'matcher': stored['matcher'],
+                'rab_clean': list(stored['rab_clean']),
+                'index': None,
+                'results': {text: self._decode_result(value, all_matches)
+                            for text, value in stored['results'].items()},
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _update_results(self, state: Dict, texts: List[str], rab_features: List,
+                        all_matches: bool) -> Dict[str, object]:
+        """Perbarui hasil run sebelumnya terhadap daftar RAB baru
+        
+        Baris RAB dicocokkan dengan run sebelumnya berdasarkan teks
+        ternormalisasi (diff berurutan, baris yang diubah = dihapus +
+        ditambah). Per teks gambar dari run sebelumnya:
+        - 'best': baris terbaik lama dipetakan ke posisi baru, lalu
+          dibandingkan hanya dengan baris tambahan yang bisa mencapai skornya.
+          Jika baris terbaik lama dihapus/diubah, teks di-skor ulang penuh.
+        - 'all': skor baris yang tetap dipetakan, baris tambahan yang bisa
+          mencapai threshold di-skor.
+        Hasilnya sama dengan scoring penuh (urutan baris yang tetap tidak
+        berubah, jadi tie tetap jatuh ke baris pertama).
+        
+        Returns:
+            {teks: hasil} untuk teks yang bisa dipakai ulang
+        """
+        previous = state['results']
+        rab_clean = [features.clean for features in rab_features]
+        
+        old_to_new = {}
+        if state['rab_clean'] == rab_clean:
+            old_to_new = {pos: pos for pos in range(len(rab_clean))}
+        else:
+            matcher = SequenceMatcher(None, state['rab_clean'], rab_clean, autojunk=False)
+            for old_start, new_start, size in matcher.get_matching_blocks():
+                for offset in range(size):
+                    old_to_new[old_start + offset] = new_start + offset
+        
+        kept = set(old_to_new.values())
+        added = [pos for pos in range(len(rab_clean)) if pos not in kept]
+        added_bounds = CharCountIndex([rab_clean[pos] for pos in added]) if added else None
+        
+        results = {}
+        for text in texts:
+            if text not in previous:
+                continue
+            result = previous[text]
+            
+            if all_matches:
+                updated = {old_to_new[pos]: score for pos, score in result.items() if pos in old_to_new}
+            else:
+                best_pos, best_similarity = result
+                if best_pos is not None and best_pos not in old_to_new:
+                    continue
+                best_pos = old_to_new.get(best_pos)
+            
+            if added:
+                features = get_features(text)
+                floor = self._get_required_threshold(features)
+                if not all_matches:
+                    floor = max(floor, best_similarity)
+                
+                bounds = added_bounds.ratio_upper_bounds(features.text)
+                candidates = [
+                    pos for pos, bound in zip(added, bounds.tolist())
+                    if bound >= floor or features.clean in rab_clean[pos] or rab_clean[pos] in features.clean
+                ]
+                scores = self.fuzzy_match_many(features, [rab_features[pos] for pos in candidates]).tolist()
+                
+                for pos, score in zip(candidates, scores):
+                    if score <= 0:
+                        continue
+                    if all_matches:
+                        updated[pos] = score
+                    elif score > best_similarity or (score == best_similarity and pos < best_pos):
+                        best_pos, best_similarity = pos, score
+            
+            results[text] = updated if all_matches else (best_pos, best_similarity)
+        
+        return results
+    
+    @staticmethod
+    def _encode_result(result, all_matches: bool):
+        """Hasil _score_texts sebagai nilai JSON"""
+        if all_matches:
+            return [[rab_pos, score] for rab_pos, score in result.items()]
+        return list(result)
+    
+    @staticmethod
+    def _decode_result(value, all_matches: bool):
+        """Kebalikan _encode_result"""
+        if all_matches:
+            return {rab_pos: score for rab_pos, score in value}
+        return tuple(value)
+    
+    def _score_texts(self, texts: List[str], rab_features: List, index: CandidateIndex,
+                     all_matches: bool) -> List:
+        """Hasil matching per teks gambar unik
+        
+        Returns:
+            Per teks: {posisi RAB: similarity > 0} (all_matches=True) atau
+            (posisi RAB terbaik atau None, similarity)
+        """
+        if not all_matches:
+            return [self._find_best_match(text, rab_features, index) for text in texts]
+        
+        results = []
+        for text in texts:
+            scores = self._score_candidates(text, rab_features, index, all_matches=True)
+            results.append({rab_pos: s for rab_pos, s in scores.items() if s > 0})
+        return results
+    
+    def _score_distinct(self, texts: List[str], rab_features: List, index: CandidateIndex,
+                        all_matches: bool) -> List:
+        """_score_texts, dipecah ke match_jobs proses bila teksnya banyak
+        
+        Tiap worker menerima index RAB sekali (read-only) lalu men-skor shard
+        teks yang berurutan; hasil digabung sesuai urutan shard sehingga sama
+        persis dengan satu proses.
+        """
+        if self.match_jobs <= 1 or len(texts) < self.SHARD_MIN_ITEMS:
+            return self._score_texts(texts, rab_features, index, all_matches)
+        
+        shard_count = self.match_jobs * 4
+        size = -(-len(texts) // shard_count)
+        shards = [texts[start:start + size] for start in range(0, len(texts), size)]
+        
+        try:
+            with ProcessPoolExecutor(max_workers=self.match_jobs, initializer=_init_shard_worker,
+                                     initargs=(self._matcher(match_cache=False), rab_features, index)) as executor:
+                shard_results = list(executor.map(_score_shard, shards, [all_matches] * len(shards)))
+        except (OSError, RuntimeError) as e:
+            print(f"  ⚠ Matching paralel gagal ({e}), lanjut di satu proses")
+            return self._score_texts(texts, rab_features, index, all_matches)
+        
+        return [result for shard in shard_results for result in shard]
+    
+    def _matcher(self, match_cache=None) -> 'VolumeComparator':
+        """Salinan ringan (tanpa data) dengan pengaturan matching yang sama, untuk worker
+        
+        Args:
+            match_cache: Cache untuk salinan (None = cache yang sama, dibuka ulang di worker)
+        """
+        if match_cache is None:
+            match_cache = self.match_cache if self.match_cache is not None else False
+        return VolumeComparator(self.gambar_file, self.rab_files, top_k=self.top_k,
+                                similarity_backend=self.similarity, match_mode=self.match_mode,
+                                match_jobs=self.match_jobs, match_cache=match_cache)
+    
+    def _group_pairs(self, pairs: List[Tuple[int, object, float]]) -> List[Tuple[List[int], object, float]]:
+        """Entri perbandingan (posisi baris gambar, posisi RAB, similarity)
+        
+        match_mode 'aggregate' menggabungkan item gambar yang memakai baris RAB
+        yang sama ke entri pertamanya (similarity = terendah di grup); mode
+        lain satu entri per baris gambar.
+        """
+        if self.match_mode != 'aggregate':
+            return [([pos], rab_pos, similarity) for pos, rab_pos, similarity in pairs]
+        
+        entries = []
+        by_rab = {}
+        for pos, rab_pos, similarity in pairs:
+            if rab_pos is None:
+                entries.append(([pos], None, similarity))
+            elif rab_pos in by_rab:
+                positions, _, lowest = entries[by_rab[rab_pos]]
+                positions.append(pos)
+                entries[by_rab[rab_pos]] = (positions, rab_pos, min(lowest, similarity))
+            else:
+                by_rab[rab_pos] = len(entries)
+                entries.append(([pos], rab_pos, similarity))
+        return entries
+    
+    def build_comparison(self, gambar_df: pd.DataFrame, rab_df: pd.DataFrame,
+                         pairs: List[Tuple[int, object, float]]) -> pd.DataFrame:
+        """Hitung tabel perbandingan dari pasangan hasil matching (kolom vektor)
+        
+        Selisih, selisih %, selisih harga dan status dihitung per kolom dengan
+        NumPy; Status bertipe categorical.
+        
+        Args:
+            gambar_df: Data volume gambar satu kategori
+            rab_df: Data RAB satu kategori
+            pairs: Hasil find_matches()
+        
+        Returns:
+            DataFrame perbandingan (baris gambar, lalu baris HANYA DI RAB)
+        """
+        entries = self._group_pairs(pairs)
+        
+        # Jumlah item gambar per baris RAB (>1 = many-to-one)
+        gambar_per_rab = np.bincount(
+            [rab_pos for _, rab_pos, _ in pairs if rab_pos is not None], minlength=len(rab_df)
+        ).astype(np.int64)
+        
+        # Entri gambar (satu baris per entri; 'aggregate' bisa beberapa baris gambar)
+        first = np.array([positions[0] for positions, _, _ in entries], dtype=np.int64)
+        entry_of_row = np.zeros(len(gambar_df), dtype=np.int64)
+        for entry_pos, (positions, _, _) in enumerate(entries):
+            entry_of_row[positions] = entry_pos
+        rab_pos = np.array([-1 if r is None else r for _, r, _ in entries], dtype=np.int64)
+        similarity = np.array([s for _, _, s in entries], dtype=float)
+        matched = rab_pos >= 0
+        safe_rab = np.where(matched, rab_pos, 0)
+        
+        gambar_items = gambar_df['Item'].to_numpy(dtype=object) if len(gambar_df) else np.array([], dtype=object)
+        items = gambar_items[first]
+        for entry_pos, (positions, _, _) in enumerate(entries):
+            if len(positions) > 1:
+                # 'aggregate': satu baris RAB mencakup beberapa item gambar
+                items[entry_pos] = '; '.join(dict.fromkeys(str(gambar_items[pos]) for pos in positions))
+        
+        vol_gambar = np.bincount(entry_of_row, weights=_numeric(gambar_df, 'Volume'), minlength=len(entries))
+        satuan = _text(gambar_df, 'Satuan')[first]
+        harga_gambar = _numeric(gambar_df, 'Harga Satuan')[first]
+        critical = np.array([get_features(gambar_items[pos]).is_critical for pos in first], dtype=bool)
+        
+        rab_items = rab_df['item'].to_numpy(dtype=object) if len(rab_df) else np.array([''], dtype=object)
+        rab_volume = _numeric(rab_df, 'volume') if len(rab_df) else np.zeros(1)
+        rab_harga = _numeric(rab_df, 'harga_satuan') if len(rab_df) else np.zeros(1)
+        
+        vol_rab = np.where(matched, rab_volume[safe_rab], 0.0)
+        harga_rab = np.where(matched, rab_harga[safe_rab], 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            selisih = vol_gambar - vol_rab
+            selisih_persen = np.where(vol_rab > 0, selisih / vol_rab * 100, 0.0)
+            # ✅ Priority #8: price validation
+            price_diff_pct = np.where(
+                (harga_rab > 0) & (harga_gambar > 0), np.abs((harga_gambar - harga_rab) / harga_rab * 100), 0.0
+            )
+        
+        # Status with warnings (later rules override earlier ones)
+        status = np.full(len(entries), 'MATCH', dtype=object)
+        # ✅ Priority #8: Warn if similarity < 90% for critical materials
+        status[critical & (similarity < 0.90)] = STATUS_REVIEW
+        # ✅ Priority #8: Warn if price difference > 20%
+        price_warning = price_diff_pct > 20
+        status[price_warning] = [f'MATCH ⚠️ PRICE DIFF {pct:.0f}%' for pct in price_diff_pct[price_warning]]
+        status[np.abs(selisih_persen) > 5] = 'SELISIH KECIL'
+        status[np.abs(selisih_persen) > 10] = 'SELISIH BESAR'
+        status[~matched] = 'HANYA DI GAMBAR'
+        
+        gambar_part = pd.DataFrame({
+            'Item': items,
+            'Item RAB': np.where(matched, rab_items[safe_rab], 'TIDAK DITEMUKAN'),
+            'Satuan': satuan,
+            'Volume Gambar': vol_gambar,
+            'Volume RAB': vol_rab,
+            'Selisih': selisih,
+            'Selisih %': np.where(matched, selisih_persen, 100.0),
+            'Status': status,
+            'Similarity': np.where(matched, similarity, 0.0),
+            'Gambar per RAB': np.where(matched, gambar_per_rab[safe_rab] if len(rab_df) else 0, 0),
+        })
+        
+        # Items yang ada di RAB tapi tidak di gambar (baris RAB yang tidak terpilih)
+        rab_only = np.flatnonzero(gambar_per_rab == 0)
+        rab_part = pd.DataFrame({
+            'Item': 'TIDAK DITEMUKAN',
+            'Item RAB': rab_items[rab_only] if len(rab_df) else [],
+            'Satuan': rab_df['satuan'].to_numpy(dtype=object)[rab_only] if 'satuan' in rab_df.columns else '',
+            'Volume Gambar': 0.0,
+            'Volume RAB': rab_volume[rab_only] if len(rab_df) else [],
+            'Selisih': -rab_volume[rab_only] if len(rab_df) else [],
+            'Selisih %': -100.0,
+            'Status': 'HANYA DI RAB',
+            'Similarity': 0.0,
+            'Gambar per RAB': 0,
+        }, index=range(len(rab_only)))
+        
+        result_df = pd.concat([gambar_part, rab_part], ignore_index=True)
+        result_df['Status'] = _status_categorical(result_df['Status'])
+        return result_df
+    
+    @staticmethod
+    def status_counts(result_df: pd.DataFrame) -> Dict[str, int]:
+        """Jumlah per kelompok status dari satu value_counts"""
+        counts = result_df['Status'].value_counts()
+        return {
+            'total': len(result_df),
+            'match': int(counts.get('MATCH', 0)),
+            'selisih': int(sum(count for status, count in counts.items() if 'SELISIH' in str(status))),
+            'gambar_only': int(counts.get('HANYA DI GAMBAR', 0)),
+            'rab_only': int(counts.get('HANYA DI RAB', 0)),
+        }
+    
     def compare_volumes(self, category: str) -> pd.DataFrame:
         """Bandingkan volume gambar vs RAB untuk kategori tertentu"""
         print(f"\n→ Membandingkan {category.upper()}...")
@@ -216,310 +933,276 @@ class VolumeComparator:
             print(f"  ⚠ Tidak ada data untuk dibandingkan")
             return pd.DataFrame()
         
-        comparison = []
+        # Pasangan hasil matching (✅ Priority #8: enhanced matching)
+        self.match_stats.pop(category, None)
+        pairs = self.find_matches(gambar_df, rab_df, category)
+        self.match_pairs[category] = pairs
         
-        # Items dari gambar
-        for _, gambar_row in gambar_df.iterrows():
-            item_gambar = gambar_row['Item']
-            vol_gambar = float(gambar_row['Volume']) if pd.notna(gambar_row['Volume']) else 0
-            satuan_gambar = gambar_row['Satuan'] if pd.notna(gambar_row['Satuan']) else ''
-            
-            # Cari match di RAB (✅ Priority #8: now using enhanced matching)
-            best_match = None
-            best_similarity = 0.0  # Start from 0, threshold applied in fuzzy_match_items
-            
-            if not rab_df.empty:
-                for _, rab_row in rab_df.iterrows():
-                    similarity = self.fuzzy_match_items(item_gambar, rab_row['item'], check_threshold=True)
-                    if similarity > best_similarity and similarity > 0:
-                        best_similarity = similarity
-                        best_match = rab_row
-            
-            if best_match is not None:
-                vol_rab = float(best_match['volume']) if pd.notna(best_match['volume']) else 0
-                selisih = vol_gambar - vol_rab
-                selisih_persen = (selisih / vol_rab * 100) if vol_rab > 0 else 0
-                
-                # ✅ Priority #8: Add price validation
-                harga_gambar = float(gambar_row.get('Harga Satuan', 0)) if pd.notna(gambar_row.get('Harga Satuan')) else 0
-                harga_rab = float(best_match.get('harga_satuan', 0)) if pd.notna(best_match.get('harga_satuan')) else 0
-                price_diff_pct = 0
-                if harga_rab > 0 and harga_gambar > 0:
-                    price_diff_pct = abs((harga_gambar - harga_rab) / harga_rab * 100)
-                
-                # Status with warnings
-                status = 'MATCH'
-                
-                # ✅ Priority #8: Warn if similarity < 90% for critical materials
-                if self._is_critical_material(item_gambar) and best_similarity < 0.90:
-                    status = 'MATCH ⚠️ REVIEW (Critical material <90%)'
-                
-                # ✅ Priority #8: Warn if price difference > 20%
-                if price_diff_pct > 20:
-                    status = f'MATCH ⚠️ PRICE DIFF {price_diff_pct:.0f}%'
-                
-                if abs(selisih_persen) > 10:
-                    status = 'SELISIH BESAR'
-                elif abs(selisih_persen) > 5:
-                    status = 'SELISIH KECIL'
-                
-                comparison.append({
-                    'Item': item_gambar,
-                    'Item RAB': best_match['item'],
-                    'Satuan': satuan_gambar,
-                    'Volume Gambar': vol_gambar,
-                    'Volume RAB': vol_rab,
-                    'Selisih': selisih,
-                    'Selisih %': selisih_persen,
-                    'Status': status,
-                    'Similarity': best_similarity
-                })
-            else:
-                comparison.append({
-                    'Item': item_gambar,
-                    'Item RAB': 'TIDAK DITEMUKAN',
-                    'Satuan': satuan_gambar,
-                    'Volume Gambar': vol_gambar,
-                    'Volume RAB': 0,
-                    'Selisih': vol_gambar,
-                    'Selisih %': 100,
-                    'Status': 'HANYA DI GAMBAR',
-                    'Similarity': 0
-                })
+        result_df = self.build_comparison(gambar_df, rab_df, pairs)
         
-        # Items yang ada di RAB tapi tidak di gambar
-        if not rab_df.empty:
-            for _, rab_row in rab_df.iterrows():
-                item_rab = rab_row['item']
-                
-                # Check if already matched (✅ Priority #8: use threshold checking)
-                already_matched = any(
-                    self.fuzzy_match_items(item_rab, comp['Item'], check_threshold=True) > 0
-                    for comp in comparison
-                )
-                
-                if not already_matched:
-                    vol_rab = float(rab_row['volume']) if pd.notna(rab_row['volume']) else 0
-                    
-                    comparison.append({
-                        'Item': 'TIDAK DITEMUKAN',
-                        'Item RAB': item_rab,
-                        'Satuan': rab_row.get('satuan', ''),
-                        'Volume Gambar': 0,
-                        'Volume RAB': vol_rab,
-                        'Selisih': -vol_rab,
-                        'Selisih %': -100,
-                        'Status': 'HANYA DI RAB',
-                        'Similarity': 0
-                    })
-        
-        if comparison:
-            result_df = pd.DataFrame(comparison)
+        if not result_df.empty:
             print(f"  ✓ {len(result_df)} item dibandingkan")
             
             # Statistics
-            match_count = len(result_df[result_df['Status'] == 'MATCH'])
-            selisih_count = len(result_df[result_df['Status'].str.contains('SELISIH')])
-            gambar_only = len(result_df[result_df['Status'] == 'HANYA DI GAMBAR'])
-            rab_only = len(result_df[result_df['Status'] == 'HANYA DI RAB'])
+            counts = self.status_counts(result_df)
+            print(f"    - Match: {counts['match']}")
+            print(f"    - Selisih: {counts['selisih']}")
+            print(f"    - Hanya di Gambar: {counts['gambar_only']}")
+            print(f"    - Hanya di RAB: {counts['rab_only']}")
+            
+            gambar_per_rab = Counter(rab_pos for _, rab_pos, _ in pairs if rab_pos is not None)
+            shared_rab = sum(1 for count in gambar_per_rab.values() if count > 1)
+            if shared_rab:
+                print(f"    - RAB dipakai >1 item gambar: {shared_rab} baris")
             
-            print(f"    - Match: {match_count}")
-            print(f"    - Selisih: {selisih_count}")
-            print(f"    - Hanya di Gambar: {gambar_only}")
-            print(f"    - Hanya di RAB: {rab_only}")
+            stats = self.match_stats.get(category)
+            if stats and stats['reused']:
+                print(f"    - Inkremental: {stats['reused']} item dari run sebelumnya, {stats['scored']} di-skor ulang")
             
             return result_df
         
         return pd.DataFrame()
     
     def generate_report(self, output_file: str):
-        """Generate laporan perbandingan dalam Excel"""
+        """Generate laporan perbandingan dalam Excel (workbook write-only, baris ditulis langsung)"""
         print("\n" + "="*70)
         print("MEMBUAT LAPORAN PERBANDINGAN")
         print("="*70)
+        started = time.perf_counter()
+        
+        # Sheet per kategori, dipecah per MAX_SHEET_ROWS baris (data mulai baris 4)
+        taken = ['RINGKASAN', INDEX_SHEET]
+        plans = {}
+        for category in CATEGORIES:
+            if category in self.comparison_results and not self.comparison_results[category].empty:
+                plans[category] = sheet_parts(category.upper(), len(self.comparison_results[category]),
+                                              self.MAX_SHEET_ROWS - 3, taken)
+                taken.extend(title for title, _, _ in plans[category])
         
-        wb = Workbook()
-        wb.remove(wb.active)
+        wb = Workbook(write_only=True)
         
         # Sheet ringkasan
-        ws_summary = wb.create_sheet("RINGKASAN", 0)
+        ws_summary = wb.create_sheet("RINGKASAN")
         self.create_summary_sheet(ws_summary)
         
-        # Sheet per kategori
-        for category in ['struktur', 'arsitektur', 'mep']:
-            if category in self.comparison_results and not self.comparison_results[category].empty:
-                ws = wb.create_sheet(category.upper(), len(wb.sheetnames))
-                self.create_comparison_sheet(ws, category)
+        if any(len(plan) > 1 for plan in plans.values()):
+            write_index(wb.create_sheet(INDEX_SHEET), [
+                {'sheet': title, 'kategori': category.upper(), 'no_awal': start + 1, 'no_akhir': stop,
+                 'jumlah_baris': stop - start}
+                for category, plan in plans.items() for title, start, stop in plan
+            ])
+        
+        for category, plan in plans.items():
+            for title, start, stop in plan:
+                ws = wb.create_sheet(title)
+                self.create_comparison_sheet(ws, category, start, stop)
         
         # Save
         wb.save(output_file)
-        print(f"\n✓ Laporan berhasil dibuat: {output_file}")
+        print(f"\n✓ Laporan berhasil dibuat: {output_file} ({time.perf_counter() - started:.1f} detik)")
         print("="*70)
     
+    def _styled_row(self, ws, values: List, **style) -> List[WriteOnlyCell]:
+        """Satu baris sel dengan style yang sama (judul/header)"""
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            for name, attr in style.items():
+                setattr(cell, name, attr)
+            cells.append(cell)
+        return cells
+    
     def create_summary_sheet(self, ws):
-        """Buat sheet ringkasan"""
+        """Buat sheet ringkasan (ws: worksheet write-only yang masih kosong)"""
+        for col, width in zip('ABCDEFG', [15, 12, 10, 10, 15, 15, 15]):
+            ws.column_dimensions[col].width = width
+        
         # Title
-        ws.merge_cells('A1:G1')
-        cell = ws['A1']
-        cell.value = "LAPORAN PERBANDINGAN VOLUME GAMBAR VS RAB"
-        cell.font = Font(name='Calibri', size=16, bold=True)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.fill = self.header_fill
-        
-        # Info
-        row = 3
+        ws.merged_cells.add(CellRange('A1:G1'))
+        ws.append(self._styled_row(ws, ["LAPORAN PERBANDINGAN VOLUME GAMBAR VS RAB"],
+                                   font=Font(name='Calibri', size=16, bold=True),
+                                   alignment=Alignment(horizontal='center', vertical='center'),
+                                   fill=self.header_fill))
+        ws.append([])
+        
+        # Info (baris 3-5)
         info_data = [
             ('Project:', 'RS Sari Dharma'),
             ('Tanggal Analisis:', datetime.now().strftime("%d-%m-%Y %H:%M")),
             ('File Gambar:', os.path.basename(self.gambar_file)),
         ]
-        
         for label, value in info_data:
-            ws.cell(row=row, column=1).value = label
-            ws.cell(row=row, column=1).font = Font(bold=True)
-            ws.cell(row=row, column=2).value = value
-            row += 1
-        
-        # Summary table
-        row += 2
-        ws.merge_cells(f'A{row}:G{row}')
-        cell = ws[f'A{row}']
-        cell.value = "RINGKASAN PERBANDINGAN"
-        cell.font = Font(name='Calibri', size=12, bold=True)
-        cell.fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
-        
-        row += 1
+            ws.append(self._styled_row(ws, [label], font=Font(bold=True)) + [value])
+        ws.append([])
+        ws.append([])
+        
+        # Summary table (judul baris 8, header baris 9)
+        ws.merged_cells.add(CellRange('A8:G8'))
+        ws.append(self._styled_row(ws, ["RINGKASAN PERBANDINGAN"],
+                                   font=Font(name='Calibri', size=12, bold=True),
+                                   fill=PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")))
         headers = ['Kategori', 'Total Item', 'Match', 'Selisih', 'Hanya Gambar', 'Hanya RAB', 'Status']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col)
-            cell.value = header
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.border = self.thin_border
-            cell.alignment = Alignment(horizontal='center')
-        
-        row += 1
-        for category in ['struktur', 'arsitektur', 'mep']:
+        ws.append(self._styled_row(ws, headers, font=self.header_font, fill=self.header_fill,
+                                   border=self.thin_border, alignment=Alignment(horizontal='center')))
+        
+        rows = 0
+        for category in CATEGORIES:
             if category in self.comparison_results:
                 df = self.comparison_results[category]
                 if not df.empty:
-                    match_count = len(df[df['Status'] == 'MATCH'])
-                    selisih_count = len(df[df['Status'].str.contains('SELISIH', na=False)])
-                    gambar_only = len(df[df['Status'] == 'HANYA DI GAMBAR'])
-                    rab_only = len(df[df['Status'] == 'HANYA DI RAB'])
-                    total = len(df)
-                    
+                    counts = self.status_counts(df)
+                    gambar_only = counts['gambar_only']
+                    rab_only = counts['rab_only']
                     status = '✓ OK' if (gambar_only + rab_only) == 0 else '⚠ PERLU REVIEW'
-                    
-                    ws.cell(row=row, column=1).value = category.upper()
-                    ws.cell(row=row, column=2).value = total
-                    ws.cell(row=row, column=3).value = match_count
-                    ws.cell(row=row, column=4).value = selisih_count
-                    ws.cell(row=row, column=5).value = gambar_only
-                    ws.cell(row=row, column=6).value = rab_only
-                    ws.cell(row=row, column=7).value = status
-                    
-                    # Apply styling
-                    for col in range(1, 8):
-                        cell = ws.cell(row=row, column=col)
-                        cell.border = self.thin_border
-                        if gambar_only > 0 or rab_only > 0:
-                            cell.fill = self.warning_fill
-                        else:
-                            cell.fill = self.ok_fill
-                    
-                    row += 1
-        
-        # Column widths
-        ws.column_dimensions['A'].width = 15
-        ws.column_dimensions['B'].width = 12
-        ws.column_dimensions['C'].width = 10
-        ws.column_dimensions['D'].width = 10
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 15
-        ws.column_dimensions['G'].width = 15
-    
-    def create_comparison_sheet(self, ws, category: str):
-        """Buat sheet detail perbandingan per kategori"""
-        df = self.comparison_results[category]
+                    ws.append([category.upper(), counts['total'], counts['match'], counts['selisih'],
+                               gambar_only, rab_only, status])
+                    rows += 1
+        
+        # Styling: warna per baris dari kolom Status
+        if rows:
+            data_range = f'A10:G{9 + rows}'
+            add_rule(ws, data_range, equals_formula('$G10', ['✓ OK']), fill=self.ok_fill)
+            add_rule(ws, data_range, equals_formula('$G10', ['⚠ PERLU REVIEW']), fill=self.warning_fill)
+            add_rule(ws, data_range, border=self.thin_border)
+    
+    def create_comparison_sheet(self, ws, category: str, start: int = 0, stop: int = None):
+        """Buat sheet detail perbandingan per kategori
+        
+        Args:
+            ws: Worksheet write-only yang masih kosong
+            category: Kategori di comparison_results
+            start, stop: Baris hasil yang ditulis (sheet lanjutan), nomor tetap nomor urut kategori
+        """
+        df = self.comparison_results[category].iloc[start:stop]
+        
+        for col, width in zip('ABCDEFGHIJ', [5, 35, 35, 10, 15, 15, 15, 12, 20, 12]):
+            ws.column_dimensions[col].width = width
         
         # Title
-        ws.merge_cells('A1:I1')
-        cell = ws['A1']
-        cell.value = f"PERBANDINGAN VOLUME {category.upper()}"
-        cell.font = Font(name='Calibri', size=14, bold=True)
-        cell.alignment = Alignment(horizontal='center')
-        cell.fill = self.header_fill
+        ws.merged_cells.add(CellRange('A1:J1'))
+        ws.append(self._styled_row(ws, [f"PERBANDINGAN VOLUME {ws.title}"],
+                                   font=Font(name='Calibri', size=14, bold=True),
+                                   alignment=Alignment(horizontal='center'), fill=self.header_fill))
+        ws.append([])
         
         # Headers
-        headers = ['No', 'Item Gambar', 'Item RAB', 'Satuan', 'Volume Gambar', 'Volume RAB', 'Selisih', 'Selisih %', 'Status']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=3, column=col)
-            cell.value = header
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.border = self.thin_border
-            cell.alignment = Alignment(horizontal='center', wrap_text=True)
-        
-        # Data
-        for idx, row_data in df.iterrows():
-            row = idx + 4
-            ws.cell(row=row, column=1).value = idx + 1
-            ws.cell(row=row, column=2).value = row_data['Item']
-            ws.cell(row=row, column=3).value = row_data['Item RAB']
-            ws.cell(row=row, column=4).value = row_data['Satuan']
-            ws.cell(row=row, column=5).value = row_data['Volume Gambar']
-            ws.cell(row=row, column=6).value = row_data['Volume RAB']
-            ws.cell(row=row, column=7).value = row_data['Selisih']
-            ws.cell(row=row, column=8).value = row_data['Selisih %']
-            ws.cell(row=row, column=8).number_format = '0.00'
-            ws.cell(row=row, column=9).value = row_data['Status']
-            
-            # Styling
-            for col in range(1, 10):
-                cell = ws.cell(row=row, column=col)
-                cell.border = self.thin_border
-                
-                # Color coding based on status
-                if row_data['Status'] in ['HANYA DI GAMBAR', 'HANYA DI RAB', 'SELISIH BESAR']:
-                    cell.fill = self.warning_fill
-                elif row_data['Status'] == 'MATCH':
-                    cell.fill = self.ok_fill
-        
-        # Column widths
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 35
-        ws.column_dimensions['C'].width = 35
-        ws.column_dimensions['D'].width = 10
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 15
-        ws.column_dimensions['G'].width = 15
-        ws.column_dimensions['H'].width = 12
-        ws.column_dimensions['I'].width = 20
-    
-    def run_comparison(self, output_file: str):
-        """Jalankan proses perbandingan lengkap"""
-        print("\n" + "="*70)
-        print("ANALISIS PERBANDINGAN VOLUME GAMBAR VS RAB")
-        print("="*70)
-        print(f"Timestamp: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}")
-        print("="*70)
+        headers = ['No', 'Item Gambar', 'Item RAB', 'Satuan', 'Volume Gambar', 'Volume RAB', 'Selisih', 'Selisih %', 'Status',
+                   'Gambar per RAB']
+        ws.append(self._styled_row(ws, headers, font=self.header_font, fill=self.header_fill,
+                                   border=self.thin_border, alignment=Alignment(horizontal='center', wrap_text=True)))
         
-        # Read data
-        self.read_volume_gambar()
-        self.read_volume_rab()
+        # Data (mulai baris 4)
+        data = pd.DataFrame({
+            'No': np.arange(start + 1, start + len(df) + 1),
+            'Item': df['Item'].to_numpy(dtype=object),
+            'Item RAB': df['Item RAB'].to_numpy(dtype=object),
+            'Satuan': df['Satuan'].to_numpy(dtype=object),
+            'Volume Gambar': df['Volume Gambar'].to_numpy(),
+            'Volume RAB': df['Volume RAB'].to_numpy(),
+            'Selisih': df['Selisih'].to_numpy(),
+            'Selisih %': df['Selisih %'].to_numpy(),
+            'Status': df['Status'].astype(str).to_numpy(dtype=object),
+            'Gambar per RAB': df['Gambar per RAB'].to_numpy() if 'Gambar per RAB' in df.columns else 0,
+        })
+        append_frame(ws, data, header=False)
+        
+        # Styling per kolom/status sebagai conditional formatting atas seluruh data
+        last_row = len(df) + 3
+        data_range = f'A4:J{last_row}'
+        add_rule(ws, data_range, equals_formula('$I4', ['HANYA DI GAMBAR', 'HANYA DI RAB', 'SELISIH BESAR']),
+                 fill=self.warning_fill)
+        add_rule(ws, data_range, equals_formula('$I4', ['MATCH']), fill=self.ok_fill)
+        add_rule(ws, data_range, border=self.thin_border)
+        add_rule(ws, f'H4:H{last_row}', number_format='0.00')
+    
+    def compare_categories(self, jobs: int = None) -> Dict[str, pd.DataFrame]:
+        """Baca RAB dan bandingkan semua kategori, paralel per kategori
+        
+        Tiap kategori (baca RAB + compare_volumes) berjalan di proses sendiri;
+        progres dicetak saat kategori selesai, log lengkapnya dicetak dan
+        hasilnya digabung dalam urutan CATEGORIES sehingga output tetap sama.
+        
+        Args:
+            jobs: Jumlah proses (None = sebanyak kategori/CPU, 1 = berurutan)
+        """
+        jobs = min(len(CATEGORIES), jobs or os.cpu_count() or 1)
+        
+        if jobs > 1:
+            try:
+                outputs = self._compare_parallel(jobs)
+            except (OSError, RuntimeError) as e:
+                print(f"⚠ Proses paralel gagal ({e}), lanjut berurutan")
+            else:
+                for category in CATEGORIES:
+                    _, rab_df, pairs, result, log, _, state, load_stats = outputs[category]
+                    print(log, end='')
+                    self.rab_data[category] = rab_df
+                    self.rab_load_stats[category] = load_stats
+                    self.match_pairs[category] = pairs
+                    self.match_state.update(state)
+                    self.comparison_results[category] = result
+                return self.comparison_results
+        
+        self.read_volume_rab(jobs)
         
-        # Compare
         print("\n" + "="*70)
         print("PROSES PERBANDINGAN")
         print("="*70)
         
-        for category in ['struktur', 'arsitektur', 'mep']:
+        for category in CATEGORIES:
             result = self.compare_volumes(category)
             self.comparison_results[category] = result
+        return self.comparison_results
+    
+    def _compare_parallel(self, jobs: int) -> Dict[str, tuple]:
+        """Jalankan _compare_category_worker per kategori di process pool"""
+        print("\n" + "="*70)
+        print(f"PROSES PERBANDINGAN ({jobs} proses paralel)")
+        print("="*70)
+        
+        outputs = {}
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(_compare_category_worker, self._matcher(), category,
+                                self.gambar_data.get(category, pd.DataFrame()),
+                                self.rab_files.get(category, ''),
+                                {category: self.match_state[category]} if category in self.match_state else {})
+                for category in CATEGORIES
+            ]
+            for future in as_completed(futures):
+                output = future.result()
+                category, _, _, result, _, elapsed, _, _ = output
+                outputs[category] = output
+                print(f"  ✓ {category.upper()} selesai: {len(result)} baris ({elapsed:.1f} detik)")
+        return outputs
+    
+    def run_comparison(self, output_file: str, jobs: int = None):
+        """Jalankan proses perbandingan lengkap
+        
+        Args:
+            output_file: Path laporan Excel
+            jobs: Jumlah proses untuk perbandingan per kategori (None = otomatis, 1 = berurutan)
+        """
+        print("\n" + "="*70)
+        print("ANALISIS PERBANDINGAN VOLUME GAMBAR VS RAB")
+        print("="*70)
+        print(f"Timestamp: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}")
+        print("="*70)
+        
+        # Read gambar, then read RAB + compare per category
+        self.read_volume_gambar()
+        self.compare_categories(jobs)
+        
+        if self.match_cache is not None:
+            self.match_cache.close()
         
         # Generate report
         self.generate_report(output_file)
+        try:
+            path = export_comparison(self.comparison_results, output_file)
+            print(f"✓ Data export: {os.path.basename(path)}")
+        except (OSError, ValueError) as e:
+            print(f"⚠ Data export gagal: {e}")
         
         print("\n" + "="*70)
         print("✓ ANALISIS SELESAI")
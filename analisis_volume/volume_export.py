@@ -0,0 +1,248 @@
+"""
+Columnar Volume Export
+Machine-readable copies of the Excel workbooks with a fixed schema:
+calculated gambar items (DXFToExcelConverter) and comparison results
+(VolumeComparator), written next to the workbook
+
+    Volume_dari_Gambar_AUTO.xlsx        → Volume_dari_Gambar_AUTO.items.v1.parquet
+    LAPORAN_PERBANDINGAN_VOLUME.xlsx    → LAPORAN_PERBANDINGAN_VOLUME.comparison.v1.parquet
+
+Parquet when a Parquet engine (pyarrow/fastparquet) is installed, otherwise
+CSV (UTF-8). The readers prefer the export over the workbook while it is at
+least as new as the workbook; a workbook edited by hand after the export is
+read as before.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .rab_cache import parquet_available
+except ImportError:
+    from rab_cache import parquet_available
+
+
+# Bump when a schema below changes (older exports are then ignored)
+SCHEMA_VERSION = 1
+
+# Calculated gambar items, one row per item
+ITEM_COLUMNS = ['kategori', 'no', 'kode', 'item', 'lantai', 'lokasi', 'panjang', 'lebar', 'tinggi',
+                'jumlah', 'satuan', 'volume', 'metode']
+ITEM_NUMERIC = ['no', 'panjang', 'lebar', 'tinggi', 'jumlah', 'volume']
+
+# Comparison rows, one per gambar item / RAB-only row
+COMPARISON_COLUMNS = ['kategori', 'item', 'item_rab', 'satuan', 'volume_gambar', 'volume_rab', 'selisih',
+                      'selisih_persen', 'status', 'similarity', 'gambar_per_rab']
+COMPARISON_NUMERIC = ['volume_gambar', 'volume_rab', 'selisih', 'selisih_persen', 'similarity', 'gambar_per_rab']
+
+# Comparator result column → export column
+_COMPARISON_NAMES = {
+    'Item': 'item', 'Item RAB': 'item_rab', 'Satuan': 'satuan', 'Volume Gambar': 'volume_gambar',
+    'Volume RAB': 'volume_rab', 'Selisih': 'selisih', 'Selisih %': 'selisih_persen', 'Status': 'status',
+    'Similarity': 'similarity', 'Gambar per RAB': 'gambar_per_rab',
+}
+
+# Columns of a gambar sheet as VolumeComparator/StrukturAnalyzer read it from the workbook
+GAMBAR_SHEET_COLUMNS = ['No', 'Item', 'Lokasi', 'Panjang', 'Lebar', 'Tinggi', 'Jumlah', 'Satuan', 'Volume', 'Rumus']
+
+# Workbook header (lower case, without unit) → GAMBAR_SHEET_COLUMNS; covers the template
+# layouts (V1 10 columns, V2 12 columns with Kode/Lantai) and the converter output
+_GAMBAR_HEADERS = {
+    'no': 'No',
+    'item': 'Item', 'item pekerjaan': 'Item',
+    'lokasi': 'Lokasi', 'lokasi/as grid': 'Lokasi', 'lokasi/keterangan': 'Lokasi', 'spesifikasi': 'Lokasi',
+    'panjang': 'Panjang', 'lebar': 'Lebar', 'tinggi': 'Tinggi', 'jumlah': 'Jumlah', 'satuan': 'Satuan',
+    'volume': 'Volume',
+    'rumus': 'Rumus', 'rumus/cara hitung': 'Rumus', 'metode': 'Rumus', 'keterangan': 'Rumus',
+}
+
+# Dimension columns: empty = 0 (the converter writes '' for a missing tinggi)
+_GAMBAR_DIMENSIONS = ['Panjang', 'Lebar', 'Tinggi', 'Jumlah']
+
+_FORMATS = ('.parquet', '.csv')
+
+
+def export_base(workbook_path: str, kind: str) -> str:
+    """Export path without extension: <workbook stem>.<kind>.v<SCHEMA_VERSION>"""
+    stem = os.path.splitext(str(workbook_path))[0]
+    return f"{stem}.{kind}.v{SCHEMA_VERSION}"
+
+
+def conform(df: pd.DataFrame, columns: List[str], numeric: List[str]) -> pd.DataFrame:
+    """Table with exactly the schema columns: numbers as float (missing = 0), text as str (missing = '')"""
+    result = pd.DataFrame(index=range(len(df)))
+    for column in columns:
+        values = df[column].reset_index(drop=True) if column in df.columns else pd.Series([None] * len(df))
+        if column in numeric:
+            result[column] = pd.to_numeric(values, errors='coerce').fillna(0.0).astype(float)
+        else:
+            values = values.astype(object)
+            result[column] = values.where(pd.notna(values), '').astype(str)
+    return result
+
+
+def write_table(df: pd.DataFrame, base: str) -> str:
+    """
+    Write a conformed table as Parquet (or CSV), atomically
+
+    Returns:
+        Path of the written file
+    """
+    tmp = f"{base}.{os.getpid()}.tmp"
+    path = None
+    if parquet_available():
+        try:
+            df.to_parquet(tmp, index=False)
+            path = base + '.parquet'
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    if path is None:
+        df.to_csv(tmp, index=False, encoding='utf-8')
+        path = base + '.csv'
+    os.replace(tmp, path)
+
+    # Do not leave an older export in the other format behind
+    for ext in _FORMATS:
+        if base + ext != path and os.path.exists(base + ext):
+            os.remove(base + ext)
+    return path
+
+
+def find_export(workbook_path: str, kind: str) -> Optional[str]:
+    """Export of a workbook that is at least as new as the workbook, or None"""
+    base = export_base(workbook_path, kind)
+    for ext in _FORMATS:
+        path = base + ext
+        if os.path.exists(path):
+            if os.path.exists(workbook_path) and os.path.getmtime(path) < os.path.getmtime(workbook_path):
+                return None
+            return path
+    return None
+
+
+def read_table(path: str, columns: List[str], numeric: List[str]) -> pd.DataFrame:
+    """Read an export file with the schema dtypes"""
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={c: str for c in columns if c not in numeric}, keep_default_na=False)
+    return conform(df, columns, numeric)
+
+
+def export_items(grouped_items: Dict[str, List[Dict]], workbook_path: str) -> str:
+    """
+    Export calculated items per category (same values as the workbook rows)
+
+    Args:
+        grouped_items: {kategori: [item dict of AutoVolumeCalculator]}
+        workbook_path: Output workbook the export belongs to
+    """
+    rows = []
+    for kategori, items in grouped_items.items():
+        for idx, item in enumerate(items, 1):
+            rows.append({
+                'kategori': kategori,
+                'no': idx,
+                'kode': item.get('kode', ''),
+                'item': item.get('item', ''),
+                'lantai': item.get('lantai', ''),
+                'lokasi': item.get('grid', ''),
+                'panjang': item.get('panjang', 0),
+                'lebar': item.get('lebar', 0),
+                'tinggi': item.get('tinggi', 0) or 0,
+                'jumlah': item.get('jumlah', 1),
+                'satuan': item.get('satuan', 'm3'),
+                'volume': item.get('volume', 0),
+                'metode': f"Auto: {item.get('method', 'DXF')}",
+            })
+    df = conform(pd.DataFrame(rows), ITEM_COLUMNS, ITEM_NUMERIC)
+    return write_table(df, export_base(workbook_path, 'items'))
+
+
+def gambar_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gambar sheet (workbook or export) as GAMBAR_SHEET_COLUMNS
+
+    Workbook columns are mapped by header name, e.g. 'Item Pekerjaan' → Item,
+    'Lokasi/As Grid' → Lokasi, 'Metode' → Rumus; extra columns (Kode, Lantai)
+    are dropped. Sheets whose headers do not name Item and Volume are taken
+    by position (first 10 columns, V1 layout). Numbers are float (empty
+    dimensions = 0, empty No/Volume stay NaN), empty text is NaN.
+    """
+    names = {}
+    for column in df.columns:
+        key = str(column).split('(')[0].strip().lower()
+        target = _GAMBAR_HEADERS.get(key)
+        if target is not None and target not in names.values():
+            names[column] = target
+    if {'Item', 'Volume'} <= set(names.values()):
+        df = df[list(names)].rename(columns=names)
+    else:
+        df = df[df.columns[:len(GAMBAR_SHEET_COLUMNS)]].copy()
+        df.columns = GAMBAR_SHEET_COLUMNS[:len(df.columns)]
+
+    result = pd.DataFrame(index=range(len(df)))
+    for column in GAMBAR_SHEET_COLUMNS:
+        values = df[column].reset_index(drop=True) if column in df.columns else pd.Series([None] * len(df))
+        if column in ('No', 'Volume') or column in _GAMBAR_DIMENSIONS:
+            values = pd.to_numeric(values, errors='coerce').astype(float)
+            result[column] = values.fillna(0.0) if column in _GAMBAR_DIMENSIONS else values
+        else:
+            values = values.astype(object)
+            empty = values.isna() | (values.astype(str).str.strip() == '')
+            result[column] = values.where(~empty, np.nan)
+    return result
+
+
+def read_gambar_sheets(workbook_path: str) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Gambar items of the items export in the column layout of the workbook sheets
+
+    Returns:
+        {kategori: DataFrame as gambar_frame returns it for the workbook sheet},
+        or None when there is no (current) export for the workbook
+    """
+    path = find_export(workbook_path, 'items')
+    if path is None:
+        return None
+    items = read_table(path, ITEM_COLUMNS, ITEM_NUMERIC)
+
+    sheets = {}
+    for kategori in ('struktur', 'arsitektur', 'mep'):
+        part = items[items['kategori'] == kategori]
+        sheets[kategori] = pd.DataFrame({
+            'No': part['no'].astype(int).to_numpy(),
+            'Item': part['item'].to_numpy(dtype=object),
+            'Lokasi': part['lokasi'].to_numpy(dtype=object),
+            'Panjang': part['panjang'].to_numpy(),
+            'Lebar': part['lebar'].to_numpy(),
+            'Tinggi': part['tinggi'].to_numpy(),
+            'Jumlah': part['jumlah'].to_numpy(),
+            'Satuan': part['satuan'].to_numpy(dtype=object),
+            'Volume': part['volume'].to_numpy(),
+            'Rumus': part['metode'].to_numpy(dtype=object),
+        }, columns=GAMBAR_SHEET_COLUMNS)
+        sheets[kategori] = gambar_frame(sheets[kategori])
+    return sheets
+
+
+def export_comparison(results: Dict[str, pd.DataFrame], workbook_path: str) -> str:
+    """Export comparison results of all categories (kategori column + COMPARISON_COLUMNS)"""
+    parts = []
+    for kategori, result in results.items():
+        part = result.rename(columns=_COMPARISON_NAMES)
+        part.insert(0, 'kategori', kategori)
+        parts.append(conform(part, COMPARISON_COLUMNS, COMPARISON_NUMERIC))
+    df = pd.concat(parts, ignore_index=True) if parts else conform(pd.DataFrame(), COMPARISON_COLUMNS,
+                                                                     COMPARISON_NUMERIC)
+    return write_table(df, export_base(workbook_path, 'comparison'))
+
+
+def read_comparison(workbook_path: str) -> Optional[pd.DataFrame]:
+    """Comparison export of a report workbook, or None"""
+    path = find_export(workbook_path, 'comparison')
+    return None if path is None else read_table(path, COMPARISON_COLUMNS, COMPARISON_NUMERIC)